@@ -8,6 +8,7 @@ use openzeppelin_test_common::account::{
 };
 use openzeppelin_test_common::mocks::account::DualCaseAccountMock;
 use openzeppelin_test_common::mocks::simple::{ISimpleMockDispatcher, ISimpleMockDispatcherTrait};
+use openzeppelin_test_common::signed_transactions::{STARK_PUBLIC_KEY, STARK_SIGNED_TXS};
 use openzeppelin_testing as utils;
 use openzeppelin_testing::constants::stark::{KEY_PAIR, KEY_PAIR_2};
 use openzeppelin_testing::constants::{
@@ -98,6 +99,18 @@ fn test_isValidSignature() {
     assert!(is_valid.is_zero(), "Should reject invalid signature");
 }
 
+#[test]
+fn test_is_valid_signature_signed_batch() {
+    let key_pair = KEY_PAIR();
+    let state = setup(key_pair);
+    assert_eq!(key_pair.public_key, STARK_PUBLIC_KEY);
+
+    for data in STARK_SIGNED_TXS() {
+        let is_valid = state.is_valid_signature(data.tx_hash, array![data.r, data.s]);
+        assert_eq!(is_valid, starknet::VALIDATED);
+    }
+}
+
 //
 // Entry points
 //
@@ -7,6 +7,7 @@ use openzeppelin_test_common::eth_account::{
 };
 use openzeppelin_test_common::mocks::account::DualCaseEthAccountMock;
 use openzeppelin_test_common::mocks::simple::{ISimpleMockDispatcher, ISimpleMockDispatcherTrait};
+use openzeppelin_test_common::signed_transactions::{ETH_PUBLIC_KEY, ETH_SIGNED_TXS};
 use openzeppelin_testing as utils;
 use openzeppelin_testing::constants::secp256k1::{KEY_PAIR, KEY_PAIR_2};
 use openzeppelin_testing::constants::{
@@ -119,6 +120,21 @@ fn test_isValidSignature() {
     assert_eq!(is_valid, 0, "Should reject invalid signature");
 }
 
+#[test]
+fn test_is_valid_signature_signed_batch() {
+    let key_pair = KEY_PAIR();
+    let state = setup(key_pair);
+    assert_eq!(key_pair.public_key, ETH_PUBLIC_KEY());
+
+    for data in ETH_SIGNED_TXS() {
+        let mut serialized_signature = array![];
+        data.signature.serialize(ref serialized_signature);
+
+        let is_valid = state.is_valid_signature(data.tx_hash, serialized_signature);
+        assert_eq!(is_valid, starknet::VALIDATED);
+    }
+}
+
 //
 // Entry points
 //
@@ -1,4 +1,5 @@
 pub(crate) mod common;
 
+mod test_with_merkle_tree_script;
 mod test_with_pedersen;
 mod test_with_poseidon;
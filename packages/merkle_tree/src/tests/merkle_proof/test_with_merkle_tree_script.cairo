@@ -0,0 +1,264 @@
+use core::hash::{HashStateExTrait, HashStateTrait};
+use core::pedersen::{PedersenTrait, pedersen};
+use core::poseidon::poseidon_hash_span;
+use openzeppelin_testing::AsAddressTrait;
+use crate::hashes::{PedersenCHasher, PoseidonCHasher};
+use crate::merkle_proof::{process_multi_proof, process_proof, verify, verify_multi_proof};
+use super::common::Leaf;
+
+// The roots and proofs below were generated by `scripts/merkle_tree.py` from the leaves in
+// `LEAVES`, written to a CSV file one `address,amount` row per leaf:
+//
+//   python3 scripts/merkle_tree.py build leaves.csv -o tree --hash <hash> --types ContractAddress,u128
+//   python3 scripts/merkle_tree.py proofs tree
+//   python3 scripts/merkle_tree.py multiproof tree 0 4 6
+//
+// With 7 leaves the tree is not perfect, so proofs have different lengths.
+//
+// `scripts/tests/test_merkle_tree.py` rebuilds them from this file to keep both in sync.
+
+const PEDERSEN_ROOT: felt252 = 0x071bc25260592ca98baa24e5d5dcc338de49e8ec3bf7526477381fa8584aedb9;
+const PEDERSEN_MULTI_PROOF: [felt252; 3] = [
+    0x044fdc540a81d0189ed30b49d64136f9e8bd499c942ba170404ef0b9406e524c,
+    0x07e7cd8dc785b0dda75a24bbeeed8b5a0e16225fc7a3fb068f45a3cec867e417,
+    0x02928e252fd7c6bc05225c207232be14b70bd95a0db939ccba0ff3bcf3c64273,
+];
+const PEDERSEN_MULTI_PROOF_FLAGS: [bool; 5] = [true, false, false, false, true];
+
+fn PEDERSEN_PROOFS() -> Span<Span<felt252>> {
+    [
+        [
+            0x009638a324b429712f9897cb5a35386faf7c421bd06765f2daf01124931a5fcf,
+            0x07e7cd8dc785b0dda75a24bbeeed8b5a0e16225fc7a3fb068f45a3cec867e417,
+            0x02831465d2687de3db647e27eb9e166cb751470fe1ab8820957671fa0631ede9,
+        ]
+            .span(),
+        [
+            0x065c6ea9d56b5506fe7d9e7ccc979fdb719df4088db5ed28c39e5d274ddbac37,
+            0x02831465d2687de3db647e27eb9e166cb751470fe1ab8820957671fa0631ede9,
+        ]
+            .span(),
+        [
+            0x0505d4a73ba972d6775935dd9bf43db3579aac60a6d2d6ff80a9aa713c66a666,
+            0x06c490a64307427257b8f704f49e86939e1f09ace83304ff05adee438ddefc98,
+            0x0658b89b073dbddc4dfc26a875d26af30133bb5f786e742d3ddc3b671048b522,
+        ]
+            .span(),
+        [
+            0x01c60702056f2a313d08a20ee7fa52c64982d4d216fab555b302df213258886d,
+            0x02928e252fd7c6bc05225c207232be14b70bd95a0db939ccba0ff3bcf3c64273,
+            0x0658b89b073dbddc4dfc26a875d26af30133bb5f786e742d3ddc3b671048b522,
+        ]
+            .span(),
+        [
+            0x044fdc540a81d0189ed30b49d64136f9e8bd499c942ba170404ef0b9406e524c,
+            0x02928e252fd7c6bc05225c207232be14b70bd95a0db939ccba0ff3bcf3c64273,
+            0x0658b89b073dbddc4dfc26a875d26af30133bb5f786e742d3ddc3b671048b522,
+        ]
+            .span(),
+        [
+            0x05fb6a626bb2c1e12fc2d6fa7f218ec06928ba5febf4d5677c2c5060827e383b,
+            0x06c490a64307427257b8f704f49e86939e1f09ace83304ff05adee438ddefc98,
+            0x0658b89b073dbddc4dfc26a875d26af30133bb5f786e742d3ddc3b671048b522,
+        ]
+            .span(),
+        [
+            0x01c4b6ce8ea743fbfd6f6725af7da7c5881b9f5c7bac6cfb50011ecffd01ddf1,
+            0x07e7cd8dc785b0dda75a24bbeeed8b5a0e16225fc7a3fb068f45a3cec867e417,
+            0x02831465d2687de3db647e27eb9e166cb751470fe1ab8820957671fa0631ede9,
+        ]
+            .span(),
+    ]
+        .span()
+}
+
+const POSEIDON_ROOT: felt252 = 0x00429e3221e86937caa889b9c45de70850aa7a92ff08fa169dc16679b195db77;
+const POSEIDON_MULTI_PROOF: [felt252; 3] = [
+    0x035a7279f2aa8134975359729e08a7f0c1683fd5dd655c4df74d631336be8676,
+    0x05b151ebb9201ce27c56a70f5d0571ccfb9d9d62f12b8ccab7801ba87ec21a2f,
+    0x022316d2fe669669c4e5f64f4179705189e67e483cc99b8f40b019719f491a3b,
+];
+const POSEIDON_MULTI_PROOF_FLAGS: [bool; 5] = [false, false, true, false, true];
+
+fn POSEIDON_PROOFS() -> Span<Span<felt252>> {
+    [
+        [
+            0x05b151ebb9201ce27c56a70f5d0571ccfb9d9d62f12b8ccab7801ba87ec21a2f,
+            0x022316d2fe669669c4e5f64f4179705189e67e483cc99b8f40b019719f491a3b,
+            0x020422cb57410f1255ac5103f3d02709e168f260f265c2f0b96a979a371b9f03,
+        ]
+            .span(),
+        [
+            0x06e2c2c5dc7ae401abed66ddfffbbc8b36cc89848318c70af9463c9d0df173e3,
+            0x022316d2fe669669c4e5f64f4179705189e67e483cc99b8f40b019719f491a3b,
+            0x020422cb57410f1255ac5103f3d02709e168f260f265c2f0b96a979a371b9f03,
+        ]
+            .span(),
+        [
+            0x05411decbb6c3fd15d1ef7adead1148935b9b76846f60877469aa3bae13d517c,
+            0x06c59e3a7c1a3aa993a810c775cab398abb0577a45ac32070dfc7aa4393b914b,
+            0x020422cb57410f1255ac5103f3d02709e168f260f265c2f0b96a979a371b9f03,
+        ]
+            .span(),
+        [
+            0x01492f3ef71eca81e7c03f66e625430a080504d8fccd00b03b0c9154975c50ba,
+            0x079b928cb4a302f3d4dcccc6e67d40b7de490c38a844ab74499bd83fddac167a,
+            0x052768c7e34a75f60e4a8f28e941d824723ad40a7fba420c4e57b83bed44dfa3,
+        ]
+            .span(),
+        [
+            0x062a59bc6203c6b6de38bdd79f5854f5ce73942cc0e4af4d98679bee04d475ca,
+            0x052768c7e34a75f60e4a8f28e941d824723ad40a7fba420c4e57b83bed44dfa3,
+        ]
+            .span(),
+        [
+            0x048fd7f07e8619d8fec13646da47364344784afa2a99de9bdaeb725a08b57b5c,
+            0x06c59e3a7c1a3aa993a810c775cab398abb0577a45ac32070dfc7aa4393b914b,
+            0x020422cb57410f1255ac5103f3d02709e168f260f265c2f0b96a979a371b9f03,
+        ]
+            .span(),
+        [
+            0x035a7279f2aa8134975359729e08a7f0c1683fd5dd655c4df74d631336be8676,
+            0x079b928cb4a302f3d4dcccc6e67d40b7de490c38a844ab74499bd83fddac167a,
+            0x052768c7e34a75f60e4a8f28e941d824723ad40a7fba420c4e57b83bed44dfa3,
+        ]
+            .span(),
+    ]
+        .span()
+}
+
+fn LEAVES() -> Span<Leaf> {
+    [
+        Leaf {
+            address: 0x7ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffc8.as_address(),
+            amount: 0xfc104e31d098d1ab488fc1acaeb0269,
+        },
+        Leaf {
+            address: 0x7ffffffffffffffffffffffffffffffffffffffffffffffffffffc66ca5c000.as_address(),
+            amount: 0xfc104e31d098d1ab488fc1acaeb0269,
+        },
+        Leaf {
+            address: 0x6a1f098854799debccf2d3c4059ff0f02dbfef6673dc1fcbfffffffffffffc8.as_address(),
+            amount: 0xfc104e31d098d1ab488fc1acaeb0269,
+        },
+        Leaf {
+            address: 0xfa6541b7909bfb5e8585f1222fcf272eea352c7e0e8ed38c988bd1e2a85e82.as_address(),
+            amount: 0xaa8565d732c2c9fa5f6c001d89d5c219,
+        },
+        Leaf { address: 0x123.as_address(), amount: 1000 },
+        Leaf { address: 0x456.as_address(), amount: 2000 },
+        Leaf { address: 0x789.as_address(), amount: 0xffffffffffffffffffffffffffffffff },
+    ]
+        .span()
+}
+
+//
+// Pedersen
+//
+
+#[test]
+fn test_pedersen_proofs() {
+    let leaves = LEAVES();
+    let proofs = PEDERSEN_PROOFS();
+    assert_eq!(proofs.len(), leaves.len());
+
+    for i in 0..leaves.len() {
+        let hash = pedersen_leaf_hash(*leaves.at(i));
+        let proof = *proofs.at(i);
+
+        assert_eq!(process_proof::<PedersenCHasher>(proof, hash), PEDERSEN_ROOT);
+        assert!(verify::<PedersenCHasher>(proof, PEDERSEN_ROOT, hash));
+    }
+}
+
+#[test]
+fn test_pedersen_proof_of_other_leaf_is_invalid() {
+    let leaves = LEAVES();
+    let hash = pedersen_leaf_hash(*leaves.at(0));
+    let proof = *PEDERSEN_PROOFS().at(1);
+
+    assert!(!verify::<PedersenCHasher>(proof, PEDERSEN_ROOT, hash));
+}
+
+#[test]
+fn test_pedersen_multi_proof() {
+    let leaves = LEAVES();
+    // The script lists the leaves in the order the proof consumes them
+    let leaves_to_prove = [
+        pedersen_leaf_hash(*leaves.at(6)), pedersen_leaf_hash(*leaves.at(0)),
+        pedersen_leaf_hash(*leaves.at(4)),
+    ]
+        .span();
+    let proof = PEDERSEN_MULTI_PROOF.span();
+    let proof_flags = PEDERSEN_MULTI_PROOF_FLAGS.span();
+
+    assert_eq!(
+        process_multi_proof::<PedersenCHasher>(proof, proof_flags, leaves_to_prove), PEDERSEN_ROOT,
+    );
+    assert!(
+        verify_multi_proof::<PedersenCHasher>(proof, proof_flags, PEDERSEN_ROOT, leaves_to_prove),
+    );
+}
+
+//
+// Poseidon
+//
+
+#[test]
+fn test_poseidon_proofs() {
+    let leaves = LEAVES();
+    let proofs = POSEIDON_PROOFS();
+    assert_eq!(proofs.len(), leaves.len());
+
+    for i in 0..leaves.len() {
+        let hash = poseidon_leaf_hash(*leaves.at(i));
+        let proof = *proofs.at(i);
+
+        assert_eq!(process_proof::<PoseidonCHasher>(proof, hash), POSEIDON_ROOT);
+        assert!(verify::<PoseidonCHasher>(proof, POSEIDON_ROOT, hash));
+    }
+}
+
+#[test]
+fn test_poseidon_proof_of_other_leaf_is_invalid() {
+    let leaves = LEAVES();
+    let hash = poseidon_leaf_hash(*leaves.at(0));
+    let proof = *POSEIDON_PROOFS().at(2);
+
+    assert!(!verify::<PoseidonCHasher>(proof, POSEIDON_ROOT, hash));
+}
+
+#[test]
+fn test_poseidon_multi_proof() {
+    let leaves = LEAVES();
+    // The script lists the leaves in the order the proof consumes them
+    let leaves_to_prove = [
+        poseidon_leaf_hash(*leaves.at(6)), poseidon_leaf_hash(*leaves.at(0)),
+        poseidon_leaf_hash(*leaves.at(4)),
+    ]
+        .span();
+    let proof = POSEIDON_MULTI_PROOF.span();
+    let proof_flags = POSEIDON_MULTI_PROOF_FLAGS.span();
+
+    assert_eq!(
+        process_multi_proof::<PoseidonCHasher>(proof, proof_flags, leaves_to_prove), POSEIDON_ROOT,
+    );
+    assert!(
+        verify_multi_proof::<PoseidonCHasher>(proof, proof_flags, POSEIDON_ROOT, leaves_to_prove),
+    );
+}
+
+//
+// Helpers
+//
+
+fn pedersen_leaf_hash(leaf: Leaf) -> felt252 {
+    let hash_state = PedersenTrait::new(0);
+    pedersen(0, hash_state.update_with(leaf).update(2).finalize())
+}
+
+fn poseidon_leaf_hash(leaf: Leaf) -> felt252 {
+    poseidon_hash_span(
+        [poseidon_hash_span([leaf.address.into(), leaf.amount.into()].span())].span(),
+    )
+}
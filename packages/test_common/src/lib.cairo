@@ -8,5 +8,6 @@ pub mod eth_account;
 pub mod math;
 pub mod mocks;
 pub mod ownable;
+pub mod signed_transactions;
 pub mod upgrades;
 pub mod vesting;
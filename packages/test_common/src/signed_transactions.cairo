@@ -0,0 +1,89 @@
+// Generated by `python3 scripts/sign_transactions.py -n 4`; do not edit.
+// Invoke v3 multicalls of 1 ERC20 transfer(s) from 0x4143434f554e54 with nonces
+// 0..3, on chain id 0x534e5f5345504f4c4941.
+
+use openzeppelin_account::utils::signature::Secp256Signature;
+use starknet::SyscallResultTrait;
+use starknet::secp256_trait::Secp256Trait;
+use starknet::secp256k1::Secp256k1Point;
+use crate::account::SignedTransactionData;
+use crate::eth_account::SignedTransactionData as EthSignedTransactionData;
+
+pub const SIGNED_TX_COUNT: u32 = 4;
+pub const STARK_PUBLIC_KEY: felt252 = 0x454c2645c42b23ea47717675e972e3fdcc1865a40ada320286e33b5a921ecd3;
+
+pub fn STARK_SIGNED_TXS() -> Array<SignedTransactionData> {
+    array![
+        SignedTransactionData {
+            tx_hash: 0x5108156585149114fa53591de4200bd1d659c2310ce74417d51a1e0d4d44ed3,
+            r: 0x370196c5fd531a9999230681f9efda2a197b84a8b614151cde6f4517230bf5e,
+            s: 0x283baa5c526dd804be97ec3a4ad197994fa0d72e5d736506b466d6ba3e359ce,
+        },
+        SignedTransactionData {
+            tx_hash: 0x4bc462e576df1290282186650cc9822a3441d1fd5abe0b771128d780fdc2326,
+            r: 0x1a113d007afc6a2299dc815147dac6a7e115df0bb36d668c3bb99406f1c7f4d,
+            s: 0x1155c3fb5a3281e854988d42356dd25b6e58e8fcefcc72876f43c290c943e41,
+        },
+        SignedTransactionData {
+            tx_hash: 0xf396ec18952192ed00c2a96e32cab4eb421ec10f7111cbb151b2bb8965be6,
+            r: 0x816c3d1531b97ad4fa7eab48f0007d603a829bf235c23881c04cff9cd54bf9,
+            s: 0x4b18fa785aa895fced7b33ec3767b6f9013565aca40d7693fde4c2f8db1f58e,
+        },
+        SignedTransactionData {
+            tx_hash: 0x6919197a20a0da72d78c0efd8b83c7efb4e14c5c4129ceee2b2b7c4e73dcf92,
+            r: 0x9ec42e62e0361489bbe0258c2612df4e5dc4d86185a9608bd91cb26aa001b1,
+            s: 0x31369cd53ad0aa7bff42bdb73377e57be262ecc1fb0668432ffae6b73b64d9f,
+        },
+    ]
+}
+
+pub fn ETH_PUBLIC_KEY() -> Secp256k1Point {
+    Secp256Trait::secp256_ec_new_syscall(
+        0xbd2f713bdcb557b38e071a7b4c0ab99b7b70d12b5769e176abe6797d1f4ef6d1,
+        0xde68da03db1e8b253f80ca412c3f26f5f1b10cfb5eeeb599a10ae498b391c461,
+    )
+        .unwrap_syscall()
+        .unwrap()
+}
+
+pub fn ETH_SIGNED_TXS() -> Array<EthSignedTransactionData> {
+    let public_key = ETH_PUBLIC_KEY();
+    array![
+        EthSignedTransactionData {
+            private_key: 0x505249564154455f484947480000000000505249564154455f4c4f57,
+            public_key,
+            tx_hash: 0x5108156585149114fa53591de4200bd1d659c2310ce74417d51a1e0d4d44ed3,
+            signature: Secp256Signature {
+                r: 0x8f9428c4a1f25706028ea4c0df0e4ad764a8d0ab6bda1fcbff914e5e8a4f03d5,
+                s: 0x52df7f4702808b88e040fd31e45907eac8a6563e89f42c9e50be6a5531998140,
+            },
+        },
+        EthSignedTransactionData {
+            private_key: 0x505249564154455f484947480000000000505249564154455f4c4f57,
+            public_key,
+            tx_hash: 0x4bc462e576df1290282186650cc9822a3441d1fd5abe0b771128d780fdc2326,
+            signature: Secp256Signature {
+                r: 0xd903c9b667e5426bdc6aafe57fb07fe99a959804f6b2dfeddca5332668971eca,
+                s: 0x61defc8dab68063bd54e63bda8cff7a1fe719da8e9dfca221af17044a4f1c687,
+            },
+        },
+        EthSignedTransactionData {
+            private_key: 0x505249564154455f484947480000000000505249564154455f4c4f57,
+            public_key,
+            tx_hash: 0xf396ec18952192ed00c2a96e32cab4eb421ec10f7111cbb151b2bb8965be6,
+            signature: Secp256Signature {
+                r: 0x7ebc4fc9022b77ab71cddb376e78f3e244fda3b5094ef918b370b60b73627c94,
+                s: 0x6dbc37f82a05b68c24024ab37adc507750715e571a3adef93f05b76d8d2103bb,
+            },
+        },
+        EthSignedTransactionData {
+            private_key: 0x505249564154455f484947480000000000505249564154455f4c4f57,
+            public_key,
+            tx_hash: 0x6919197a20a0da72d78c0efd8b83c7efb4e14c5c4129ceee2b2b7c4e73dcf92,
+            signature: Secp256Signature {
+                r: 0xf098c28da30f666c034e30439cc6bd9232bc3380c38553c2406a0c1da7ca069f,
+                s: 0x4cc0f56f840dd04ac6cb7b6ec5285a0e00d710ffd9981fe673cbafee2e4fc3e8,
+            },
+        },
+    ]
+}
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Index over the Scarb artifact manifests (`*.starknet_artifacts.json`) of a target directory.
+
+Every workspace package built into the directory has its own manifest. The index maps each
+contract to its package and Sierra/CASM artifact files, together with the byte span of its
+entry in the manifest, so a full entry is only parsed when it is asked for. The index is
+cached next to the manifests and rebuilt only for manifests whose mtime or size changed.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TARGET_DIR = REPO_ROOT / "target/release"
+MANIFEST_SUFFIX = ".starknet_artifacts.json"
+INDEX_FILENAME = ".artifact_manifest_index.json"
+INDEX_VERSION = 1
+ARTIFACT_KINDS = ("sierra", "casm")
+QUALIFIED_NAME_SEPARATOR = "::"
+
+# Structural JSON tokens: whole string literals (so brackets, commas and colons inside
+# strings are skipped) and the punctuation that delimits objects and arrays. Shared with
+# the streaming scanners in scripts/benchmarking.
+JSON_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{},:]')
+
+
+class ArtifactEntry(NamedTuple):
+    package: str
+    name: str
+    sierra: Optional[str]
+    casm: Optional[str]
+    manifest: str
+    start: int
+    end: int
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.package}{QUALIFIED_NAME_SEPARATOR}{self.name}"
+
+
+def iter_contract_spans(buffer: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, int]]:
+    """Yield the byte span of every element of the top-level `contracts` array, without parsing them."""
+    depth = 0
+    previous = b""
+    in_contracts = False
+    start = 0
+    for match in JSON_TOKEN_PATTERN.finditer(buffer):
+        token = match.group()
+        if token in (b"{", b"["):
+            if in_contracts and depth == 2:
+                start = match.start()
+            if depth == 1 and token == b"[" and previous == b'"contracts"':
+                in_contracts = True
+            depth += 1
+        elif token in (b"}", b"]"):
+            depth -= 1
+            if in_contracts and depth == 2:
+                yield start, match.end()
+            elif in_contracts and depth == 1:
+                return
+        # The key before a top-level ':' decides whether the next array is the contracts list
+        if token != b":":
+            previous = token if depth == 1 else b""
+    if not in_contracts:
+        raise ValueError("Scarb artifact manifest must contain a contracts list")
+
+
+def index_manifest(path: Path) -> List[ArtifactEntry]:
+    """Index the contracts of a single manifest; only names and artifact files are checked."""
+    entries: List[ArtifactEntry] = []
+    with path.open("rb") as manifest_file:
+        if os.fstat(manifest_file.fileno()).st_size == 0:
+            raise ValueError(f"Scarb artifact manifest is empty: {path}")
+        with mmap.mmap(manifest_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for start, end in iter_contract_spans(buffer):
+                contract = json.loads(buffer[start:end])
+                if not isinstance(contract, dict):
+                    raise ValueError(f"each contract entry must be an object: {path.name}")
+                name = contract.get("contract_name")
+                if not isinstance(name, str) or not name:
+                    raise ValueError(f"each contract entry must have a contract_name: {path.name}")
+                package = contract.get("package_name")
+                if not isinstance(package, str) or not package:
+                    package = path.name[: -len(MANIFEST_SUFFIX)]
+                artifacts = contract.get("artifacts")
+                files = [artifacts.get(kind) if isinstance(artifacts, dict) else None for kind in ARTIFACT_KINDS]
+                sierra, casm = [file if isinstance(file, str) and file else None for file in files]
+                entries.append(ArtifactEntry(package, name, sierra, casm, path.name, start, end))
+    return entries
+
+
+class ArtifactManifest:
+    """The contracts of every manifest in `target_dir`, indexed on first access."""
+
+    def __init__(self, target_dir: Union[str, Path] = DEFAULT_TARGET_DIR, use_cache: bool = True) -> None:
+        self.target_dir = Path(target_dir)
+        self.use_cache = use_cache
+        self._entries: Optional[List[ArtifactEntry]] = None
+        self._by_name: Dict[str, List[ArtifactEntry]] = {}
+        self._by_file: Dict[str, ArtifactEntry] = {}
+
+    @property
+    def entries(self) -> List[ArtifactEntry]:
+        return self._ensure_index()
+
+    def _ensure_index(self) -> List[ArtifactEntry]:
+        if self._entries is None:
+            self._entries = self._load_index()
+            for entry in self._entries:
+                self._by_name.setdefault(entry.name, []).append(entry)
+                for file in (entry.sierra, entry.casm):
+                    if file is not None:
+                        self._by_file[file] = entry
+        return self._entries
+
+    def manifests(self) -> List[Path]:
+        try:
+            return sorted(path for path in self.target_dir.iterdir() if path.name.endswith(MANIFEST_SUFFIX))
+        except OSError:
+            return []
+
+    def _read_index_cache(self) -> Dict[str, Any]:
+        try:
+            with (self.target_dir / INDEX_FILENAME).open(encoding="utf-8") as index_file:
+                payload = json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(payload, dict) or payload.get("version") != INDEX_VERSION:
+            return {}
+        manifests = payload.get("manifests")
+        return manifests if isinstance(manifests, dict) else {}
+
+    def _write_index_cache(self, manifests: Dict[str, Any]) -> None:
+        path = self.target_dir / INDEX_FILENAME
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_text(
+                json.dumps({"version": INDEX_VERSION, "manifests": manifests}, indent=2, sort_keys=True),
+                encoding="utf-8",
+            )
+            os.replace(temporary, path)
+        except OSError:
+            # The index only saves rescanning manifests; a read-only target directory is fine.
+            temporary.unlink(missing_ok=True)
+
+    def _load_index(self) -> List[ArtifactEntry]:
+        cached = self._read_index_cache() if self.use_cache else {}
+        manifests: Dict[str, Any] = {}
+        entries: List[ArtifactEntry] = []
+        for path in self.manifests():
+            stat = path.stat()
+            record = cached.get(path.name)
+            try:
+                if (
+                    not isinstance(record, dict)
+                    or record.get("mtime_ns") != stat.st_mtime_ns
+                    or record.get("size") != stat.st_size
+                ):
+                    raise ValueError
+                manifest_entries = [ArtifactEntry(*contract) for contract in record["contracts"]]
+            except (KeyError, TypeError, ValueError):
+                manifest_entries = index_manifest(path)
+                record = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "contracts": [list(entry) for entry in manifest_entries],
+                }
+            manifests[path.name] = record
+            entries.extend(manifest_entries)
+        if self.use_cache and manifests != cached:
+            self._write_index_cache(manifests)
+        return entries
+
+    def packages(self) -> List[str]:
+        return sorted({entry.package for entry in self.entries})
+
+    def contracts(self, package: Optional[str] = None) -> List[ArtifactEntry]:
+        return [entry for entry in self.entries if package is None or entry.package == package]
+
+    def find(self, name: str, package: Optional[str] = None) -> ArtifactEntry:
+        """The entry of contract `name`, which may be qualified as `package::Name`."""
+        if QUALIFIED_NAME_SEPARATOR in name:
+            package, name = name.rsplit(QUALIFIED_NAME_SEPARATOR, 1)
+        self._ensure_index()
+        matches = [entry for entry in self._by_name.get(name, []) if package is None or entry.package == package]
+        if not matches:
+            scope = f" in package {package}" if package is not None else ""
+            raise ValueError(f"no contract named {name}{scope} in the artifact manifests of {self.target_dir}")
+        if len(matches) > 1:
+            candidates = ", ".join(entry.qualified_name for entry in matches)
+            raise ValueError(f"contract name {name} is ambiguous, qualify it as one of: {candidates}")
+        return matches[0]
+
+    def artifact(self, name: str, kind: str = "sierra", package: Optional[str] = None) -> Path:
+        """Path of the `kind` ("sierra" or "casm") artifact of contract `name`."""
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"unknown artifact kind: {kind}")
+        entry = self.find(name, package)
+        file = entry.sierra if kind == "sierra" else entry.casm
+        if file is None:
+            raise ValueError(f"contract {entry.qualified_name} has no {kind} artifact")
+        return self.target_dir / file
+
+    def load_entry(self, entry: ArtifactEntry) -> Dict[str, Any]:
+        """Parse the full manifest entry of `entry`, reading only its byte span."""
+        with (self.target_dir / entry.manifest).open("rb") as manifest_file:
+            manifest_file.seek(entry.start)
+            span = manifest_file.read(entry.end - entry.start)
+        try:
+            contract = json.loads(span)
+        except ValueError:
+            contract = None
+        if not isinstance(contract, dict) or contract.get("contract_name") != entry.name:
+            raise ValueError(f"artifact manifest changed since it was indexed: {entry.manifest}")
+        return contract
+
+    def entry_for_file(self, file: str) -> Optional[ArtifactEntry]:
+        self._ensure_index()
+        return self._by_file.get(file)
+
+    def display_name(self, file: str) -> Optional[str]:
+        """Contract name of an artifact file, qualified with its package only when ambiguous."""
+        entry = self.entry_for_file(file)
+        if entry is None:
+            return None
+        return entry.name if len(self._by_name[entry.name]) == 1 else entry.qualified_name
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Look up contracts in the Scarb artifact manifests.")
+    parser.add_argument(
+        "contracts",
+        nargs="*",
+        metavar="NAME",
+        help="Contracts to show, optionally qualified as package::Name (default: list every contract).",
+    )
+    parser.add_argument(
+        "--dir",
+        type=Path,
+        default=DEFAULT_TARGET_DIR,
+        help="Target directory holding the manifests (default: target/release).",
+    )
+    parser.add_argument("--package", help="Only consider contracts of this package.")
+    parser.add_argument("--json", action="store_true", help="Print the full manifest entries as JSON.")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Rescan every manifest instead of reusing {INDEX_FILENAME}.",
+    )
+    return parser.parse_args()
+
+
+def describe_entry(manifest: ArtifactManifest, entry: ArtifactEntry) -> str:
+    parts = [entry.qualified_name]
+    for kind, file in zip(ARTIFACT_KINDS, (entry.sierra, entry.casm)):
+        if file is None:
+            continue
+        try:
+            size = f"{(manifest.target_dir / file).stat().st_size} bytes"
+        except OSError:
+            size = "missing"
+        parts.append(f"{kind}: {file} ({size})")
+    return "  ".join(parts)
+
+
+def main() -> int:
+    args = parse_args()
+    manifest = ArtifactManifest(args.dir, use_cache=not args.no_cache)
+    try:
+        if args.contracts:
+            entries = [manifest.find(name, args.package) for name in args.contracts]
+        else:
+            entries = manifest.contracts(args.package)
+            if not entries:
+                raise ValueError(f"no artifact manifests found in {args.dir}")
+        if args.json:
+            print(json.dumps([manifest.load_entry(entry) for entry in entries], indent=2))
+        else:
+            for entry in entries:
+                print(describe_entry(manifest, entry))
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,18 @@
 import os
+import re
 import json
+import hashlib
+import mmap
 import sys
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from profiling import PROFILER, add_profile_argument, enable_profiling, profiled_map
+from artifact_manifest import JSON_TOKEN_PATTERN, ArtifactManifest
 
 # ANSI color codes (no external dependencies)
 RESET   = "\033[0m"
@@ -17,6 +28,24 @@ TARGET_DIR = "target/release"
 # Keys for the JSON output
 BYTECODE_KEY = "bytecode"
 CONTRACT_CLASS_KEY = "contract_class"
+MATRIX_KEY = "matrix"
+
+# Artifact filename suffixes: CASM bytecode and Sierra contract class
+CASM_SUFFIX = ".compiled_contract_class.json"
+SIERRA_SUFFIX = ".contract_class.json"
+
+# JSON values between structural tokens (artifact_manifest.JSON_TOKEN_PATTERN) are anything
+# but whitespace
+NON_WHITESPACE_RE = re.compile(rb'[^ \t\r\n]')
+
+# Persistent per-artifact size cache, stored in the target directory
+CACHE_FILENAME = ".contract_sizes_cache.json"
+CACHE_VERSION = 1
+DIGEST_CHUNK_SIZE = 1 << 20
+
+# --watch polls the target directory at this interval (seconds) and diffs against the baseline
+WATCH_INTERVAL = 0.1
+BASELINE_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "benches", "contract_sizes.json")
 
 def try_get_name(filename):
     """
@@ -36,12 +65,90 @@ def try_get_name(filename):
     return filename
 
 
+def contract_names(target_dir):
+    """
+    Returns {file: contract name} for every artifact listed in the Scarb artifact
+    manifests of `target_dir`. Names are qualified with their package only when
+    several packages build a contract of the same name.
+    """
+    manifest = ArtifactManifest(target_dir)
+    try:
+        entries = manifest.entries
+    except (OSError, ValueError):
+        return {}
+    names = {}
+    for entry in entries:
+        for file in (entry.sierra, entry.casm):
+            if file is not None:
+                names[file] = manifest.display_name(file)
+    return names
+
+
+def get_contract_name(file, names=None):
+    """Returns the manifest name of an artifact file, falling back to `try_get_name`."""
+    return (names or {}).get(file) or try_get_name(file)
+
+
+def count_array_elements(buf, start):
+    """
+    Counts the elements of the JSON array whose opening '[' is at `start`.
+    Only commas at the array's own nesting level are counted, so nested
+    values and strings are skipped without being decoded.
+    """
+    depth = 0
+    commas = 0
+    for match in JSON_TOKEN_PATTERN.finditer(buf, start + 1):
+        token = match.group()
+        if token in (b"[", b"{"):
+            depth += 1
+        elif token in (b"]", b"}"):
+            if depth == 0:
+                if commas:
+                    return commas + 1
+                # No separators: the array holds one element or none at all
+                return 1 if NON_WHITESPACE_RE.search(buf, start + 1, match.start()) else 0
+            depth -= 1
+        elif token == b"," and depth == 0:
+            commas += 1
+    raise ValueError("unterminated bytecode array")
+
+
+def find_top_level_value(buf, key):
+    """
+    Returns the offset of the value stored under `key` in the top-level JSON
+    object held by `buf`, or None if the key is absent. Stops scanning as soon
+    as the key is found, so the rest of the document is never read.
+    """
+    encoded_key = json.dumps(key).encode()
+    depth = 0
+    previous = None
+    for match in JSON_TOKEN_PATTERN.finditer(buf):
+        token = match.group()
+        if token in (b"[", b"{"):
+            depth += 1
+        elif token in (b"]", b"}"):
+            depth -= 1
+        elif token == b":" and depth == 1 and previous == encoded_key:
+            value = NON_WHITESPACE_RE.search(buf, match.end())
+            if value is None:
+                raise ValueError(f"missing value for key {key!r}")
+            return value.start()
+        previous = token
+    return None
+
+
 def get_bytecode_size(json_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
-    bytecode = data.get(BYTECODE_KEY, [])
-    num_felts = len(bytecode)
-    return num_felts
+    """
+    Counts the felts in the CASM bytecode array by scanning a memory-mapped view
+    of the artifact, without decoding hints, debug info or the felts themselves.
+    """
+    with open(json_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        start = find_top_level_value(buf, BYTECODE_KEY)
+        if start is None:
+            return 0
+        if buf[start:start + 1] != b"[":
+            raise ValueError(f"{BYTECODE_KEY!r} is not an array")
+        return count_array_elements(buf, start)
 
 
 def get_sierra_contract_class_size(json_path):
@@ -49,30 +156,183 @@ def get_sierra_contract_class_size(json_path):
     return num_bytes
 
 
-def benchmark_contracts(target_dir):
+def get_artifact_kind(filename):
+    if filename.endswith(CASM_SUFFIX):
+        return BYTECODE_KEY
+    elif filename.endswith(SIERRA_SUFFIX):
+        return CONTRACT_CLASS_KEY
+    return None
+
+
+def list_artifacts(target_dir):
+    """
+    Returns the (kind, file) pairs of the artifacts in `target_dir`, sorted by file.
+    The Scarb artifact manifests of every built package decide which files are
+    contract artifacts; a directory without a readable manifest is listed instead.
+    """
+    try:
+        entries = ArtifactManifest(target_dir).entries
+    except (OSError, ValueError):
+        entries = []
+    files = set()
+    for entry in entries:
+        if entry.casm is not None:
+            files.add((BYTECODE_KEY, entry.casm))
+        if entry.sierra is not None:
+            files.add((CONTRACT_CLASS_KEY, entry.sierra))
+    if not entries:
+        for file in os.listdir(target_dir):
+            kind = get_artifact_kind(file)
+            if kind is not None:
+                files.add((kind, file))
+    return sorted(files, key=lambda item: item[1])
+
+
+def measure_artifact(kind, path):
+    try:
+        if kind == BYTECODE_KEY:
+            return {"felts": get_bytecode_size(path)}
+        return {"bytes": get_sierra_contract_class_size(path)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def get_file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_size_cache(target_dir):
+    """
+    Returns the cached entries stored in `target_dir`, keyed by artifact file name.
+    A missing, unreadable or outdated cache is treated as empty.
+    """
+    try:
+        with open(os.path.join(target_dir, CACHE_FILENAME), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_size_cache(target_dir, entries):
+    path = os.path.join(target_dir, CACHE_FILENAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The cache is only an optimization, so a read-only target is not an error
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def lookup_cached_size(entry, kind, path, stat):
+    """
+    Returns the cached measurement for an artifact, or None if it must be re-measured.
+    Unchanged mtime and size are trusted as is; otherwise the content digest decides,
+    so a rebuild that rewrites identical bytes is still a hit.
+    """
+    if not isinstance(entry, dict) or entry.get("kind") != kind or entry.get("size") != stat.st_size:
+        return None
+    metric = "felts" if kind == BYTECODE_KEY else "bytes"
+    if metric not in entry:
+        return None
+    if entry.get("mtime_ns") != stat.st_mtime_ns and entry.get("digest") != get_file_digest(path):
+        return None
+    return {metric: entry[metric]}
+
+
+def benchmark_contracts(target_dir, jobs=1, use_cache=False, cache_stats=None, executor=None):
+    """
+    Sizes every CASM and Sierra artifact in `target_dir`. With `jobs` > 1 the
+    artifacts are measured in a process pool (`executor` if given, so several
+    directories can share one); results keep the sorted file order, so the
+    output is identical to a serial run.
+
+    With `use_cache`, only artifacts that are new or changed since the last run are
+    measured, and `cache_stats` (if given) receives the "hits" and "misses" counts.
+    """
     results = {BYTECODE_KEY: {}, CONTRACT_CLASS_KEY: {}}
-    for file in sorted(os.listdir(target_dir)):
-        if file.endswith(".compiled_contract_class.json"):
-            path = os.path.join(target_dir, file)
-            try:
-                num_felts = get_bytecode_size(path)
-                results[BYTECODE_KEY][file] = {"felts": num_felts}
-            except Exception as e:
-                results[BYTECODE_KEY][file] = {"error": str(e)}
-        elif file.endswith(".contract_class.json"):
+    with PROFILER.span("list artifacts", dir=target_dir):
+        files = list_artifacts(target_dir)
+
+    new_cache = {}
+    infos = {}
+    file_stats = {}
+    pending = []
+    with PROFILER.span("size cache lookup", dir=target_dir):
+        cache = load_size_cache(target_dir) if use_cache else {}
+        for kind, file in files:
             path = os.path.join(target_dir, file)
-            try:
-                num_bytes = get_sierra_contract_class_size(path)
-                results[CONTRACT_CLASS_KEY][file] = {"bytes": num_bytes}
-            except Exception as e:
-                results[CONTRACT_CLASS_KEY][file] = {"error": str(e)}
+            if use_cache:
+                try:
+                    stat = os.stat(path)
+                    info = lookup_cached_size(cache.get(file), kind, path, stat)
+                except OSError:
+                    stat, info = None, None
+                if info is not None:
+                    infos[file] = info
+                    new_cache[file] = {**cache[file], "mtime_ns": stat.st_mtime_ns}
+                    continue
+                file_stats[file] = stat
+            pending.append((kind, file))
+
+    kinds = [kind for kind, _ in pending]
+    names = [file for _, file in pending]
+    paths = [os.path.join(target_dir, file) for _, file in pending]
+    with PROFILER.span("measure artifacts", dir=target_dir, count=len(pending)):
+        if jobs > 1 and len(pending) > 1:
+            chunksize = max(1, len(pending) // (jobs * 4))
+            if executor is not None:
+                measured = list(profiled_map(partial(executor.map, chunksize=chunksize), measure_artifact, names, kinds, paths))
+            else:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    measured = list(profiled_map(partial(executor.map, chunksize=chunksize), measure_artifact, names, kinds, paths))
+        else:
+            measured = profiled_map(map, measure_artifact, names, kinds, paths)
+
+    with PROFILER.span("update size cache", dir=target_dir):
+        for (kind, file), path, info in zip(pending, paths, measured):
+            infos[file] = info
+            stat = file_stats.get(file)
+            if use_cache and stat is not None and "error" not in info:
+                try:
+                    digest = get_file_digest(path)
+                except OSError:
+                    continue
+                new_cache[file] = {
+                    "path": file,
+                    "kind": kind,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "digest": digest,
+                    **info,
+                }
+
+        if use_cache:
+            if new_cache != cache:
+                save_size_cache(target_dir, new_cache)
+            if cache_stats is not None:
+                cache_stats["hits"] = len(files) - len(pending)
+                cache_stats["misses"] = len(pending)
+
+    for kind, file in files:
+        results[kind][file] = infos[file]
     return results
 
 
-def print_benchmark_results(results):
+def print_benchmark_results(results, names=None):
     print(f"{BOLD}{CYAN}CASM bytecode sizes:{RESET}")
     for file, info in results[BYTECODE_KEY].items():
-        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        name = f"{BOLD}{YELLOW}{get_contract_name(file, names)}{RESET}"
         if "felts" in info:
             value = f"{BOLD}{GREEN}{info['felts']} felts{RESET}"
             print(f"{name}: {value}")
@@ -81,7 +341,7 @@ def print_benchmark_results(results):
 
     print(f"\n{BOLD}{CYAN}Sierra contract class sizes:{RESET}")
     for file, info in results[CONTRACT_CLASS_KEY].items():
-        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        name = f"{BOLD}{YELLOW}{get_contract_name(file, names)}{RESET}"
         if "bytes" in info:
             num_bytes = info["bytes"]
             value = f"{BOLD}{GREEN}{num_bytes} bytes{RESET} ({num_bytes/1024:.2f} KB)"
@@ -90,15 +350,269 @@ def print_benchmark_results(results):
             print(f"{RED}Error processing {file}: {info['error']}{RESET}")
 
 
+def parse_target(spec):
+    """Parses a --target "LABEL=DIR" spec; a bare directory is labeled with its own path."""
+    label, sep, target_dir = spec.partition("=")
+    if not sep:
+        return spec, spec
+    if not label or not target_dir:
+        raise ValueError(f"invalid target {spec!r}, expected LABEL=DIR")
+    return label, target_dir
+
+
+def benchmark_matrix(targets, jobs=1, use_cache=False):
+    """
+    Sizes several labeled target directories in one run, e.g. builds from two scarb
+    versions or two inlining strategies. All directories share one process pool, and
+    their cache lookups and result collection run concurrently.
+
+    Returns {"targets": {label: dir}, "results": {label: benchmark_contracts results}}.
+    """
+    labels = list(targets)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor, ThreadPoolExecutor(max_workers=len(labels)) as threads:
+            futures = [
+                threads.submit(benchmark_contracts, targets[label], jobs, use_cache, None, executor)
+                for label in labels
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [benchmark_contracts(targets[label], use_cache=use_cache) for label in labels]
+    return {MATRIX_KEY: {"targets": dict(targets), "results": dict(zip(labels, results))}}
+
+
+def print_matrix(matrix, names=None):
+    """Prints one table per metric: a row per contract, a column per target, deltas against the first target."""
+    labels = list(matrix["targets"])
+    results = matrix["results"]
+    base = labels[0]
+    for kind, metric, title in ((BYTECODE_KEY, "felts", "CASM bytecode sizes"), (CONTRACT_CLASS_KEY, "bytes", "Sierra contract class sizes")):
+        files = sorted({file for label in labels for file in results[label].get(kind, {})})
+        rows = [["Contract", *labels]]
+        for file in files:
+            base_value = results[base].get(kind, {}).get(file, {}).get(metric)
+            row = [get_contract_name(file, names)]
+            for label in labels:
+                value = results[label].get(kind, {}).get(file, {}).get(metric)
+                if value is None:
+                    row.append("—")
+                elif label == base or base_value is None or base_value == value:
+                    row.append(str(value))
+                else:
+                    diff = value - base_value
+                    share = f" {100 * diff / base_value:+.1f}%" if base_value else ""
+                    row.append(f"{value} ({diff:+}{share})")
+            rows.append(row)
+
+        print(f"\n{BOLD}{CYAN}{title} ({metric}, deltas against {base}):{RESET}")
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        for index, row in enumerate(rows):
+            line = "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            print(f"{BOLD}{line}{RESET}" if index == 0 else line)
+        totals = []
+        for label in labels:
+            values = [info[metric] for info in results[label].get(kind, {}).values() if metric in info]
+            totals.append(f"{label}: {sum(values)}")
+        print(f"{YELLOW}Total {metric}: {', '.join(totals)}{RESET}")
+
+
+def scan_artifacts(target_dir):
+    """Returns {file: (kind, mtime_ns, size)} for every artifact in `target_dir`."""
+    artifacts = {}
+    try:
+        entries = list(os.scandir(target_dir))
+    except OSError:
+        return artifacts
+    for entry in entries:
+        kind = get_artifact_kind(entry.name)
+        if kind is None:
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        artifacts[entry.name] = (kind, stat.st_mtime_ns, stat.st_size)
+    return artifacts
+
+
+def format_delta(value, reference):
+    if reference is None:
+        return "new"
+    diff = value - reference
+    if diff > 0:
+        return f"{GREEN}↑{diff}{RESET}"
+    elif diff < 0:
+        return f"{RED}↓{-diff}{RESET}"
+    return "="
+
+
+def print_watch_change(file, info, previous, baseline, names=None):
+    name = f"{BOLD}{YELLOW}{get_contract_name(file, names)}{RESET}"
+    stamp = time.strftime("%H:%M:%S")
+    if "error" in info:
+        print(f"{stamp} {RED}Error processing {file}: {info['error']}{RESET}", flush=True)
+        return
+    metric = "felts" if "felts" in info else "bytes"
+    value = info[metric]
+    last = previous.get(metric) if previous else None
+    base = baseline.get(metric) if baseline else None
+    print(
+        f"{stamp} {name}: {BOLD}{value} {metric}{RESET} "
+        f"(vs baseline: {format_delta(value, base)}, vs last build: {format_delta(value, last)})",
+        flush=True,
+    )
+
+
+def watch_contracts(target_dir, baseline, interval=WATCH_INTERVAL):
+    """
+    Polls `target_dir` and re-measures only the artifacts whose mtime or size changed,
+    printing each new size against `baseline` (a benchmark_contracts-shaped dict) and
+    against the previous measurement. Runs until interrupted.
+
+    An artifact that fails to measure (e.g. still being written) is retried on the next poll.
+    """
+    # Scan before measuring, so an artifact rewritten in between is measured again
+    seen = scan_artifacts(target_dir)
+    results = benchmark_contracts(target_dir, use_cache=True)
+    measured = {file: info for section in results.values() for file, info in section.items()}
+    baseline_sizes = {file: info for section in baseline.values() for file, info in section.items()}
+    names = contract_names(target_dir)
+    print(f"{BOLD}Watching {target_dir} ({len(measured)} artifacts), press Ctrl+C to stop{RESET}", flush=True)
+
+    while True:
+        time.sleep(interval)
+        current = scan_artifacts(target_dir)
+        if current != seen:
+            # A rebuild may also have rewritten the manifests
+            names = contract_names(target_dir)
+        for file in sorted(set(seen) - set(current)):
+            print(f"{time.strftime('%H:%M:%S')} {RED}- {get_contract_name(file, names)}: removed{RESET}", flush=True)
+            measured.pop(file, None)
+        for file, state in sorted(current.items()):
+            if seen.get(file) == state:
+                continue
+            info = measure_artifact(state[0], os.path.join(target_dir, file))
+            if "error" in info:
+                # Leave it out of `seen` so the next poll measures it again
+                current[file] = None
+                continue
+            if info != measured.get(file):
+                print_watch_change(file, info, measured.get(file), baseline_sizes.get(file), names)
+            measured[file] = info
+        seen = current
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Benchmark Cairo contract artifact sizes.")
     parser.add_argument("--json", action="store_true", help="Output results as JSON.")
     parser.add_argument("--dir", type=str, default=TARGET_DIR, help="Target directory (default: target/release)")
+    # Each mode below replaces the plain size report, so at most one of them can be chosen
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--target", action="append", metavar="LABEL=DIR", help="Size this labeled target directory instead of --dir (repeatable); compares all of them in a matrix")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes used to size artifacts (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-measure every artifact instead of reusing {CACHE_FILENAME}.")
+    modes.add_argument("--breakdown", action="store_true", help="Attribute CASM bytecode to Sierra functions and component modules.")
+    modes.add_argument("--sections", action="store_true", help="Attribute Sierra contract class bytes to top-level sections and ABI entries.")
+    modes.add_argument("--storage", action="store_true", help="Estimate storage reads, storage writes and event payload felts per entry point from the CASM and Sierra artifacts.")
+    parser.add_argument("--top", type=int, default=10, help="Number of top contributors listed per contract with --breakdown, --sections or --storage (default: 10)")
+    parser.add_argument("--group-depth", type=int, default=2, help="Module path segments used to group functions with --breakdown (default: 2)")
+    modes.add_argument("--watch", action="store_true", help="Keep running and print the size of every artifact scarb rewrites, against --baseline.")
+    parser.add_argument("--baseline", type=str, default=BASELINE_JSON, help="Benchmark JSON --watch compares against (default: benches/contract_sizes.json)")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help=f"Polling interval in seconds for --watch (default: {WATCH_INTERVAL})")
+    parser.add_argument("--history", type=str, help="Append the results to this benchmark history file if any size changed.")
+    parser.add_argument("--commit", type=str, help="Commit recorded with --history (default: git HEAD)")
+    parser.add_argument("--scarb-version", type=str, help="Scarb version recorded with --history (default: from Scarb.toml)")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    enable_profiling(args.profile)
 
-    results = benchmark_contracts(args.dir)
-    if args.json:
-        print(json.dumps(results, indent=2))
-    else:
-        print(f"{BOLD}Benchmarking CASM and Sierra contract class sizes in: {args.dir}\n{RESET}")
-        print_benchmark_results(results)
+    if args.breakdown:
+        from casm_breakdown import breakdown_contracts, print_breakdown
+        with PROFILER.span("breakdown"):
+            breakdown = breakdown_contracts(args.dir, args.group_depth)
+        if args.json:
+            print(json.dumps(breakdown, indent=2))
+        else:
+            print_breakdown(breakdown, args.top)
+        sys.exit(0)
+
+    if args.target:
+        targets = {}
+        for spec in args.target:
+            try:
+                label, target_dir = parse_target(spec)
+            except ValueError as e:
+                parser.error(str(e))
+            if label in targets:
+                parser.error(f"duplicate target label {label!r}")
+            targets[label] = target_dir
+        try:
+            matrix = benchmark_matrix(targets, args.jobs, use_cache=not args.no_cache)
+        except OSError as e:
+            print(f"{RED}Error benchmarking targets: {e}{RESET}", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(matrix, indent=2))
+        else:
+            print(f"{BOLD}Benchmarking CASM and Sierra contract class sizes in {len(targets)} targets{RESET}")
+            names = {}
+            for target_dir in targets.values():
+                names.update(contract_names(target_dir))
+            print_matrix(matrix[MATRIX_KEY], names)
+        sys.exit(0)
+
+    if args.sections:
+        from sierra_sections import measure_sections, print_sections
+        with PROFILER.span("sections"):
+            sections = measure_sections(args.dir)
+        if args.json:
+            print(json.dumps(sections, indent=2))
+        else:
+            print_sections(sections, args.top)
+        sys.exit(0)
+
+    if args.storage:
+        from storage_costs import analyze_storage_costs, print_storage_costs
+        with PROFILER.span("storage costs"):
+            storage_costs = analyze_storage_costs(args.dir)
+        if args.json:
+            print(json.dumps(storage_costs, indent=2))
+        else:
+            print_storage_costs(storage_costs, args.top)
+        sys.exit(0)
+
+    if args.watch:
+        try:
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{YELLOW}No baseline loaded ({e}), showing deltas against the previous build only{RESET}")
+            baseline = {}
+        try:
+            watch_contracts(args.dir, baseline, args.interval)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    cache_stats = {}
+    results = benchmark_contracts(args.dir, args.jobs, use_cache=not args.no_cache, cache_stats=cache_stats)
+    with PROFILER.span("format output"):
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print(f"{BOLD}Benchmarking CASM and Sierra contract class sizes in: {args.dir}\n{RESET}")
+            print_benchmark_results(results, contract_names(args.dir))
+    if args.history:
+        from benchmark_history import append_history, get_current_commit, get_workspace_scarb_version
+        with PROFILER.span("append history"):
+            commit = args.commit or get_current_commit()
+            scarb_version = args.scarb_version or get_workspace_scarb_version()
+            appended = append_history(args.history, results, commit, scarb_version, skip_unchanged=True)
+        status = f"recorded {commit}" if appended else "unchanged, nothing recorded"
+        print(f"{CYAN}Benchmark history {args.history}: {status}{RESET}", file=sys.stderr)
+    if cache_stats:
+        # Keep stdout byte-identical in JSON mode
+        out = sys.stderr if args.json else sys.stdout
+        print(f"\n{CYAN}Size cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses{RESET}", file=out)
@@ -1,8 +1,18 @@
+import os
 import subprocess
 import json
 import sys
-
-from benchmark import BYTECODE_KEY, CONTRACT_CLASS_KEY, try_get_name
+import fnmatch
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmark import BYTECODE_KEY, CONTRACT_CLASS_KEY, TARGET_DIR, benchmark_contracts, try_get_name
+from benchmark_history import append_history, get_current_commit, get_workspace_scarb_version, load_benchmark
+from gas_benchmark import GAS_KEY, GAS_METRICS
+from casm_breakdown import BREAKDOWN_KEY, breakdown_contracts, flatten_breakdown
+from sierra_sections import SECTIONS_KEY, flatten_sections, measure_sections
+from storage_costs import STORAGE_KEY, STORAGE_METRICS, analyze_storage_costs, flatten_storage_costs
+from profiling import PROFILER, add_profile_argument, enable_profiling
 
 # ANSI color codes
 RESET   = "\033[0m"
@@ -19,6 +29,10 @@ MAX_CONTRACT_CLASS_SIZE = 4089446 # bytes
 
 CLOSE_TO_LIMIT = 0.8
 
+# Regression gate thresholds, see `load_thresholds`
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "benches", "size_thresholds.json")
+THRESHOLD_KEYS = ["max_increase", "max_increase_pct"]
+
 
 def load_json(path):
     with open(path, "r") as f:
@@ -41,23 +55,207 @@ def get_size_warning(metric, value, color=True):
     return ""
 
 
-def get_current_benchmark(benchmark_script, target_dir=None):
+def load_thresholds(path):
+    """
+    Loads regression gate thresholds. The file maps metrics to limits on how much a value
+    may grow, as an absolute `max_increase` and/or a `max_increase_pct`:
+
+        {
+          "default": {"felts": {"max_increase_pct": 5}, "bytes": {"max_increase_pct": 5}},
+          "contracts": {"ERC20Upgradeable": {"felts": {"max_increase": 100}}, "*Votes*": {...}}
+        }
+
+    Contract keys are names or globs, matched against the short contract name and the
+    artifact file name; an exact name wins over globs, and globs apply in file order. A
+    contract rule only overrides the default limits it sets.
+    """
+    with open(path, "r") as f:
+        thresholds = json.load(f)
+    for scope in [thresholds.get("default", {}), *thresholds.get("contracts", {}).values()]:
+        for metric, limits in scope.items():
+            unknown = set(limits) - set(THRESHOLD_KEYS)
+            if unknown:
+                raise ValueError(f"unknown threshold {', '.join(sorted(unknown))} for {metric} in {path}")
+    return thresholds
+
+
+def resolve_thresholds(thresholds, file, metric):
+    name = try_get_name(file)
+    limits = dict(thresholds.get("default", {}).get(metric, {}))
+    rules = thresholds.get("contracts", {})
+    if name in rules or file in rules:
+        rule = rules.get(name, rules.get(file))
+    else:
+        rule = next(
+            (rule for pattern, rule in rules.items() if fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(file, pattern)),
+            {},
+        )
+    limits.update(rule.get(metric, {}))
+    return limits
+
+
+def override_default_pct(thresholds, old, new, max_increase_pct):
+    """
+    Sets the default `max_increase_pct` of every gated metric, as --max-increase-pct does.
+    Per-contract rules still override it.
+    """
+    default = thresholds.setdefault("default", {})
+    for _, metric, _ in gated_sections(old, new):
+        default.setdefault(metric, {})["max_increase_pct"] = max_increase_pct
+    return thresholds
+
+
+def gated_sections(old, new):
+    """(section, metric, hard limit) for every section present in either report."""
+    sections = []
+    if has_size_sections(old, new):
+        sections.append((BYTECODE_KEY, "felts", MAX_BYTECODE_SIZE))
+        sections.append((CONTRACT_CLASS_KEY, "bytes", MAX_CONTRACT_CLASS_SIZE))
+    if has_section(old, new, GAS_KEY):
+        sections.extend((GAS_KEY, metric, None) for metric in GAS_METRICS)
+    return sections
+
+
+def evaluate_gate(old, new, thresholds):
+    """
+    Checks every contract of `new` against its thresholds and the Starknet size limits.
+    Returns a verdict with each offending contract; new contracts are only checked
+    against the hard limits.
+    """
+    violations = []
+    checked = 0
+    for section, metric, hard_limit in gated_sections(old, new):
+        old_entries = old.get(section, {})
+        for file, info in sorted(new.get(section, {}).items()):
+            new_val = info.get(metric)
+            if new_val is None:
+                continue
+            checked += 1
+            old_val = old_entries.get(file, {}).get(metric)
+            delta = None if old_val is None else new_val - old_val
+            delta_pct = 100 * delta / old_val if delta is not None and old_val else None
+            limits = resolve_thresholds(thresholds, file, metric)
+
+            reasons = []
+            if hard_limit is not None and new_val >= hard_limit:
+                reasons.append(f"over the {hard_limit} {metric} limit")
+            if delta is not None and delta > 0:
+                if "max_increase" in limits and delta > limits["max_increase"]:
+                    reasons.append(f"+{delta} {metric} exceeds +{limits['max_increase']}")
+                if "max_increase_pct" in limits and delta_pct is not None and delta_pct > limits["max_increase_pct"]:
+                    reasons.append(f"+{delta_pct:.2f}% exceeds +{limits['max_increase_pct']}%")
+            if reasons:
+                violations.append({
+                    "contract": try_get_name(file),
+                    "file": file,
+                    "section": section,
+                    "metric": metric,
+                    "old": old_val,
+                    "new": new_val,
+                    "delta": delta,
+                    "delta_pct": None if delta_pct is None else round(delta_pct, 2),
+                    "thresholds": limits,
+                    "reasons": reasons,
+                })
+    return {"passed": not violations, "checked": checked, "violations": violations}
+
+
+def print_gate(verdict, markdown=False):
+    violations = verdict["violations"]
+    if markdown:
+        print("#### REGRESSION GATE\n")
+        if not violations:
+            print(f"✅ Passed ({verdict['checked']} values checked).\n")
+            return
+        print(f"❌ Failed: {len(violations)} regression(s) over threshold.\n")
+        for violation in violations:
+            print(f"- `{violation['contract']}` ({violation['metric']}): {'; '.join(violation['reasons'])}")
+        print()
+        return
+    print(f"\n{BOLD}{CYAN}--- REGRESSION GATE ---{RESET}")
+    if not violations:
+        print(f"{GREEN}Passed ({verdict['checked']} values checked).{RESET}")
+        return
+    for violation in violations:
+        print(f"{RED}✗ {color_name(violation['contract'])}{RED} ({violation['metric']}): {'; '.join(violation['reasons'])}{RESET}")
+    print(f"{RED}{BOLD}Failed: {len(violations)} regression(s) over threshold.{RESET}")
+
+
+def is_bundled_benchmark(benchmark_script):
+    """Whether `benchmark_script` is the benchmark.py module this script imports from."""
+    try:
+        return os.path.samefile(benchmark_script, os.path.join(os.path.dirname(__file__), "benchmark.py"))
+    except OSError:
+        return False
+
+
+def get_current_benchmark(benchmark_script=None, target_dir=None, jobs=1, use_cache=True):
+    """
+    Measures the current artifacts in-process with `benchmark_contracts`.
+    An external `benchmark_script` other than the bundled benchmark.py is still
+    run in a separate interpreter and its JSON output parsed.
+    """
+    if benchmark_script is not None and not is_bundled_benchmark(benchmark_script):
+        return run_benchmark_script(benchmark_script, target_dir)
+    try:
+        return benchmark_contracts(target_dir or TARGET_DIR, jobs, use_cache=use_cache)
+    except OSError as e:
+        print(f"{RED}Error running benchmark:\n{e}{RESET}")
+        sys.exit(1)
+
+
+def run_benchmark_script(benchmark_script, target_dir=None):
     cmd = [sys.executable, benchmark_script, "--json"]
     if target_dir:
         cmd.extend(["--dir", target_dir])
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+    with PROFILER.span(os.path.basename(benchmark_script), cat="subprocess"):
+        proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
         print(f"{RED}Error running benchmark script:\n{proc.stderr}{RESET}")
         sys.exit(1)
     return json.loads(proc.stdout)
 
 
-def print_diff(old, new):
-    print(f"\n{BOLD}{CYAN}--- BYTECODE SIZE (felts) ---{RESET}")
-    compare_subdicts(old.get(BYTECODE_KEY, {}), new.get(BYTECODE_KEY, {}), "felts")
+def has_section(old, new, key):
+    return key in old or key in new
 
-    print(f"\n{BOLD}{CYAN}--- SIERRA CONTRACT CLASS SIZE (bytes) ---{RESET}")
-    compare_subdicts(old.get(CONTRACT_CLASS_KEY, {}), new.get(CONTRACT_CLASS_KEY, {}), "bytes")
+
+def has_size_sections(old, new):
+    # Size reports always carry both sections; other reports (e.g. gas) carry neither
+    return has_section(old, new, BYTECODE_KEY) or has_section(old, new, CONTRACT_CLASS_KEY)
+
+
+def print_diff(old, new):
+    if has_size_sections(old, new):
+        print(f"\n{BOLD}{CYAN}--- BYTECODE SIZE (felts) ---{RESET}")
+        compare_subdicts(old.get(BYTECODE_KEY, {}), new.get(BYTECODE_KEY, {}), "felts")
+
+        print(f"\n{BOLD}{CYAN}--- SIERRA CONTRACT CLASS SIZE (bytes) ---{RESET}")
+        compare_subdicts(old.get(CONTRACT_CLASS_KEY, {}), new.get(CONTRACT_CLASS_KEY, {}), "bytes")
+
+    if has_section(old, new, GAS_KEY):
+        for metric in GAS_METRICS:
+            print(f"\n{BOLD}{CYAN}--- EXECUTION RESOURCES ({metric}, whole-test totals) ---{RESET}")
+            compare_subdicts(old.get(GAS_KEY, {}), new.get(GAS_KEY, {}), metric)
+
+    if has_section(old, new, BREAKDOWN_KEY):
+        print(f"\n{BOLD}{CYAN}--- BYTECODE BREAKDOWN BY MODULE (felts) ---{RESET}")
+        compare_subdicts(
+            flatten_breakdown(old.get(BREAKDOWN_KEY, {})), flatten_breakdown(new.get(BREAKDOWN_KEY, {})), "felts"
+        )
+
+    if has_section(old, new, SECTIONS_KEY):
+        print(f"\n{BOLD}{CYAN}--- SIERRA CONTRACT CLASS SECTIONS (bytes) ---{RESET}")
+        compare_subdicts(
+            flatten_sections(old.get(SECTIONS_KEY, {})), flatten_sections(new.get(SECTIONS_KEY, {})), "bytes"
+        )
+
+    if has_section(old, new, STORAGE_KEY):
+        old_costs = flatten_storage_costs(old.get(STORAGE_KEY, {}))
+        new_costs = flatten_storage_costs(new.get(STORAGE_KEY, {}))
+        for metric in STORAGE_METRICS:
+            print(f"\n{BOLD}{CYAN}--- STATIC STORAGE AND EVENT COSTS PER ENTRY POINT ({metric}) ---{RESET}")
+            compare_subdicts(old_costs, new_costs, metric)
 
 
 def color_name(name):
@@ -96,11 +294,36 @@ def compare_subdicts(old, new, metric):
 
 
 def print_diff_markdown(old, new):
-    print(f"#### BYTECODE SIZE (felts) (limit: {MAX_BYTECODE_SIZE:,} felts)\n")
-    markdown_subtable(old.get(BYTECODE_KEY, {}), new.get(BYTECODE_KEY, {}), "felts")
-
-    print(f"#### SIERRA CONTRACT CLASS SIZE (bytes) (limit: {MAX_CONTRACT_CLASS_SIZE:,} bytes)\n")
-    markdown_subtable(old.get(CONTRACT_CLASS_KEY, {}), new.get(CONTRACT_CLASS_KEY, {}), "bytes")
+    if has_size_sections(old, new):
+        print(f"#### BYTECODE SIZE (felts) (limit: {MAX_BYTECODE_SIZE:,} felts)\n")
+        markdown_subtable(old.get(BYTECODE_KEY, {}), new.get(BYTECODE_KEY, {}), "felts")
+
+        print(f"#### SIERRA CONTRACT CLASS SIZE (bytes) (limit: {MAX_CONTRACT_CLASS_SIZE:,} bytes)\n")
+        markdown_subtable(old.get(CONTRACT_CLASS_KEY, {}), new.get(CONTRACT_CLASS_KEY, {}), "bytes")
+
+    if has_section(old, new, GAS_KEY):
+        for metric in GAS_METRICS:
+            print(f"#### EXECUTION RESOURCES ({metric}, whole-test totals)\n")
+            markdown_subtable(old.get(GAS_KEY, {}), new.get(GAS_KEY, {}), metric)
+
+    if has_section(old, new, BREAKDOWN_KEY):
+        print("#### BYTECODE BREAKDOWN BY MODULE (felts)\n")
+        markdown_subtable(
+            flatten_breakdown(old.get(BREAKDOWN_KEY, {})), flatten_breakdown(new.get(BREAKDOWN_KEY, {})), "felts"
+        )
+
+    if has_section(old, new, SECTIONS_KEY):
+        print("#### SIERRA CONTRACT CLASS SECTIONS (bytes)\n")
+        markdown_subtable(
+            flatten_sections(old.get(SECTIONS_KEY, {})), flatten_sections(new.get(SECTIONS_KEY, {})), "bytes"
+        )
+
+    if has_section(old, new, STORAGE_KEY):
+        old_costs = flatten_storage_costs(old.get(STORAGE_KEY, {}))
+        new_costs = flatten_storage_costs(new.get(STORAGE_KEY, {}))
+        for metric in STORAGE_METRICS:
+            print(f"#### STATIC STORAGE AND EVENT COSTS PER ENTRY POINT ({metric})\n")
+            markdown_subtable(old_costs, new_costs, metric)
 
 
 def markdown_subtable(old, new, metric, show_unchanged=False):
@@ -160,16 +383,89 @@ def markdown_subtable(old, new, metric, show_unchanged=False):
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Diff Cairo contract benchmarks.")
-    parser.add_argument("benchmark_script", help="Path to benchmark.py")
-    parser.add_argument("previous_json", help="Path to previous JSON benchmark file")
+    parser.add_argument("benchmark_script", nargs="?", help="Path to an external benchmark script (optional, the bundled benchmark.py runs in-process)")
+    parser.add_argument("previous_json", help="Path to previous JSON benchmark file, or a benchmark history file")
     parser.add_argument("--dir", type=str, help="Target directory for new benchmark (optional)")
     parser.add_argument("--markdown", action="store_true", help="Output results as a markdown table")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes used to size artifacts (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-measure every artifact instead of using the size cache.")
+    parser.add_argument("--current", type=str, help="Diff against this JSON report (e.g. from gas_benchmark.py) instead of measuring the target directory")
+    parser.add_argument("--breakdown", action="store_true", help="Diff the CASM bytecode breakdown of the target directory against a --breakdown JSON report")
+    parser.add_argument("--sections", action="store_true", help="Diff the Sierra contract class sections of the target directory against a --sections JSON report")
+    parser.add_argument("--storage", action="store_true", help="Diff the static storage and event costs of the target directory against a --storage JSON report")
+    parser.add_argument("--gate", action="store_true", help="Exit with status 1 if any contract regresses past its thresholds or the size limits")
+    parser.add_argument("--thresholds", type=str, help="Gate thresholds JSON file (default: benches/size_thresholds.json)")
+    parser.add_argument("--max-increase-pct", type=float, help="Default percentage threshold for every gated metric, overriding the file's defaults")
+    parser.add_argument("--verdict", type=str, help="Write the gate verdict as JSON to this file ('-' for stdout, replacing the diff)")
+    parser.add_argument("--previous-commit", type=str, help="Commit to diff against when previous_json is a history file (default: latest)")
+    parser.add_argument("--history", type=str, help="Append the current results to this benchmark history file if any size changed.")
+    parser.add_argument("--commit", type=str, help="Commit recorded with --history (default: git HEAD)")
+    parser.add_argument("--scarb-version", type=str, help="Scarb version recorded with --history (default: from Scarb.toml)")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    # The history only holds contract sizes, which the other modes don't report
+    if args.history:
+        for flag, enabled in [("--current", args.current), ("--breakdown", args.breakdown), ("--sections", args.sections), ("--storage", args.storage)]:
+            if enabled:
+                parser.error(f"--history cannot be combined with {flag}")
+    enable_profiling(args.profile)
+
+    try:
+        with PROFILER.span("load previous benchmark"):
+            prev = load_benchmark(args.previous_json, args.previous_commit)
+    except ValueError as e:
+        print(f"{RED}Error loading previous benchmark:\n{e}{RESET}")
+        sys.exit(1)
+    with PROFILER.span("current benchmark"):
+        if args.current:
+            current = load_json(args.current)
+        elif args.breakdown:
+            current = breakdown_contracts(args.dir or TARGET_DIR)
+        elif args.sections:
+            current = measure_sections(args.dir or TARGET_DIR)
+        elif args.storage:
+            current = analyze_storage_costs(args.dir or TARGET_DIR)
+        else:
+            current = get_current_benchmark(args.benchmark_script, args.dir, args.jobs, use_cache=not args.no_cache)
+    if args.history:
+        with PROFILER.span("append history"):
+            append_history(
+                args.history,
+                current,
+                args.commit or get_current_commit(),
+                args.scarb_version or get_workspace_scarb_version(),
+                skip_unchanged=True,
+            )
+
+    verdict = None
+    if args.gate:
+        thresholds_path = args.thresholds or THRESHOLDS_FILE
+        try:
+            thresholds = load_thresholds(thresholds_path) if args.thresholds or os.path.exists(thresholds_path) else {}
+        except (OSError, ValueError) as e:
+            print(f"{RED}Error loading thresholds:\n{e}{RESET}")
+            sys.exit(1)
+        if args.max_increase_pct is not None:
+            override_default_pct(thresholds, prev, current, args.max_increase_pct)
+        with PROFILER.span("regression gate"):
+            verdict = evaluate_gate(prev, current, thresholds)
+        if args.verdict and args.verdict != "-":
+            with open(args.verdict, "w") as f:
+                json.dump(verdict, f, indent=2)
+
+    with PROFILER.span("format diff"):
+        if args.verdict == "-" and verdict is not None:
+            print(json.dumps(verdict, indent=2))
+        elif args.markdown:
+            print_diff_markdown(prev, current)
+            if verdict is not None:
+                print_gate(verdict, markdown=True)
+        else:
+            print_diff(prev, current)
+            if verdict is not None:
+                print_gate(verdict)
 
-    prev = load_json(args.previous_json)
-    current = get_current_benchmark(args.benchmark_script, args.dir)
-
-    if args.markdown:
-        print_diff_markdown(prev, current)
-    else:
-        print_diff(prev, current)
+    if verdict is not None and not verdict["passed"]:
+        sys.exit(1)
@@ -0,0 +1,336 @@
+import os
+import re
+import sys
+import json
+import time
+import array
+import struct
+import argparse
+import subprocess
+from collections import namedtuple
+
+from benchmark import BYTECODE_KEY, CONTRACT_CLASS_KEY, CASM_SUFFIX, SIERRA_SUFFIX, try_get_name
+
+# Append-only history of contract-size benchmarks.
+#
+# The file starts with MAGIC and a format version, followed by one record per benchmark run:
+#
+#   header         RECORD_HEADER (payload size, timestamp, field lengths, entry count)
+#   commit         utf-8
+#   scarb version  utf-8
+#   new names      contract names first seen in this record, as u16 length + utf-8; names are
+#                  numbered in order of appearance across the whole file (the string table)
+#   ids            u32 column, string table index of each contract
+#   felts          u32 column, CASM bytecode felts (MISSING if not measured)
+#   bytes          u32 column, Sierra contract class bytes (MISSING if not measured)
+#
+# Readers only decode the small per-record headers and string table deltas while scanning,
+# and seek straight to the columns they need.
+MAGIC = b"OZSIZES\0"
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct("<8sH")
+RECORD_HEADER = struct.Struct("<IqHHII")
+NAME_LENGTH = struct.Struct("<H")
+MISSING = 0xFFFFFFFF
+COLUMN_TYPECODE = "I"
+
+SCARB_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Scarb.toml")
+SCARB_VERSION_PATTERN = re.compile(r'^scarb-version\s*=\s*"([^"]+)"\s*$', re.MULTILINE)
+
+HistoryRecord = namedtuple("HistoryRecord", ["commit", "scarb_version", "timestamp", "count", "columns_offset"])
+SeriesPoint = namedtuple("SeriesPoint", ["commit", "scarb_version", "timestamp", "felts", "bytes"])
+
+
+def is_history_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def contract_stem(filename):
+    """Strips the artifact suffix, so the CASM and Sierra entries of a contract share a name."""
+    for suffix in (CASM_SUFFIX, SIERRA_SUFFIX):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def _pack_column(values):
+    column = array.array(COLUMN_TYPECODE, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpack_column(data):
+    column = array.array(COLUMN_TYPECODE)
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"truncated benchmark history: {f.name}")
+    return data
+
+
+def _open_history(path):
+    f = open(path, "rb")
+    header = f.read(FILE_HEADER.size)
+    if len(header) != FILE_HEADER.size or FILE_HEADER.unpack(header)[0] != MAGIC:
+        f.close()
+        raise ValueError(f"not a benchmark history file: {path}")
+    version = FILE_HEADER.unpack(header)[1]
+    if version != FORMAT_VERSION:
+        f.close()
+        raise ValueError(f"unsupported benchmark history version {version}: {path}")
+    return f
+
+
+def _scan_records(f, names):
+    """
+    Yields the records of an open history file in order, extending `names` with each
+    record's string table delta. Columns are skipped, not read.
+    """
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) != RECORD_HEADER.size:
+            raise ValueError(f"truncated benchmark history: {f.name}")
+        payload_size, timestamp, commit_size, scarb_size, names_size, count = RECORD_HEADER.unpack(header)
+        start = f.tell()
+        commit = _read_exact(f, commit_size).decode("utf-8")
+        scarb_version = _read_exact(f, scarb_size).decode("utf-8")
+        delta = _read_exact(f, names_size)
+        offset = 0
+        while offset < names_size:
+            (length,) = NAME_LENGTH.unpack_from(delta, offset)
+            offset += NAME_LENGTH.size
+            names.append(delta[offset:offset + length].decode("utf-8"))
+            offset += length
+        columns_offset = f.tell()
+        if columns_offset - start + 3 * 4 * count != payload_size:
+            raise ValueError(f"corrupt benchmark history record: {f.name}")
+        yield HistoryRecord(commit, scarb_version, timestamp, count, columns_offset)
+        f.seek(start + payload_size)
+
+
+def _read_column(f, record, index):
+    f.seek(record.columns_offset + index * 4 * record.count)
+    return _unpack_column(_read_exact(f, 4 * record.count))
+
+
+def _read_cell(f, record, column, row):
+    f.seek(record.columns_offset + (column * record.count + row) * 4)
+    return _unpack_column(_read_exact(f, 4))[0]
+
+
+def read_history_records(path):
+    """Lists every record's commit, scarb version and timestamp without reading any sizes."""
+    with _open_history(path) as f:
+        return list(_scan_records(f, []))
+
+
+def read_history_snapshot(path, commit=None):
+    """
+    Returns the sizes recorded for `commit` (the latest record if None, or the last one with
+    that commit or commit prefix) in the same format as `benchmark_contracts`.
+    """
+    names = []
+    with _open_history(path) as f:
+        found = None
+        for record in _scan_records(f, names):
+            if commit is None or record.commit == commit or record.commit.startswith(commit):
+                found = record
+        if found is None:
+            raise ValueError(f"no benchmark recorded for commit {commit}" if commit else f"empty benchmark history: {path}")
+        ids, felts, num_bytes = (_read_column(f, found, i) for i in range(3))
+
+    results = {BYTECODE_KEY: {}, CONTRACT_CLASS_KEY: {}}
+    for name_id, felt_count, byte_count in zip(ids, felts, num_bytes):
+        if felt_count != MISSING:
+            results[BYTECODE_KEY][names[name_id] + CASM_SUFFIX] = {"felts": felt_count}
+        if byte_count != MISSING:
+            results[CONTRACT_CLASS_KEY][names[name_id] + SIERRA_SUFFIX] = {"bytes": byte_count}
+    # Match the sorted file order of `benchmark_contracts`
+    return {key: dict(sorted(entries.items())) for key, entries in results.items()}
+
+
+def resolve_contract_name(names, contract):
+    """Matches a full artifact stem first, then the short contract name from `try_get_name`."""
+    if contract in names:
+        return [contract]
+    return sorted({name for name in names if try_get_name(name) == contract})
+
+
+def read_contract_series(path, contract):
+    """
+    Returns the size of one contract in every record that measured it, oldest first.
+    `contract` is either the artifact stem or the short contract name.
+    """
+    names = []
+    name_id = None
+    series = []
+    with _open_history(path) as f:
+        for record in _scan_records(f, names):
+            if name_id is None:
+                matches = resolve_contract_name(names, contract)
+                if len(matches) > 1:
+                    raise ValueError(f"ambiguous contract name {contract!r}: {', '.join(matches)}")
+                if not matches:
+                    continue
+                name_id = names.index(matches[0])
+            ids = _read_column(f, record, 0)
+            try:
+                row = ids.index(name_id)
+            except ValueError:
+                continue
+            felts = _read_cell(f, record, 1, row)
+            num_bytes = _read_cell(f, record, 2, row)
+            series.append(SeriesPoint(
+                record.commit,
+                record.scarb_version,
+                record.timestamp,
+                None if felts == MISSING else felts,
+                None if num_bytes == MISSING else num_bytes,
+            ))
+    return series
+
+
+def read_all_series(path):
+    """
+    Returns the sizes of every contract in every record that measured it, oldest first,
+    as {artifact stem: [SeriesPoint, ...]}, in a single pass over the file.
+    """
+    names = []
+    series = {}
+    with _open_history(path) as f:
+        for record in _scan_records(f, names):
+            ids, felts, num_bytes = (_read_column(f, record, i) for i in range(3))
+            for name_id, felt_count, byte_count in zip(ids, felts, num_bytes):
+                series.setdefault(names[name_id], []).append(SeriesPoint(
+                    record.commit,
+                    record.scarb_version,
+                    record.timestamp,
+                    None if felt_count == MISSING else felt_count,
+                    None if byte_count == MISSING else byte_count,
+                ))
+    return series
+
+
+def append_history(path, results, commit, scarb_version, timestamp=None, skip_unchanged=False):
+    """
+    Appends a benchmark run to the history at `path`, creating it if needed. With
+    `skip_unchanged`, nothing is written if the sizes match the latest record.
+    Returns whether a record was appended.
+    """
+    rows = {}
+    for file, info in results.get(BYTECODE_KEY, {}).items():
+        rows.setdefault(contract_stem(file), [MISSING, MISSING])[0] = info.get("felts", MISSING)
+    for file, info in results.get(CONTRACT_CLASS_KEY, {}).items():
+        rows.setdefault(contract_stem(file), [MISSING, MISSING])[1] = info.get("bytes", MISSING)
+
+    names = []
+    latest = None
+    if os.path.exists(path):
+        with _open_history(path) as f:
+            for latest in _scan_records(f, names):
+                pass
+    if skip_unchanged and latest is not None and read_history_snapshot(path) == _results_sizes(results):
+        return False
+
+    name_ids = {name: i for i, name in enumerate(names)}
+    delta = bytearray()
+    for name in sorted(rows):
+        if name not in name_ids:
+            name_ids[name] = len(name_ids)
+            encoded = name.encode("utf-8")
+            delta += NAME_LENGTH.pack(len(encoded)) + encoded
+
+    ordered = sorted(rows, key=name_ids.get)
+    commit_bytes = commit.encode("utf-8")
+    scarb_bytes = scarb_version.encode("utf-8")
+    columns = b"".join([
+        _pack_column(name_ids[name] for name in ordered),
+        _pack_column(rows[name][0] for name in ordered),
+        _pack_column(rows[name][1] for name in ordered),
+    ])
+    payload_size = len(commit_bytes) + len(scarb_bytes) + len(delta) + len(columns)
+    header = RECORD_HEADER.pack(
+        payload_size,
+        int(time.time()) if timestamp is None else timestamp,
+        len(commit_bytes),
+        len(scarb_bytes),
+        len(delta),
+        len(ordered),
+    )
+
+    record = header + commit_bytes + scarb_bytes + bytes(delta) + columns
+    with open(path, "ab") as f:
+        if f.tell() == 0:
+            f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+        f.write(record)
+    return True
+
+
+def _results_sizes(results):
+    """Drops error entries, matching what a history snapshot can hold."""
+    return {
+        BYTECODE_KEY: dict(sorted((file, info) for file, info in results.get(BYTECODE_KEY, {}).items() if "felts" in info)),
+        CONTRACT_CLASS_KEY: dict(sorted((file, info) for file, info in results.get(CONTRACT_CLASS_KEY, {}).items() if "bytes" in info)),
+    }
+
+
+def get_current_commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return "unknown"
+    return proc.stdout.strip() if proc.returncode == 0 else "unknown"
+
+
+def get_workspace_scarb_version():
+    try:
+        with open(SCARB_MANIFEST, "r") as f:
+            match = SCARB_VERSION_PATTERN.search(f.read())
+    except OSError:
+        return "unknown"
+    return match.group(1) if match else "unknown"
+
+
+def load_benchmark(path, commit=None):
+    """Loads a benchmark from a JSON file or, for a history file, the snapshot at `commit`."""
+    if is_history_file(path):
+        return read_history_snapshot(path, commit)
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query a contract-size benchmark history file.")
+    parser.add_argument("history", help="Path to the history file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("records", help="List the recorded benchmark runs")
+    series_parser = subparsers.add_parser("series", help="Print one contract's sizes over time")
+    series_parser.add_argument("contract", help="Contract name or artifact stem")
+    snapshot_parser = subparsers.add_parser("snapshot", help="Print all sizes at a commit as benchmark JSON")
+    snapshot_parser.add_argument("--commit", help="Commit (or prefix) to read (default: latest record)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "records":
+            for record in read_history_records(args.history):
+                print(f"{record.commit}\t{record.scarb_version}\t{record.timestamp}\t{record.count} contracts")
+        elif args.command == "series":
+            print(json.dumps([point._asdict() for point in read_contract_series(args.history, args.contract)], indent=2))
+        else:
+            print(json.dumps(read_history_snapshot(args.history, args.commit), indent=2))
+    except (OSError, ValueError) as e:
+        print(f"Error reading benchmark history: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,216 @@
+import os
+import re
+import sys
+import json
+from collections import Counter
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from artifact_manifest import ArtifactManifest
+from benchmark import (
+    RESET, BOLD, YELLOW, GREEN, RED, CYAN, BYTECODE_KEY, CASM_SUFFIX, SIERRA_SUFFIX, list_artifacts, try_get_name,
+)
+
+BREAKDOWN_KEY = "breakdown"
+
+ENTRY_POINT_TYPES = ["EXTERNAL", "L1_HANDLER", "CONSTRUCTOR"]
+
+# Number of leading module path segments a function is grouped under, e.g.
+# "openzeppelin_token::erc20::erc20::ERC20Component::InternalImpl::_transfer" -> "openzeppelin_token::erc20"
+DEFAULT_GROUP_DEPTH = 2
+DEFAULT_TOP = 10
+
+GENERIC_ARGS_RE = re.compile(r"<[^<>]*>")
+UNNAMED_FUNCTION = "function #{}"
+UNATTRIBUTED = "(unattributed)"
+
+
+def flatten_segment_lengths(lengths):
+    """Flattens a CASM `bytecode_segment_lengths` NestedIntList into its leaf lengths."""
+    if isinstance(lengths, int):
+        return [lengths]
+    leaves = []
+    for item in lengths:
+        leaves.extend(flatten_segment_lengths(item))
+    return leaves
+
+
+def strip_generic_args(name):
+    previous = None
+    while previous != name:
+        previous, name = name, GENERIC_ARGS_RE.sub("", name)
+    # "Impl::<T>::f" leaves an empty path segment behind
+    return name.replace("::::", "::")
+
+
+def group_of(function_name, depth=DEFAULT_GROUP_DEPTH):
+    path = strip_generic_args(function_name).split("::")
+    return "::".join(path[:depth]) if len(path) > 1 else UNATTRIBUTED
+
+
+def read_sierra_function_names(sierra_path):
+    """
+    Returns the Sierra user function names ordered by function id, and the Sierra entry points
+    as {selector: function index}. Both are empty if the artifact or its debug info is missing;
+    the names are also empty unless the debug info names every function id from 0 on.
+    """
+    try:
+        with open(sierra_path, "r") as f:
+            sierra = json.load(f)
+    except (OSError, ValueError):
+        return [], {}
+    debug_info = sierra.get("sierra_program_debug_info") or {}
+    pairs = debug_info.get("user_func_names") or []
+    pairs = sorted(pairs, key=lambda pair: pair[0])
+    names = [name for _, name in pairs]
+    if [function_id for function_id, _ in pairs] != list(range(len(pairs))):
+        names = []
+    entry_points = {}
+    for entry_point_type in ENTRY_POINT_TYPES:
+        for entry_point in (sierra.get("entry_points_by_type") or {}).get(entry_point_type, []):
+            entry_points[int(entry_point["selector"], 16)] = entry_point["function_idx"]
+    return names, entry_points
+
+
+def read_function_segments(casm, sierra_path=None, warnings=None):
+    """
+    Splits the CASM bytecode of a contract into its Sierra functions, as (name, offset, length).
+    Also returns the Sierra entry points as {selector: function index}.
+
+    The compiler emits one bytecode segment per Sierra function, in function id order, so
+    `bytecode_segment_lengths` lines up with the Sierra debug names. Without segment lengths
+    no functions are returned; without names, they are numbered. If the segment and function
+    counts differ, the positions can't be trusted: the functions are numbered, the Sierra
+    entry points are dropped, and the reason is appended to `warnings` if given.
+    """
+    warnings = [] if warnings is None else warnings
+    total = len(casm.get(BYTECODE_KEY, []))
+    segments = flatten_segment_lengths(casm.get("bytecode_segment_lengths", []))
+    if sum(segments) != total:
+        if segments:
+            warnings.append(f"bytecode segment lengths add up to {sum(segments)} felts, not {total}")
+        segments = []
+
+    names, sierra_entry_points = read_sierra_function_names(sierra_path) if sierra_path else ([], {})
+    if names and len(names) != len(segments):
+        warnings.append(f"{len(segments)} bytecode segments but {len(names)} Sierra functions, names not attributed")
+        sierra_entry_points = {}
+    if len(names) != len(segments):
+        names = [UNNAMED_FUNCTION.format(i) for i in range(len(segments))]
+
+    functions = []
+    offset = 0
+    for name, length in zip(names, segments):
+        functions.append((name, offset, length))
+        offset += length
+    return functions, sierra_entry_points
+
+
+def breakdown_contract(casm_path, sierra_path=None, group_depth=DEFAULT_GROUP_DEPTH):
+    """
+    Attributes the CASM bytecode of a contract to Sierra functions and module groups.
+    Entry points are mapped to the function they call, or else to the one containing their
+    offset. Without segment lengths, the bytecode is left unattributed.
+    """
+    with open(casm_path, "r") as f:
+        casm = json.load(f)
+    total = len(casm.get(BYTECODE_KEY, []))
+    warnings = []
+    segments, sierra_entry_points = read_function_segments(casm, sierra_path, warnings)
+    names = [name for name, _, _ in segments]
+
+    functions = Counter()
+    groups = Counter()
+    starts = []
+    for name, offset, length in segments:
+        functions[name] += length
+        groups[group_of(name, group_depth)] += length
+        starts.append((offset, name))
+    if not segments:
+        groups[UNATTRIBUTED] = total
+
+    entry_points = {}
+    for entry_point_type in ENTRY_POINT_TYPES:
+        for entry_point in casm.get("entry_points_by_type", {}).get(entry_point_type, []):
+            selector = int(entry_point["selector"], 16)
+            function_idx = sierra_entry_points.get(selector)
+            if function_idx is not None and function_idx < len(names):
+                label = names[function_idx]
+            else:
+                label = next((name for start, name in reversed(starts) if start <= entry_point["offset"]), None)
+            entry_points[f"{entry_point_type} {hex(selector)}"] = {
+                "offset": entry_point["offset"],
+                "function": label,
+                "felts": functions.get(label),
+            }
+
+    breakdown = {
+        "total": total,
+        "groups": dict(groups.most_common()),
+        "functions": dict(functions.most_common()),
+        "entry_points": entry_points,
+    }
+    if warnings:
+        breakdown["warnings"] = warnings
+    return breakdown
+
+
+def list_casm_artifacts(target_dir):
+    """
+    Yields (file, CASM path, matching Sierra path) for each CASM artifact that `list_artifacts`
+    finds, in sorted order. The artifact manifest pairs each CASM artifact with its Sierra
+    class; files listed without a manifest are paired by name.
+    """
+    manifest = ArtifactManifest(target_dir)
+    for kind, file in list_artifacts(target_dir):
+        if kind != BYTECODE_KEY:
+            continue
+        try:
+            entry = manifest.entry_for_file(file)
+        except (OSError, ValueError):
+            entry = None
+        if entry is not None and entry.sierra is not None:
+            sierra = entry.sierra
+        else:
+            sierra = (file[:-len(CASM_SUFFIX)] if file.endswith(CASM_SUFFIX) else file) + SIERRA_SUFFIX
+        yield file, os.path.join(target_dir, file), os.path.join(target_dir, sierra)
+
+
+def breakdown_contracts(target_dir, group_depth=DEFAULT_GROUP_DEPTH):
+    results = {BREAKDOWN_KEY: {}}
+    for file, path, sierra_path in list_casm_artifacts(target_dir):
+        try:
+            results[BREAKDOWN_KEY][file] = breakdown_contract(path, sierra_path, group_depth)
+        except Exception as e:
+            results[BREAKDOWN_KEY][file] = {"error": str(e)}
+    return results
+
+
+def flatten_breakdown(breakdown, section="groups"):
+    """
+    Flattens a breakdown into {"<Contract> <group>": {"felts": n}} entries, the shape
+    benchmark_diff compares.
+    """
+    entries = {}
+    for file, info in breakdown.items():
+        for name, felts in info.get(section, {}).items():
+            entries[f"{try_get_name(file)} {name}"] = {"felts": felts}
+    return entries
+
+
+def print_breakdown(results, top=DEFAULT_TOP):
+    print(f"{BOLD}{CYAN}CASM bytecode breakdown (top {top} contributors):{RESET}")
+    for file, info in results[BREAKDOWN_KEY].items():
+        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        if "error" in info:
+            print(f"{RED}Error processing {file}: {info['error']}{RESET}")
+            continue
+        total = info["total"]
+        print(f"\n{name}: {BOLD}{GREEN}{total} felts{RESET}")
+        for warning in info.get("warnings", []):
+            print(f"  {YELLOW}⚠️  {warning}{RESET}")
+        for label in ("groups", "functions"):
+            print(f"  {label}:")
+            for item, felts in list(info[label].items())[:top]:
+                share = 100 * felts / total if total else 0
+                print(f"    {felts:>7} felts {share:5.1f}%  {item}")
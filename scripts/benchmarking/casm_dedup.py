@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmark import RESET, BOLD, YELLOW, GREEN, RED, CYAN, TARGET_DIR, BYTECODE_KEY, try_get_name
+from class_hash import STARK_FIELD_PRIME
+from casm_breakdown import DEFAULT_GROUP_DEPTH, DEFAULT_TOP, group_of, list_casm_artifacts, read_function_segments, strip_generic_args
+
+DEDUP_KEY = "dedup"
+
+# CASM instruction flags, stored above the three 16-bit offsets of the instruction word
+FLAGS_SHIFT = 48
+OP1_IMM_FLAG = 1 << 2
+PC_UPDATE_SHIFT = 7
+PC_UPDATE_MASK = 0b111
+PC_UPDATE_JUMP_REL = 2
+EXTERNAL_TARGET = "<outside>"
+
+
+def signed_felt(value):
+    return value - STARK_FIELD_PRIME if value > STARK_FIELD_PRIME // 2 else value
+
+
+def function_fingerprint(bytecode, offset, length, callee_names):
+    """
+    Hashes the bytecode of one function so that identical component code matches across
+    contracts. Relative calls and jumps that leave the function depend on where the
+    compiler placed the target, so their immediates are replaced by the target's name
+    (generic arguments stripped) before hashing.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    end = offset + length
+    pc = offset
+    while pc < end:
+        word = int(bytecode[pc], 16)
+        digest.update(bytecode[pc].encode("ascii"))
+        flags = word >> FLAGS_SHIFT
+        if not flags & OP1_IMM_FLAG or pc + 1 >= end:
+            digest.update(b",")
+            pc += 1
+            continue
+        immediate = bytecode[pc + 1]
+        if (flags >> PC_UPDATE_SHIFT) & PC_UPDATE_MASK == PC_UPDATE_JUMP_REL:
+            target = pc + signed_felt(int(immediate, 16))
+            if not offset <= target < end:
+                immediate = callee_names.get(target, EXTERNAL_TARGET)
+        digest.update(b" " + immediate.encode("ascii") + b",")
+        pc += 2
+    return digest.hexdigest()
+
+
+def fingerprint_contract(casm_path, sierra_path):
+    """
+    Returns the (fingerprint, name, felts) of every function in a contract. Contracts without
+    `bytecode_segment_lengths` are fingerprinted as a single block.
+    """
+    with open(casm_path, "r") as f:
+        casm = json.load(f)
+    bytecode = casm.get(BYTECODE_KEY, [])
+    segments, _ = read_function_segments(casm, sierra_path)
+    if not segments:
+        segments = [("(whole contract)", 0, len(bytecode))]
+    callee_names = {offset: strip_generic_args(name) for name, offset, _ in segments}
+    return [
+        (function_fingerprint(bytecode, offset, length, callee_names), strip_generic_args(name), length)
+        for name, offset, length in segments
+        if length
+    ]
+
+
+def _fingerprint_artifact(casm_path, sierra_path):
+    try:
+        return fingerprint_contract(casm_path, sierra_path)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def analyze_duplication(target_dir, jobs=1, group_depth=DEFAULT_GROUP_DEPTH, min_contracts=2):
+    """
+    Fingerprints every function of every CASM artifact in `target_dir` and indexes the
+    fingerprints, so code shared by several contracts is found without comparing them pairwise.
+
+    A function counts as shared when its fingerprint appears in at least `min_contracts`
+    contracts. "duplicated_felts" is what the extra copies cost: felts * (contracts - 1).
+    """
+    artifacts = list(list_casm_artifacts(target_dir))
+    casm_paths = [path for _, path, _ in artifacts]
+    sierra_paths = [sierra_path for _, _, sierra_path in artifacts]
+    if jobs > 1 and len(artifacts) > 1:
+        chunksize = max(1, len(artifacts) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            fingerprints = list(executor.map(_fingerprint_artifact, casm_paths, sierra_paths, chunksize=chunksize))
+    else:
+        fingerprints = map(_fingerprint_artifact, casm_paths, sierra_paths)
+
+    index = {}
+    contracts = {}
+    errors = {}
+    for (file, _, _), functions in zip(artifacts, fingerprints):
+        if isinstance(functions, dict):
+            errors[file] = functions
+            continue
+        contracts[file] = functions
+        for fingerprint, name, felts in functions:
+            entry = index.setdefault(fingerprint, {"name": name, "felts": felts, "contracts": set()})
+            entry["contracts"].add(file)
+
+    shared = {fingerprint for fingerprint, entry in index.items() if len(entry["contracts"]) >= min_contracts}
+
+    per_contract = {}
+    for file, functions in contracts.items():
+        total = sum(felts for _, _, felts in functions)
+        shared_felts = sum(felts for fingerprint, _, felts in functions if fingerprint in shared)
+        per_contract[file] = {"felts": total, "shared_felts": shared_felts, "unique_felts": total - shared_felts}
+    per_contract.update(errors)
+
+    functions = []
+    groups = {}
+    for fingerprint in shared:
+        entry = index[fingerprint]
+        count = len(entry["contracts"])
+        duplicated = entry["felts"] * (count - 1)
+        functions.append({
+            "name": entry["name"],
+            "fingerprint": fingerprint,
+            "felts": entry["felts"],
+            "contracts": count,
+            "duplicated_felts": duplicated,
+        })
+        group = groups.setdefault(group_of(entry["name"], group_depth), {"functions": 0, "contracts": set(), "duplicated_felts": 0})
+        group["functions"] += 1
+        group["contracts"].update(entry["contracts"])
+        group["duplicated_felts"] += duplicated
+    functions.sort(key=lambda function: (-function["duplicated_felts"], function["name"], function["fingerprint"]))
+
+    total_felts = sum(info["felts"] for info in per_contract.values() if "felts" in info)
+    distinct_felts = sum(entry["felts"] for entry in index.values())
+    return {DEDUP_KEY: {
+        "summary": {
+            "contracts": len(contracts),
+            "total_felts": total_felts,
+            "distinct_felts": distinct_felts,
+            "shared_felts": sum(index[fingerprint]["felts"] for fingerprint in shared),
+            "duplicated_felts": total_felts - distinct_felts,
+        },
+        "groups": {
+            name: {**group, "contracts": len(group["contracts"])}
+            for name, group in sorted(groups.items(), key=lambda item: (-item[1]["duplicated_felts"], item[0]))
+        },
+        "functions": functions,
+        "contracts": per_contract,
+    }}
+
+
+def print_duplication(results, top=DEFAULT_TOP):
+    dedup = results[DEDUP_KEY]
+    summary = dedup["summary"]
+    total = summary["total_felts"]
+    share = 100 * summary["duplicated_felts"] / total if total else 0
+    print(f"{BOLD}{CYAN}Cross-contract code duplication:{RESET}")
+    print(
+        f"{summary['contracts']} contracts, {BOLD}{GREEN}{total} felts{RESET} of bytecode, "
+        f"{summary['distinct_felts']} distinct, {BOLD}{YELLOW}{summary['duplicated_felts']} duplicated ({share:.1f}%){RESET}"
+    )
+
+    print(f"\n{BOLD}{CYAN}Duplicated felts by module (top {top}):{RESET}")
+    for name, group in list(dedup["groups"].items())[:top]:
+        print(f"  {group['duplicated_felts']:>8} felts  {group['functions']:>4} functions in {group['contracts']:>3} contracts  {name}")
+
+    print(f"\n{BOLD}{CYAN}Most duplicated functions (top {top}):{RESET}")
+    for function in dedup["functions"][:top]:
+        print(f"  {function['duplicated_felts']:>8} felts  {function['felts']:>6} x {function['contracts']:>3} contracts  {function['name']}")
+
+    print(f"\n{BOLD}{CYAN}Shared vs unique bytecode per contract:{RESET}")
+    for file, info in dedup["contracts"].items():
+        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        if "error" in info:
+            print(f"{RED}Error processing {file}: {info['error']}{RESET}")
+            continue
+        print(f"{name}: {info['shared_felts']} shared, {info['unique_felts']} unique of {info['felts']} felts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find component code duplicated across contract artifacts.")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    parser.add_argument("--dir", type=str, default=TARGET_DIR, help="Target directory (default: target/release)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes used to fingerprint artifacts (default: 1)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Number of modules and functions listed (default: {DEFAULT_TOP})")
+    parser.add_argument("--group-depth", type=int, default=DEFAULT_GROUP_DEPTH, help=f"Module path segments used to group functions (default: {DEFAULT_GROUP_DEPTH})")
+    parser.add_argument("--min-contracts", type=int, default=2, help="Contracts a function must appear in to count as shared (default: 2)")
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.min_contracts < 2:
+        parser.error("--min-contracts must be at least 2")
+
+    results = analyze_duplication(args.dir, args.jobs, args.group_depth, args.min_contracts)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_duplication(results, args.top)
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+from benchmark import RESET, BOLD, YELLOW, GREEN, RED, CYAN
+
+GAS_KEY = "gas"
+
+# What every scenario measures, printed with the results and stored in each entry
+GAS_SCOPE = "whole snforge test, including setup and deploys"
+
+# Metrics diffed by benchmark_diff.py
+GAS_METRICS = ["l2_gas", "steps", "storage_writes", "events"]
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# Hot entry points, each measured through an existing snforge test that exercises it: the
+# preset tests (ERC20, account, ERC721, with openzeppelin_test_common helpers and mocks), the
+# governor tests on the openzeppelin_test_common governor mocks, and the Merkle proof tests.
+# snforge only reports resources per test, so every number is a whole-test total that
+# includes the test's setup and deploys, not the cost of a single entry point call. Track a
+# scenario against itself over time rather than comparing scenarios or reading it as a fee.
+SCENARIOS = {
+    "ERC20_transfer": ("openzeppelin_presets", "openzeppelin_presets::tests::test_erc20::test_transfer"),
+    "ERC20_transfer_from": ("openzeppelin_presets", "openzeppelin_presets::tests::test_erc20::test_transfer_from"),
+    "Account___execute__": ("openzeppelin_presets", "openzeppelin_presets::tests::test_account::test_execute"),
+    "Account___validate__": ("openzeppelin_presets", "openzeppelin_presets::tests::test_account::test_validate"),
+    "ERC721_safe_transfer_from": (
+        "openzeppelin_presets",
+        "openzeppelin_presets::tests::test_erc721::test_safe_transfer_from_to_account",
+    ),
+    "Governor_cast_vote": (
+        "openzeppelin_governance",
+        "openzeppelin_governance::tests::governor::timestamp::test_governor::test_cast_vote_active",
+    ),
+    "Governor_execute": (
+        "openzeppelin_governance",
+        "openzeppelin_governance::tests::governor::timestamp::test_governor::test_execute",
+    ),
+    "Merkle_verify_pedersen": (
+        "openzeppelin_merkle_tree",
+        "openzeppelin_merkle_tree::tests::merkle_proof::test_with_pedersen::test_valid_merkle_proof",
+    ),
+    "Merkle_verify_poseidon": (
+        "openzeppelin_merkle_tree",
+        "openzeppelin_merkle_tree::tests::merkle_proof::test_with_poseidon::test_valid_merkle_proof",
+    ),
+}
+
+# snforge test result line, e.g. "[PASS] pkg::tests::test_x (l1_gas: ~0, l1_data_gas: ~96, l2_gas: ~80000)"
+RESULT_LINE_RE = re.compile(r"^\[(PASS|FAIL)\] (\S+)(?: \((.*)\))?\s*$")
+GAS_ESTIMATE_RE = re.compile(r"(\w+): ~?(\d+)")
+# --detailed-resources lines, e.g. "        steps: 3405" or "        syscalls: (StorageWrite: 2, EmitEvent: 1)"
+RESOURCE_LINE_RE = re.compile(r"^\s+([a-z][a-z ]*): (\d+)\s*$")
+RESOURCE_GROUP_RE = re.compile(r"^\s+([a-z][a-z ]*): \((.*)\)\s*$")
+RESOURCE_ITEM_RE = re.compile(r"(\w+): (\d+)")
+
+
+def resource_key(label):
+    return label.strip().replace(" ", "_")
+
+
+def parse_snforge_resources(output):
+    """
+    Extracts per-test gas estimates and --detailed-resources reports from snforge output.
+    Returns a dict keyed by the full test path.
+    """
+    tests = {}
+    current = None
+    for line in output.splitlines():
+        result = RESULT_LINE_RE.match(line)
+        if result:
+            status, path, estimates = result.groups()
+            current = {"status": status}
+            for key, value in GAS_ESTIMATE_RE.findall(estimates or ""):
+                # Older snforge releases report a single "gas" estimate
+                current["l2_gas" if key == "gas" else key] = int(value)
+            tests[path] = current
+            continue
+        if current is None:
+            continue
+        group = RESOURCE_GROUP_RE.match(line)
+        if group:
+            label, items = group.groups()
+            current[resource_key(label)] = {name: int(value) for name, value in RESOURCE_ITEM_RE.findall(items)}
+            continue
+        resource = RESOURCE_LINE_RE.match(line)
+        if resource:
+            current[resource_key(resource.group(1))] = int(resource.group(2))
+        elif line and not line[0].isspace():
+            current = None
+    return tests
+
+
+def summarize_test(report):
+    """Flattens a parsed test report into the metrics stored in the benchmark JSON."""
+    if report.get("status") != "PASS":
+        return {"error": "test failed"}
+    syscalls = report.get("syscalls", {})
+    summary = {
+        "l2_gas": report.get("l2_gas"),
+        "l1_data_gas": report.get("l1_data_gas"),
+        "steps": report.get("steps"),
+        "sierra_gas": report.get("sierra_gas"),
+        "storage_reads": syscalls.get("StorageRead", 0),
+        "storage_writes": syscalls.get("StorageWrite", 0),
+        "events": syscalls.get("EmitEvent", 0),
+        "builtins": report.get("builtins", {}),
+        "syscalls": syscalls,
+    }
+    return {key: value for key, value in summary.items() if value is not None}
+
+
+def run_snforge(package, test_path):
+    cmd = ["snforge", "test", "--package", package, test_path, "--exact", "--detailed-resources"]
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    return proc.stdout
+
+
+def benchmark_gas(scenarios):
+    """Runs each scenario's snforge test and collects its resource report."""
+    results = {GAS_KEY: {}}
+    for name in sorted(scenarios):
+        package, test_path = scenarios[name]
+        try:
+            report = parse_snforge_resources(run_snforge(package, test_path)).get(test_path)
+            if report is None:
+                results[GAS_KEY][name] = {"error": f"no result for {test_path}"}
+            else:
+                results[GAS_KEY][name] = {**summarize_test(report), "test": test_path, "scope": GAS_SCOPE}
+        except Exception as e:
+            results[GAS_KEY][name] = {"error": str(e)}
+    return results
+
+
+def print_gas_results(results):
+    print(f"{BOLD}{CYAN}Execution resources ({GAS_SCOPE}):{RESET}")
+    for name, info in results[GAS_KEY].items():
+        label = f"{BOLD}{YELLOW}{name}{RESET}"
+        if "error" in info:
+            print(f"{RED}Error processing {name}: {info['error']}{RESET}")
+            continue
+        metrics = ", ".join(f"{metric}: {info[metric]}" for metric in GAS_METRICS if metric in info)
+        print(f"{label}: {BOLD}{GREEN}{metrics}{RESET}")
+        if info.get("builtins"):
+            builtins = ", ".join(f"{builtin}: {count}" for builtin, count in sorted(info["builtins"].items()))
+            print(f"    builtins: {builtins}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark execution resources of the snforge tests exercising hot Cairo entry points (whole-test totals).")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS), help="Run only this scenario (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and the tests whose totals they report.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (package, test_path) in sorted(SCENARIOS.items()):
+            print(f"{name}: {test_path} ({package})")
+        sys.exit(0)
+
+    scenarios = {name: SCENARIOS[name] for name in args.only} if args.only else SCENARIOS
+    results = benchmark_gas(scenarios)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{BOLD}Benchmarking execution resources with snforge\n{RESET}")
+        print_gas_results(results)
@@ -0,0 +1,163 @@
+import sys
+import json
+import argparse
+
+from benchmark import RESET, BOLD, YELLOW, GREEN, RED, CYAN, BYTECODE_KEY, CONTRACT_CLASS_KEY, try_get_name
+from benchmark_diff import MAX_BYTECODE_SIZE, MAX_CONTRACT_CLASS_SIZE
+from benchmark_history import contract_stem, is_history_file, load_benchmark, read_all_series
+
+HEADROOM_KEY = "headroom"
+
+# Number of most recent snapshots the growth trend is fitted on
+DEFAULT_WINDOW = 10
+# Contracts projected to hit a limit within this many snapshots are flagged as urgent
+DEFAULT_WARN_STEPS = 20
+
+LIMITS = {"felts": MAX_BYTECODE_SIZE, "bytes": MAX_CONTRACT_CLASS_SIZE}
+
+
+def series_from_snapshots(snapshots):
+    """Turns benchmark reports, oldest first, into {artifact stem: {"felts": [...], "bytes": [...]}}."""
+    series = {}
+    for snapshot in snapshots:
+        for key, metric in ((BYTECODE_KEY, "felts"), (CONTRACT_CLASS_KEY, "bytes")):
+            for file, info in snapshot.get(key, {}).items():
+                if metric in info:
+                    values = series.setdefault(contract_stem(file), {"felts": [], "bytes": []})
+                    values[metric].append(info[metric])
+    return series
+
+
+def series_from_history(path):
+    series = {}
+    for name, points in read_all_series(path).items():
+        series[name] = {
+            "felts": [point.felts for point in points if point.felts is not None],
+            "bytes": [point.bytes for point in points if point.bytes is not None],
+        }
+    return series
+
+
+def fit_slope(values):
+    """Least-squares growth per snapshot of `values`, or None with fewer than two points."""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    variance = sum((x - mean_x) ** 2 for x in range(n))
+    return covariance / variance
+
+
+def project_metric(values, limit, window=DEFAULT_WINDOW):
+    """
+    Projects when `values` reaches `limit`, extending the linear trend of the last `window`
+    points from the latest value. "steps_left" is the number of further snapshots (commits or
+    releases, whatever the series was sampled at) that fit below the limit: 0 if already
+    over it, None if the trend is flat or shrinking.
+    """
+    latest = values[-1]
+    slope = fit_slope(values[-window:])
+    if latest >= limit:
+        steps_left = 0
+    elif slope is None or slope <= 0:
+        steps_left = None
+    else:
+        steps_left = int((limit - 1 - latest) // slope)
+    return {
+        "latest": latest,
+        "limit": limit,
+        "used_pct": round(100 * latest / limit, 2),
+        "growth_per_step": None if slope is None else round(slope, 2),
+        "steps_left": steps_left,
+    }
+
+
+def urgency_key(entry):
+    steps_left = entry["steps_left"]
+    # Projected contracts first, soonest first; then the rest by how full they already are
+    return (steps_left is None, steps_left if steps_left is not None else 0, -entry["used_pct"], entry["contract"])
+
+
+def project_headroom(series, window=DEFAULT_WINDOW):
+    """Projects every contract's headroom against the Starknet size limits, most urgent first."""
+    entries = []
+    for name, metrics in series.items():
+        projections = {
+            metric: project_metric(values, LIMITS[metric], window)
+            for metric, values in metrics.items()
+            if values
+        }
+        if not projections:
+            continue
+        # The binding limit is the one reached first, or else the one closest to full
+        binding = min(projections, key=lambda metric: urgency_key({**projections[metric], "contract": name}))
+        entries.append({
+            "contract": name,
+            "binding_metric": binding,
+            "steps_left": projections[binding]["steps_left"],
+            "used_pct": projections[binding]["used_pct"],
+            "snapshots": max(len(values) for values in metrics.values()),
+            **projections,
+        })
+    entries.sort(key=urgency_key)
+    return {HEADROOM_KEY: entries}
+
+
+def print_headroom(results, top, warn_steps=DEFAULT_WARN_STEPS):
+    print(f"{BOLD}{CYAN}Headroom against Starknet limits (felts: {MAX_BYTECODE_SIZE:,}, bytes: {MAX_CONTRACT_CLASS_SIZE:,}):{RESET}")
+    for entry in results[HEADROOM_KEY][:top]:
+        name = f"{BOLD}{YELLOW}{try_get_name(entry['contract'])}{RESET}"
+        projection = entry[entry["binding_metric"]]
+        steps_left = entry["steps_left"]
+        if steps_left == 0:
+            outlook = f"{RED}{BOLD}over the limit{RESET}"
+        elif steps_left is None:
+            outlook = f"{GREEN}not growing{RESET}"
+        elif steps_left <= warn_steps:
+            outlook = f"{RED}~{steps_left} snapshots left{RESET}"
+        else:
+            outlook = f"{GREEN}~{steps_left} snapshots left{RESET}"
+        growth = projection["growth_per_step"]
+        trend = "n/a" if growth is None else f"{growth:+}/snapshot"
+        print(
+            f"{name}: {projection['latest']:,} {entry['binding_metric']} "
+            f"({projection['used_pct']}% used, {trend}), {outlook}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project when contracts reach the Starknet size limits.")
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="A benchmark history file, or several benchmark JSON snapshots (oldest first, e.g. one per release)",
+    )
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help=f"Number of recent snapshots the trend is fitted on (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--top", type=int, default=20, help="Number of contracts listed (default: 20)")
+    parser.add_argument("--warn-steps", type=int, default=DEFAULT_WARN_STEPS, help=f"Flag contracts projected to hit a limit within this many snapshots (default: {DEFAULT_WARN_STEPS})")
+    parser.add_argument("--fail", action="store_true", help="Exit with status 1 if any contract is within --warn-steps of a limit")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    args = parser.parse_args()
+    if args.window < 2:
+        parser.error("--window must be at least 2")
+
+    try:
+        if len(args.sources) == 1 and is_history_file(args.sources[0]):
+            series = series_from_history(args.sources[0])
+        else:
+            series = series_from_snapshots([load_benchmark(path) for path in args.sources])
+    except (OSError, ValueError) as e:
+        print(f"{RED}Error loading benchmarks:\n{e}{RESET}")
+        sys.exit(1)
+
+    results = project_headroom(series, args.window)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_headroom(results, args.top, args.warn_steps)
+
+    urgent = [entry for entry in results[HEADROOM_KEY] if entry["steps_left"] is not None and entry["steps_left"] <= args.warn_steps]
+    if args.fail and urgent:
+        sys.exit(1)
@@ -0,0 +1,752 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import secrets
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmark import RESET, BOLD, YELLOW, GREEN, RED, CYAN, TARGET_DIR
+from artifact_manifest import ArtifactManifest
+from class_hash import (
+    compute_compiled_class_hash,
+    compute_sierra_class_hash,
+    encode_short_string,
+    get_selector_from_name,
+    poseidon_hash_many,
+)
+from generate_class_hashes import PRESETS_PACKAGE_NAME
+from signing import get_stark_public_key, stark_sign_batch
+from stark_curve import EC_ORDER
+
+LOAD_KEY = "load"
+LOAD_RUN_KEY = "load_run"
+
+# Presets deployed for the load test, in declaration order
+LOAD_PRESETS = ["AccountUpgradeable", "ERC20Upgradeable", "ERC721Upgradeable", "UniversalDeployer", "VestingWallet"]
+
+# Operation mix: relative weights, overridable with --mix
+OPERATIONS = ["transfer", "approve", "mint", "multicall", "release"]
+DEFAULT_MIX = "transfer=4,approve=2,mint=1,multicall=2,release=1"
+LATENCY_PERCENTILES = [50, 90, 99]
+
+DEFAULT_RPC_URL = "http://127.0.0.1:5050/rpc"
+DEVNET_COMMAND = "starknet-devnet"
+DEVNET_INITIAL_BALANCE = 10 ** 30
+SIERRA_COMPILER_COMMAND = "universal-sierra-compiler"
+
+# Predeployed on starknet-devnet
+DEVNET_UDC = 0x041A78E741E5AF2FEC34B695679BC6891742439F7AFB8484ECD7766661AD02BF
+STRK_TOKEN = 0x04718F5A0FC34CC1AF16A1CDEE98FFB20C31F5CD61D6AB07201858F4287C938D
+
+TRANSFER_SELECTOR = get_selector_from_name("transfer")
+APPROVE_SELECTOR = get_selector_from_name("approve")
+RELEASE_SELECTOR = get_selector_from_name("release")
+DEPLOY_CONTRACT_SELECTOR = get_selector_from_name("deployContract")
+CONTRACT_DEPLOYED_SELECTOR = get_selector_from_name("ContractDeployed")
+
+# Invoke and declare v3 transaction hashes; fee estimates sign the query version instead
+INVOKE_PREFIX = encode_short_string("invoke")
+DECLARE_PREFIX = encode_short_string("declare")
+TRANSACTION_VERSION = 3
+QUERY_VERSION = 2 ** 128 + TRANSACTION_VERSION
+EMPTY_HASH = poseidon_hash_many([])
+# (hashed resource name, RPC resource bounds key), in hashing order
+RESOURCES = [("L1_GAS", "l1_gas"), ("L2_GAS", "l2_gas"), ("L1_DATA", "l1_data_gas")]
+DEFAULT_FEE_MARGIN = 1.5
+# Starknet 0.14.1 moved declare transactions to Blake2s compiled class hashes
+BLAKE2S_STARKNET_VERSION = (0, 14, 1)
+
+# JSON-RPC error codes that only mean "not there yet"
+CLASS_HASH_NOT_FOUND = 28
+TXN_HASH_NOT_FOUND = 29
+
+RECEIPT_POLL_INTERVAL = 0.02
+RECEIPT_TIMEOUT = 60
+DEVNET_STARTUP_TIMEOUT = 30
+BYTE_ARRAY_WORD_BYTES = 31
+
+# Load-test ERC20 supply and per-account funding; fees are paid in STRK (FRI)
+TOKEN_SUPPLY = 10 ** 30
+TOKEN_FUNDING = 10 ** 24
+DEFAULT_STRK_FUNDING = 10 ** 19
+VESTING_DURATION = 3600
+
+
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(f"{message} ({code})" + (f": {data}" if data else ""))
+        self.code = code
+        self.data = data
+
+
+class RpcConnection:
+    """A keep-alive HTTP/1.1 connection that POSTs JSON-RPC requests, one at a time."""
+
+    def __init__(self, host, port, path, use_ssl):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.use_ssl = use_ssl
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.use_ssl or None)
+
+    @property
+    def closed(self):
+        return self.writer is None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.reader = None
+
+    async def post(self, body):
+        head = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        self.writer.write(head.encode("ascii") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("RPC server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            payload = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                payload += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            payload = bytes(payload)
+        elif "content-length" in headers:
+            payload = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            payload = await self.reader.read()
+            self.close()
+
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        if status >= 400 and not payload:
+            raise RpcError(status, f"HTTP {status}")
+        return payload
+
+
+class RpcPool:
+    """
+    JSON-RPC client over at most `size` pooled keep-alive connections. Connections are
+    opened on demand and reused, so concurrent workers never pay a TCP handshake per call.
+    """
+
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported RPC URL: {url}")
+        self.url = url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        self.use_ssl = parts.scheme == "https"
+        self.size = size
+        self.idle = []
+        self.semaphore = asyncio.Semaphore(size)
+        self.next_id = 0
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def _connection(self):
+        while self.idle:
+            connection = self.idle.pop()
+            if not connection.closed:
+                return connection, True
+        connection = RpcConnection(self.host, self.port, self.path, self.use_ssl)
+        await connection.open()
+        self.connections_opened += 1
+        return connection, False
+
+    async def call(self, method, params=None):
+        self.next_id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params or {}}).encode()
+        async with self.semaphore:
+            connection, reused = await self._connection()
+            try:
+                try:
+                    payload = await connection.post(body)
+                except (OSError, asyncio.IncompleteReadError):
+                    # A reused connection may have been closed by the server while idle
+                    connection.close()
+                    if not reused:
+                        raise
+                    connection, _ = await self._connection()
+                    payload = await connection.post(body)
+            except BaseException:
+                connection.close()
+                raise
+            if not connection.closed:
+                self.idle.append(connection)
+        self.requests += 1
+        response = json.loads(payload)
+        if "error" in response:
+            error = response["error"]
+            raise RpcError(error.get("code"), error.get("message", "RPC error"), error.get("data"))
+        return response["result"]
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+def to_int(value):
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+def encode_byte_array(text):
+    """Serializes a Cairo ByteArray: full 31-byte words, then the pending word and its length."""
+    data = text.encode("utf-8")
+    split = len(data) - len(data) % BYTE_ARRAY_WORD_BYTES
+    words = [int.from_bytes(data[i:i + BYTE_ARRAY_WORD_BYTES], "big") for i in range(0, split, BYTE_ARRAY_WORD_BYTES)]
+    pending = data[split:]
+    return [len(words), *words, int.from_bytes(pending, "big"), len(pending)]
+
+
+def encode_u256(value):
+    return [value & (2 ** 128 - 1), value >> 128]
+
+
+def execute_calldata(calls):
+    """`__execute__` calldata of an `Array<Call>` of (to, selector, calldata) calls."""
+    calldata = [len(calls)]
+    for to, selector, call_data in calls:
+        calldata += [to, selector, len(call_data), *call_data]
+    return calldata
+
+
+def deploy_call(udc, class_hash, constructor_calldata, salt=None):
+    """A `deployContract` call on a UDC, with a fresh random salt unless one is given."""
+    salt = secrets.randbits(250) if salt is None else salt
+    return udc, DEPLOY_CONTRACT_SELECTOR, [class_hash, salt, 0, len(constructor_calldata), *constructor_calldata]
+
+
+def resource_bounds_hash(bounds, tip=0):
+    return poseidon_hash_many(
+        [tip] + [(encode_short_string(name) << 192) + (bounds[key][0] << 128) + bounds[key][1] for name, key in RESOURCES]
+    )
+
+
+def invoke_v3_hash(sender, calldata, chain_id, nonce, bounds, version=TRANSACTION_VERSION):
+    # Nonce and fee data availability modes are both L1 (0); no paymaster or deployment data
+    return poseidon_hash_many(
+        [INVOKE_PREFIX, version, sender, resource_bounds_hash(bounds), EMPTY_HASH, chain_id, nonce, 0, EMPTY_HASH, poseidon_hash_many(calldata)]
+    )
+
+
+def declare_v3_hash(sender, class_hash, compiled_class_hash, chain_id, nonce, bounds, version=TRANSACTION_VERSION):
+    return poseidon_hash_many(
+        [DECLARE_PREFIX, version, sender, resource_bounds_hash(bounds), EMPTY_HASH, chain_id, nonce, 0, EMPTY_HASH, class_hash, compiled_class_hash]
+    )
+
+
+def rpc_resource_bounds(bounds):
+    return {key: {"max_amount": hex(amount), "max_price_per_unit": hex(price)} for key, (amount, price) in bounds.items()}
+
+
+def bounds_from_estimate(estimate, margin):
+    """Resource bounds covering a fee estimate, with `margin` on both amounts and prices."""
+    return {
+        key: (math.ceil(to_int(estimate.get(f"{key}_consumed", 0)) * margin), math.ceil(to_int(estimate.get(f"{key}_price", 0)) * margin))
+        for _, key in RESOURCES
+    }
+
+
+def parse_starknet_version(text):
+    try:
+        return tuple(int(part) for part in text.split("."))
+    except (AttributeError, ValueError):
+        return ()
+
+
+def compiled_class_hash_method(starknet_version):
+    return "blake2s" if parse_starknet_version(starknet_version) >= BLAKE2S_STARKNET_VERSION else "poseidon"
+
+
+def parse_mix(spec):
+    """Parses "op=weight,..." into {op: weight}, dropping zero weights."""
+    mix = {}
+    for item in spec.split(","):
+        name, sep, weight = item.strip().partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of: {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight) if sep else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: {weight!r}")
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f"negative weight for {name}")
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise argparse.ArgumentTypeError("the operation mix is empty")
+    return mix
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class OperationStats:
+    def __init__(self):
+        self.latencies = []
+        self.fees = []
+        self.errors = 0
+        self.last_error = None
+
+    def record(self, latency, fee):
+        self.latencies.append(latency)
+        self.fees.append(fee)
+
+    def record_error(self, error):
+        self.errors += 1
+        self.last_error = str(error)
+
+    def summary(self, elapsed=None):
+        latencies = sorted(self.latencies)
+        info = {"count": len(latencies), "errors": self.errors}
+        if elapsed:
+            info["tx_per_s"] = round(len(latencies) / elapsed, 2)
+        for p in LATENCY_PERCENTILES:
+            info[f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 2)
+        info["max_ms"] = round((latencies[-1] if latencies else 0.0) * 1000, 2)
+        info["mean_fee"] = sum(self.fees) // len(self.fees) if self.fees else 0
+        if self.last_error is not None:
+            info["last_error"] = self.last_error
+        return info
+
+
+class Account:
+    """A Stark-key account with a locally tracked nonce, sending one transaction at a time."""
+
+    def __init__(self, pool, chain_id, address, private_key, nonce=0):
+        self.pool = pool
+        self.chain_id = chain_id
+        self.address = address
+        self.private_key = private_key
+        self.nonce = nonce
+
+    async def sync_nonce(self):
+        self.nonce = to_int(await self.pool.call("starknet_getNonce", {"block_id": "latest", "contract_address": hex(self.address)}))
+
+    def _sign(self, tx_hash):
+        r, s = stark_sign_batch(self.private_key, [tx_hash])[0]
+        return [hex(r), hex(s)]
+
+    def _common_fields(self, bounds, version, tx_hash):
+        return {
+            "version": hex(version),
+            "sender_address": hex(self.address),
+            "nonce": hex(self.nonce),
+            "signature": self._sign(tx_hash),
+            "resource_bounds": rpc_resource_bounds(bounds),
+            "tip": "0x0",
+            "paymaster_data": [],
+            "account_deployment_data": [],
+            "nonce_data_availability_mode": "L1",
+            "fee_data_availability_mode": "L1",
+        }
+
+    def invoke_transaction(self, calls, bounds, version=TRANSACTION_VERSION):
+        calldata = execute_calldata(calls)
+        tx_hash = invoke_v3_hash(self.address, calldata, self.chain_id, self.nonce, bounds, version)
+        return {"type": "INVOKE", "calldata": [hex(felt) for felt in calldata], **self._common_fields(bounds, version, tx_hash)}
+
+    def declare_transaction(self, contract_class, class_hash, compiled_class_hash, bounds, version=TRANSACTION_VERSION):
+        tx_hash = declare_v3_hash(self.address, class_hash, compiled_class_hash, self.chain_id, self.nonce, bounds, version)
+        return {
+            "type": "DECLARE",
+            "contract_class": contract_class,
+            "compiled_class_hash": hex(compiled_class_hash),
+            **self._common_fields(bounds, version, tx_hash),
+        }
+
+    async def estimate(self, build, margin):
+        """Resource bounds for the transaction `build(bounds, version)` returns, from a signed fee estimate."""
+        zero = {key: (0, 0) for _, key in RESOURCES}
+        request = build(zero, QUERY_VERSION)
+        estimates = await self.pool.call("starknet_estimateFee", {"request": [request], "simulation_flags": [], "block_id": "latest"})
+        return bounds_from_estimate(estimates[0], margin)
+
+    async def send(self, build, bounds):
+        """Submits `build(bounds, version)` and waits for its receipt; returns (receipt, latency)."""
+        transaction = build(bounds, TRANSACTION_VERSION)
+        method, key = ("starknet_addDeclareTransaction", "declare_transaction") if transaction["type"] == "DECLARE" else ("starknet_addInvokeTransaction", "invoke_transaction")
+        start = time.perf_counter()
+        try:
+            result = await self.pool.call(method, {key: transaction})
+        except (RpcError, OSError, asyncio.IncompleteReadError):
+            # Rejected or lost before execution: the nonce may not have been consumed
+            await self.sync_nonce()
+            raise
+        self.nonce += 1
+        receipt = await wait_for_receipt(self.pool, result["transaction_hash"])
+        return receipt, time.perf_counter() - start
+
+    async def invoke(self, calls, bounds=None, margin=DEFAULT_FEE_MARGIN):
+        def build(tx_bounds, version):
+            return self.invoke_transaction(calls, tx_bounds, version)
+
+        if bounds is None:
+            bounds = await self.estimate(build, margin)
+        return await self.send(build, bounds)
+
+
+async def wait_for_receipt(pool, tx_hash, timeout=RECEIPT_TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            receipt = await pool.call("starknet_getTransactionReceipt", {"transaction_hash": tx_hash})
+        except RpcError as e:
+            if e.code != TXN_HASH_NOT_FOUND:
+                raise
+        else:
+            if receipt.get("execution_status") == "REVERTED":
+                raise RpcError("REVERTED", f"transaction {tx_hash} reverted", receipt.get("revert_reason"))
+            return receipt
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"no receipt for transaction {tx_hash} after {timeout} s")
+        await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+
+
+def receipt_fee(receipt):
+    fee = receipt.get("actual_fee", 0)
+    return to_int(fee.get("amount", 0) if isinstance(fee, dict) else fee)
+
+
+def deployed_addresses(receipt, udc):
+    """Addresses from the `ContractDeployed` events of `udc`, in deployment order."""
+    addresses = [
+        to_int(event["data"][0])
+        for event in receipt.get("events", [])
+        if to_int(event.get("from_address", 0)) == udc
+        and event.get("keys") and to_int(event["keys"][0]) == CONTRACT_DEPLOYED_SELECTOR
+    ]
+    if not addresses:
+        raise ValueError(f"transaction {receipt.get('transaction_hash')} deployed nothing through UDC {udc:#x}")
+    return addresses
+
+
+def compile_sierra(sierra_path):
+    """CASM of a Sierra artifact, for packages built with `casm = false`."""
+    output = subprocess.run(
+        [SIERRA_COMPILER_COMMAND, "compile-contract", "--sierra-path", str(sierra_path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def load_preset_classes(target_dir, method):
+    """
+    Returns {preset: (RPC contract class, class hash, compiled class hash)}. CASM comes
+    from the artifacts when Scarb emitted it, otherwise from universal-sierra-compiler.
+    """
+    manifest = ArtifactManifest(target_dir)
+    classes = {}
+    for name in LOAD_PRESETS:
+        sierra_path = manifest.artifact(name, "sierra", PRESETS_PACKAGE_NAME)
+        with open(sierra_path, "r") as f:
+            sierra = json.load(f)
+        if manifest.find(name, PRESETS_PACKAGE_NAME).casm is None:
+            casm = compile_sierra(sierra_path)
+        else:
+            with open(manifest.artifact(name, "casm", PRESETS_PACKAGE_NAME), "r") as f:
+                casm = json.load(f)
+        abi = sierra.get("abi", [])
+        contract_class = {
+            "sierra_program": sierra["sierra_program"],
+            "contract_class_version": sierra["contract_class_version"],
+            "entry_points_by_type": sierra["entry_points_by_type"],
+            # Sent as the exact string the class hash commits to
+            "abi": abi if isinstance(abi, str) else json.dumps(abi),
+        }
+        classes[name] = (contract_class, compute_sierra_class_hash(sierra), compute_compiled_class_hash(casm, method))
+    return classes
+
+
+async def is_declared(pool, class_hash):
+    try:
+        await pool.call("starknet_getClass", {"block_id": "latest", "class_hash": hex(class_hash)})
+    except RpcError as e:
+        if e.code == CLASS_HASH_NOT_FOUND:
+            return False
+        raise
+    return True
+
+
+class LoadTest:
+    """Declares and deploys the presets, funds the load accounts, then runs the operation mix."""
+
+    def __init__(self, pool, args):
+        self.pool = pool
+        self.args = args
+        self.stats = {}
+        self.setup_stats = {}
+        self.rng = random.Random(args.seed)
+        self.bounds = {}
+        self.accounts = []
+        self.submitted = 0
+        self.elapsed = 0.0
+
+    async def record_setup(self, label, account, calls):
+        receipt, latency = await account.invoke(calls, margin=self.args.fee_margin)
+        self.setup_stats.setdefault(label, OperationStats()).record(latency, receipt_fee(receipt))
+        return receipt
+
+    async def setup(self):
+        args = self.args
+        self.chain_id = to_int(await self.pool.call("starknet_chainId"))
+        block = await self.pool.call("starknet_getBlockWithTxHashes", {"block_id": "latest"})
+        self.starknet_version = block.get("starknet_version", "")
+        method = args.casm_hash if args.casm_hash != "auto" else compiled_class_hash_method(self.starknet_version)
+
+        predeployed = await self.pool.call("devnet_getPredeployedAccounts")
+        funder = Account(self.pool, self.chain_id, to_int(predeployed[0]["address"]), to_int(predeployed[0]["private_key"]))
+        await funder.sync_nonce()
+
+        self.class_hashes = {}
+        for name, (contract_class, class_hash, compiled_class_hash) in load_preset_classes(args.dir, method).items():
+            self.class_hashes[name] = class_hash
+            if await is_declared(self.pool, class_hash):
+                continue
+
+            def build(bounds, version, contract_class=contract_class, class_hash=class_hash, compiled_class_hash=compiled_class_hash):
+                return funder.declare_transaction(contract_class, class_hash, compiled_class_hash, bounds, version)
+
+            receipt, latency = await funder.send(build, await funder.estimate(build, args.fee_margin))
+            self.setup_stats.setdefault(f"declare {name}", OperationStats()).record(latency, receipt_fee(receipt))
+
+        receipt = await self.record_setup(
+            "deploy UniversalDeployer", funder, [deploy_call(args.udc, self.class_hashes["UniversalDeployer"], [])]
+        )
+        self.udc = deployed_addresses(receipt, args.udc)[0]
+
+        token_calldata = [*encode_byte_array("Load Token"), *encode_byte_array("LOAD"), *encode_u256(TOKEN_SUPPLY), funder.address, funder.address]
+        receipt = await self.record_setup("deploy ERC20Upgradeable", funder, [deploy_call(self.udc, self.class_hashes["ERC20Upgradeable"], token_calldata)])
+        self.token = deployed_addresses(receipt, self.udc)[0]
+
+        vesting_calldata = [funder.address, int(time.time()), VESTING_DURATION, 0]
+        receipt = await self.record_setup("deploy VestingWallet", funder, [deploy_call(self.udc, self.class_hashes["VestingWallet"], vesting_calldata)])
+        self.vesting = deployed_addresses(receipt, self.udc)[0]
+
+        private_keys = [get_selector_from_name(f"load_test_account_{index}") % (EC_ORDER - 1) + 1 for index in range(args.accounts)]
+        calls = [deploy_call(self.udc, self.class_hashes["AccountUpgradeable"], [get_stark_public_key(key)]) for key in private_keys]
+        receipt = await self.record_setup("deploy AccountUpgradeable", funder, calls)
+        addresses = deployed_addresses(receipt, self.udc)
+        self.accounts = [Account(self.pool, self.chain_id, address, key) for address, key in zip(addresses, private_keys)]
+
+        calls = [(self.token, TRANSFER_SELECTOR, [self.vesting, *encode_u256(TOKEN_FUNDING)])]
+        for account in self.accounts:
+            calls.append((STRK_TOKEN, TRANSFER_SELECTOR, [account.address, *encode_u256(args.fund)]))
+            calls.append((self.token, TRANSFER_SELECTOR, [account.address, *encode_u256(TOKEN_FUNDING)]))
+        await self.record_setup("fund accounts", funder, calls)
+
+        # Every account sends the same operations, so fees are estimated once per operation
+        for operation in args.mix:
+            calls = self.operation_calls(operation, self.accounts[0])
+            self.bounds[operation] = await self.accounts[0].estimate(
+                lambda bounds, version, calls=calls: self.accounts[0].invoke_transaction(calls, bounds, version), args.fee_margin
+            )
+
+    def recipient(self, account):
+        others = [other.address for other in self.accounts if other is not account]
+        return self.rng.choice(others) if others else account.address
+
+    def operation_calls(self, operation, account):
+        if operation == "transfer":
+            return [(self.token, TRANSFER_SELECTOR, [self.recipient(account), *encode_u256(1)])]
+        if operation == "approve":
+            return [(self.token, APPROVE_SELECTOR, [self.recipient(account), *encode_u256(self.rng.randrange(1, 2 ** 64))])]
+        if operation == "mint":
+            # The ERC721 preset has no public mint; every mint deploys a collection minting to the sender
+            token_ids = [secrets.randbits(128) for _ in range(self.args.mint_batch)]
+            calldata = [
+                *encode_byte_array("Load NFT"),
+                *encode_byte_array("LNFT"),
+                *encode_byte_array(""),
+                account.address,
+                len(token_ids),
+                *[felt for token_id in token_ids for felt in encode_u256(token_id)],
+                account.address,
+            ]
+            return [deploy_call(self.udc, self.class_hashes["ERC721Upgradeable"], calldata)]
+        if operation == "multicall":
+            return [(self.token, TRANSFER_SELECTOR, [self.recipient(account), *encode_u256(1)]) for _ in range(self.args.multicall_size)]
+        return [(self.vesting, RELEASE_SELECTOR, [self.token])]
+
+    async def worker(self, account, deadline):
+        operations = list(self.args.mix)
+        weights = list(self.args.mix.values())
+        while time.perf_counter() < deadline:
+            if self.args.transactions is not None:
+                if self.submitted >= self.args.transactions:
+                    return
+                self.submitted += 1
+            operation = self.rng.choices(operations, weights)[0]
+            stats = self.stats.setdefault(operation, OperationStats())
+            try:
+                receipt, latency = await account.invoke(self.operation_calls(operation, account), self.bounds[operation])
+            except (RpcError, OSError, TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                stats.record_error(e)
+                continue
+            stats.record(latency, receipt_fee(receipt))
+
+    async def run(self):
+        start = time.perf_counter()
+        deadline = start + self.args.duration if self.args.duration else math.inf
+        await asyncio.gather(*(self.worker(account, deadline) for account in self.accounts))
+        self.elapsed = time.perf_counter() - start
+
+    def results(self):
+        load = {operation: self.stats[operation].summary(self.elapsed) for operation in OPERATIONS if operation in self.stats}
+        if self.stats:
+            total = OperationStats()
+            for stats in self.stats.values():
+                total.latencies += stats.latencies
+                total.fees += stats.fees
+                total.errors += stats.errors
+            load["total"] = total.summary(self.elapsed)
+        load.update({f"setup: {label}": stats.summary() for label, stats in self.setup_stats.items()})
+        return {
+            LOAD_KEY: load,
+            LOAD_RUN_KEY: {
+                "starknet_version": self.starknet_version,
+                "accounts": len(self.accounts),
+                "connections": self.pool.size,
+                "connections_opened": self.pool.connections_opened,
+                "rpc_requests": self.pool.requests,
+                "elapsed_s": round(self.elapsed, 3),
+                "mix": self.args.mix,
+            },
+        }
+
+
+async def wait_for_rpc(pool, timeout):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await pool.call("starknet_chainId")
+        except (OSError, asyncio.IncompleteReadError):
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def spawn_devnet(url):
+    parts = urlsplit(url)
+    command = [
+        DEVNET_COMMAND,
+        "--host", parts.hostname or "127.0.0.1",
+        "--port", str(parts.port or 5050),
+        "--seed", "0",
+        "--accounts", "1",
+        "--initial-balance", str(DEVNET_INITIAL_BALANCE),
+    ]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def run_load_test(args):
+    devnet = spawn_devnet(args.rpc) if args.spawn_devnet else None
+    pool = RpcPool(args.rpc, args.connections or args.accounts + 1)
+    try:
+        await wait_for_rpc(pool, DEVNET_STARTUP_TIMEOUT if devnet else 0)
+        load_test = LoadTest(pool, args)
+        await load_test.setup()
+        await load_test.run()
+        return load_test.results()
+    finally:
+        pool.close()
+        if devnet is not None:
+            devnet.terminate()
+            devnet.wait()
+
+
+def print_load_results(results):
+    run = results[LOAD_RUN_KEY]
+    print(
+        f"{BOLD}{CYAN}Load test ({run['accounts']} accounts, {run['connections']} connections, "
+        f"{run['elapsed_s']:.1f} s, Starknet {run['starknet_version'] or 'unknown'}):{RESET}"
+    )
+    for name, info in results[LOAD_KEY].items():
+        label = f"{BOLD}{YELLOW}{name}{RESET}"
+        rate = f"{BOLD}{GREEN}{info['tx_per_s']} tx/s{RESET}, " if "tx_per_s" in info else ""
+        latencies = ", ".join(f"p{p} {info[f'p{p}_ms']} ms" for p in LATENCY_PERCENTILES)
+        print(f"{label}: {rate}{latencies}, max {info['max_ms']} ms, fee {info['mean_fee']} FRI ({info['count']} ok, {info['errors']} errors)")
+        if "last_error" in info:
+            print(f"    {RED}last error: {info['last_error']}{RESET}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the presets against a local starknet-devnet.")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    parser.add_argument("--dir", type=str, default=TARGET_DIR, help="Target directory (default: target/release)")
+    parser.add_argument("--rpc", type=str, default=DEFAULT_RPC_URL, help=f"Devnet JSON-RPC URL (default: {DEFAULT_RPC_URL})")
+    parser.add_argument("--spawn-devnet", action="store_true", help=f"Start {DEVNET_COMMAND} on the --rpc host and port for the run.")
+    parser.add_argument("--accounts", type=int, default=8, help="Load accounts, each sending one transaction at a time (default: 8)")
+    parser.add_argument("--connections", type=int, default=None, help="Pooled RPC connections (default: accounts + 1)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run the mix for (default: 30, or unlimited with --transactions)")
+    parser.add_argument("--transactions", type=int, default=None, help="Stop after submitting this many transactions.")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--multicall-size", type=int, default=5, help="ERC20 transfers per multicall (default: 5)")
+    parser.add_argument("--mint-batch", type=int, default=5, help="ERC721 tokens minted per mint (default: 5)")
+    parser.add_argument("--fund", type=int, default=DEFAULT_STRK_FUNDING, help=f"STRK (in FRI) sent to each account for fees (default: {DEFAULT_STRK_FUNDING})")
+    parser.add_argument("--fee-margin", type=float, default=DEFAULT_FEE_MARGIN, help=f"Factor on estimated gas amounts and prices (default: {DEFAULT_FEE_MARGIN})")
+    parser.add_argument("--udc", type=lambda text: int(text, 0), default=DEVNET_UDC, help="Predeployed UDC that deploys the UniversalDeployer preset.")
+    parser.add_argument(
+        "--casm-hash",
+        choices=["auto", "poseidon", "blake2s"],
+        default="auto",
+        help="Compiled class hash for declarations (default: from the devnet's Starknet version)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the operation and recipient choices (default: 0)")
+    args = parser.parse_args()
+    if args.accounts < 1:
+        parser.error("--accounts must be at least 1")
+    if args.duration is None and args.transactions is None:
+        args.duration = 30.0
+
+    try:
+        results = asyncio.run(run_load_test(args))
+    except (OSError, ValueError, RpcError, TimeoutError, subprocess.CalledProcessError) as e:
+        print(f"{RED}Load test failed: {e}{RESET}", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_load_results(results)
@@ -0,0 +1,135 @@
+import os
+import json
+import mmap
+
+from benchmark import (
+    RESET, BOLD, YELLOW, GREEN, RED, CYAN, JSON_TOKEN_PATTERN, NON_WHITESPACE_RE, list_artifacts, try_get_name,
+    CONTRACT_CLASS_KEY,
+)
+
+SECTIONS_KEY = "sierra_sections"
+
+ABI_KEY = "abi"
+# ABI entries attributed by name; all others are summed per entry type
+NAMED_ABI_TYPES = {"interface", "event"}
+# Bytes outside every top-level member: braces, separators and whitespace
+OVERHEAD = "(overhead)"
+
+
+def value_end(buf, start, stop):
+    """End offset of the JSON value in buf[start:stop], ignoring trailing whitespace."""
+    end = stop
+    while end > start and buf[end - 1:end] in (b" ", b"\t", b"\r", b"\n"):
+        end -= 1
+    return end
+
+
+def abi_entry_label(entry):
+    kind = entry.get("type", "unknown") if isinstance(entry, dict) else "unknown"
+    if kind in NAMED_ABI_TYPES:
+        return f"{kind} {entry.get('name', '?')}"
+    return kind
+
+
+def get_sierra_sections(json_path):
+    """
+    Attributes the bytes of a Sierra contract class to its top-level members in a single
+    streaming pass over a memory-mapped view of the artifact. Each member counts from its
+    key to the end of its value. Entries of a JSON `abi` array are further attributed per
+    interface and per event (other entries per type); only those small entries are decoded.
+    """
+    sections = {}
+    abi = {}
+    with open(json_path, "rb") as f:
+        total = os.fstat(f.fileno()).st_size
+        if total == 0:
+            raise ValueError("empty contract class")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            depth = 0
+            previous = None
+            key = None
+            key_start = None
+            entry_start = None
+            for match in JSON_TOKEN_PATTERN.finditer(buf):
+                token = match.group()
+                if depth == 0 and previous is not None:
+                    # Anything after the closing brace of the contract class
+                    raise ValueError("malformed contract class")
+                if token == b":" and depth == 1:
+                    key = json.loads(previous.group())
+                    key_start = previous.start()
+                elif token in (b"[", b"{"):
+                    depth += 1
+                    if depth == 3 and key == ABI_KEY and token == b"{":
+                        entry_start = match.start()
+                elif token in (b"]", b"}"):
+                    if depth == 3 and entry_start is not None:
+                        entry = json.loads(buf[entry_start:match.end()])
+                        label = abi_entry_label(entry)
+                        abi[label] = abi.get(label, 0) + match.end() - entry_start
+                        entry_start = None
+                    depth -= 1
+                    if depth == 0 and key is not None:
+                        sections[key] = sections.get(key, 0) + value_end(buf, key_start, match.start()) - key_start
+                        key = None
+                elif token == b"," and depth == 1 and key is not None:
+                    sections[key] = sections.get(key, 0) + value_end(buf, key_start, match.start()) - key_start
+                    key = None
+                previous = match
+            if depth != 0 or NON_WHITESPACE_RE.search(buf, previous.end() if previous else 0):
+                raise ValueError("malformed contract class")
+
+    sections = dict(sorted(sections.items(), key=lambda item: -item[1]))
+    sections[OVERHEAD] = total - sum(sections.values())
+    return {
+        "bytes": total,
+        "sections": sections,
+        "abi": dict(sorted(abi.items(), key=lambda item: (-item[1], item[0]))),
+    }
+
+
+def measure_sections(target_dir):
+    """Measures the sections of every Sierra artifact that `list_artifacts` finds in `target_dir`."""
+    results = {SECTIONS_KEY: {}}
+    for kind, file in list_artifacts(target_dir):
+        if kind != CONTRACT_CLASS_KEY:
+            continue
+        try:
+            results[SECTIONS_KEY][file] = get_sierra_sections(os.path.join(target_dir, file))
+        except Exception as e:
+            results[SECTIONS_KEY][file] = {"error": str(e)}
+    return results
+
+
+def flatten_sections(sections):
+    """
+    Flattens section reports into {"<Contract> <section>": {"bytes": n}} entries, the shape
+    benchmark_diff compares. ABI entries are listed as "abi: <label>".
+    """
+    entries = {}
+    for file, info in sections.items():
+        name = try_get_name(file)
+        for section, num_bytes in info.get("sections", {}).items():
+            entries[f"{name} {section}"] = {"bytes": num_bytes}
+        for label, num_bytes in info.get("abi", {}).items():
+            entries[f"{name} abi: {label}"] = {"bytes": num_bytes}
+    return entries
+
+
+def print_sections(results, top):
+    print(f"{BOLD}{CYAN}Sierra contract class size by section:{RESET}")
+    for file, info in results[SECTIONS_KEY].items():
+        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        if "error" in info:
+            print(f"{RED}Error processing {file}: {info['error']}{RESET}")
+            continue
+        total = info["bytes"]
+        print(f"\n{name}: {BOLD}{GREEN}{total} bytes{RESET} ({total/1024:.2f} KB)")
+        for section, num_bytes in info["sections"].items():
+            share = 100 * num_bytes / total
+            print(f"    {num_bytes:>9} bytes {share:5.1f}%  {section}")
+        if info["abi"]:
+            print(f"  abi (top {top}):")
+            for label, num_bytes in list(info["abi"].items())[:top]:
+                share = 100 * num_bytes / total
+                print(f"    {num_bytes:>9} bytes {share:5.1f}%  {label}")
@@ -0,0 +1,282 @@
+import os
+import sys
+import re
+import json
+import argparse
+
+# Shared helpers live in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmark import RESET, BOLD, YELLOW, GREEN, RED, CYAN, TARGET_DIR, BYTECODE_KEY, try_get_name
+from casm_breakdown import DEFAULT_TOP, ENTRY_POINT_TYPES, list_casm_artifacts, read_function_segments
+from casm_dedup import FLAGS_SHIFT, OP1_IMM_FLAG, PC_UPDATE_SHIFT, PC_UPDATE_MASK, PC_UPDATE_JUMP_REL, signed_felt
+from class_hash import encode_short_string, get_selector_from_name
+
+STORAGE_KEY = "storage_costs"
+
+# Metrics diffed by benchmark_diff.py, per entry point
+STORAGE_METRICS = ["storage_reads", "storage_writes", "events", "event_felts"]
+
+# Syscalls write their selector into the request with an immediate, e.g. `[ap + 0] = 'StorageWrite', ap++`
+SYSCALL_METRICS = {
+    encode_short_string("StorageRead"): "storage_reads",
+    encode_short_string("StorageWrite"): "storage_writes",
+    encode_short_string("EmitEvent"): "events",
+}
+OPCODE_SHIFT = 12
+OPCODE_MASK = 0b111
+OPCODE_CALL = 1
+WHOLE_CONTRACT = "(whole contract)"
+
+# Arrays and spans only count their length, so variable-size payloads are lower bounds
+ARRAY_TYPE_RE = re.compile(r"^core::array::(?:Array|Span)::<.*>$")
+
+
+def read_sierra_abi(sierra_path):
+    """Returns the ABI of a Sierra contract class, decoding it if stored as a string."""
+    try:
+        with open(sierra_path, "r") as f:
+            abi = json.load(f).get("abi") or []
+    except (OSError, ValueError):
+        return []
+    if isinstance(abi, str):
+        try:
+            abi = json.loads(abi)
+        except ValueError:
+            return []
+    return abi if isinstance(abi, list) else []
+
+
+def split_tuple_types(type_name):
+    """Splits "(A, B<C, D>)" into ["A", "B<C, D>"], respecting nested brackets."""
+    items, depth, start = [], 0, 1
+    for index, char in enumerate(type_name[1:-1], start=1):
+        if char in "<(":
+            depth += 1
+        elif char in ">)":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(type_name[start:index].strip())
+            start = index + 1
+    last = type_name[start:-1].strip()
+    return items + [last] if last else items
+
+
+def type_size(type_name, definitions, visiting=()):
+    """
+    Number of felts `type_name` serializes to: structs sum their members, enums take the
+    variant index plus their largest variant, and arrays or spans count their length only.
+    Types the ABI does not define are assumed to be a single felt.
+    """
+    type_name = type_name.strip()
+    if type_name == "()":
+        return 0
+    if type_name.startswith("(") and type_name.endswith(")"):
+        return sum(type_size(item, definitions, visiting) for item in split_tuple_types(type_name))
+    if ARRAY_TYPE_RE.match(type_name):
+        return 1
+    definition = definitions.get(type_name)
+    if definition is None or type_name in visiting:
+        return 1
+    visiting = (*visiting, type_name)
+    if definition.get("type") == "enum":
+        variants = [type_size(variant.get("type", "()"), definitions, visiting) for variant in definition.get("variants", [])]
+        return 1 + max(variants, default=0)
+    return sum(type_size(member.get("type", ""), definitions, visiting) for member in definition.get("members", []))
+
+
+def event_payloads(abi):
+    """
+    Returns {event struct name: keys and data felts} for every event a contract can emit,
+    following its event enums from the root ones. Nested variants prepend their selector
+    key; flat variants emit the inner event as is.
+    """
+    definitions = {entry["name"]: entry for entry in abi if entry.get("type") in ("struct", "enum") and "name" in entry}
+    events = {entry["name"]: entry for entry in abi if entry.get("type") == "event" and "name" in entry}
+    nested_types = {variant.get("type") for entry in events.values() for variant in entry.get("variants", [])}
+    payloads = {}
+
+    def visit(name, prefix, visiting):
+        event = events.get(name)
+        if event is None or name in visiting:
+            return
+        if event.get("kind") == "enum":
+            for variant in event.get("variants", []):
+                selector = 0 if variant.get("kind") == "flat" else 1
+                visit(variant.get("type"), prefix + selector, (*visiting, name))
+            return
+        size = prefix + sum(type_size(member.get("type", ""), definitions) for member in event.get("members", []))
+        payloads[name] = max(size, payloads.get(name, 0))
+
+    for name in events:
+        if name not in nested_types:
+            visit(name, 0, ())
+    return payloads
+
+
+def abi_entry_point_names(abi):
+    """Returns {selector: name} for the functions, constructor and L1 handlers in `abi`."""
+    names = {}
+    for entry in abi:
+        functions = entry.get("items", []) if entry.get("type") == "interface" else [entry]
+        for function in functions:
+            if function.get("type") in ("function", "constructor", "l1_handler") and "name" in function:
+                names[get_selector_from_name(function["name"])] = function["name"]
+    return names
+
+
+def decode_function(bytecode, offset, length):
+    """
+    Scans the instructions of one function. Returns its syscall counts per metric and the
+    bytecode offsets of the functions it calls, one per call site.
+    """
+    syscalls = dict.fromkeys(SYSCALL_METRICS.values(), 0)
+    calls = []
+    end = offset + length
+    pc = offset
+    while pc < end:
+        flags = int(bytecode[pc], 16) >> FLAGS_SHIFT
+        if not flags & OP1_IMM_FLAG or pc + 1 >= end:
+            pc += 1
+            continue
+        immediate = int(bytecode[pc + 1], 16)
+        if (flags >> OPCODE_SHIFT) & OPCODE_MASK == OPCODE_CALL:
+            if (flags >> PC_UPDATE_SHIFT) & PC_UPDATE_MASK == PC_UPDATE_JUMP_REL:
+                calls.append(pc + signed_felt(immediate))
+        elif immediate in SYSCALL_METRICS:
+            syscalls[SYSCALL_METRICS[immediate]] += 1
+        pc += 2
+    return syscalls, calls
+
+
+def event_felts_of(function_name, payloads):
+    """
+    Payload felts of one EmitEvent in `function_name`: the largest event named in it (the
+    emitting function is generic over the event), or else the largest event of the contract.
+    """
+    named = [size for event, size in payloads.items() if re.search(re.escape(event) + r"(?!\w)", function_name)]
+    return max(named or payloads.values() or [0])
+
+
+def reachable_costs(start, functions):
+    """
+    Sums the costs of `start` and everything it calls, once per call site. Recursive
+    calls, i.e. loops, are counted once, so costs are per loop iteration.
+    """
+    totals = {}
+
+    def visit(offset, stack):
+        if offset in totals:
+            return totals[offset]
+        function = functions.get(offset)
+        if function is None or offset in stack:
+            return dict.fromkeys(STORAGE_METRICS, 0)
+        cost = dict(function["cost"])
+        for target in function["calls"]:
+            for metric, value in visit(target, stack | {offset}).items():
+                cost[metric] += value
+        totals[offset] = cost
+        return cost
+
+    return visit(start, frozenset())
+
+
+def analyze_contract(casm_path, sierra_path):
+    """
+    Estimates the storage reads, storage writes, events and event payload felts of every
+    entry point of a contract, statically from its CASM and Sierra artifacts.
+
+    Every syscall site reachable from the entry point counts once per call site, on all
+    branches, so the estimates bound a single call from above (loops aside). Event sizes
+    come from the ABI, with arrays and byte arrays counted at their minimum size.
+    """
+    with open(casm_path, "r") as f:
+        casm = json.load(f)
+    bytecode = casm.get(BYTECODE_KEY, [])
+    segments, sierra_entry_points = read_function_segments(casm, sierra_path)
+    if not segments:
+        segments = [(WHOLE_CONTRACT, 0, len(bytecode))]
+    abi = read_sierra_abi(sierra_path)
+    payloads = event_payloads(abi)
+    abi_names = abi_entry_point_names(abi)
+
+    functions = {}
+    starts = []
+    for name, offset, length in segments:
+        syscalls, calls = decode_function(bytecode, offset, length)
+        cost = {**syscalls, "event_felts": syscalls["events"] * event_felts_of(name, payloads)}
+        functions[offset] = {"name": name, "cost": cost, "calls": calls}
+        starts.append(offset)
+
+    entry_points = {}
+    for entry_point_type in ENTRY_POINT_TYPES:
+        for entry_point in casm.get("entry_points_by_type", {}).get(entry_point_type, []):
+            selector = int(entry_point["selector"], 16)
+            offset = max((start for start in starts if start <= entry_point["offset"]), default=0)
+            label = abi_names.get(selector, hex(selector))
+            if entry_point_type != "EXTERNAL":
+                label = f"{entry_point_type.lower()} {label}"
+            entry_points[label] = reachable_costs(offset, functions)
+
+    return {
+        "entry_points": dict(sorted(entry_points.items())),
+        "events": dict(sorted(payloads.items(), key=lambda item: (-item[1], item[0]))),
+    }
+
+
+def analyze_storage_costs(target_dir):
+    results = {STORAGE_KEY: {}}
+    for file, path, sierra_path in list_casm_artifacts(target_dir):
+        try:
+            results[STORAGE_KEY][file] = analyze_contract(path, sierra_path)
+        except Exception as e:
+            results[STORAGE_KEY][file] = {"error": str(e)}
+    return results
+
+
+def flatten_storage_costs(storage_costs):
+    """
+    Flattens storage cost reports into {"<Contract> <entry point>": {metric: n}} entries,
+    the shape benchmark_diff compares.
+    """
+    entries = {}
+    for file, info in storage_costs.items():
+        name = try_get_name(file)
+        for entry_point, costs in info.get("entry_points", {}).items():
+            entries[f"{name} {entry_point}"] = costs
+    return entries
+
+
+def print_storage_costs(results, top=DEFAULT_TOP):
+    print(f"{BOLD}{CYAN}Static storage and event costs per entry point:{RESET}")
+    for file, info in results[STORAGE_KEY].items():
+        name = f"{BOLD}{YELLOW}{try_get_name(file)}{RESET}"
+        if "error" in info:
+            print(f"{RED}Error processing {file}: {info['error']}{RESET}")
+            continue
+        print(f"\n{name}:")
+        ranked = sorted(
+            info["entry_points"].items(),
+            key=lambda item: (-item[1]["storage_writes"], -item[1]["event_felts"], -item[1]["storage_reads"], item[0]),
+        )
+        for entry_point, costs in ranked:
+            print(
+                f"    {costs['storage_reads']:>4} reads {BOLD}{GREEN}{costs['storage_writes']:>4} writes{RESET} "
+                f"{costs['events']:>3} events {costs['event_felts']:>4} event felts  {entry_point}"
+            )
+        if info["events"]:
+            events = ", ".join(f"{event.rsplit('::', 1)[-1]}: {felts}" for event, felts in list(info["events"].items())[:top])
+            print(f"  event payloads (felts, top {top}): {events}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate storage reads, writes and event sizes per entry point from compiled artifacts.")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    parser.add_argument("--dir", type=str, default=TARGET_DIR, help="Target directory (default: target/release)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Number of event payloads listed per contract (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    results = analyze_storage_costs(args.dir)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_storage_costs(results, args.top)
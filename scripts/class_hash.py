@@ -0,0 +1,325 @@
+"""Native Sierra class-hash computation, matching `starkli class-hash` without external tools.
+
+Implements the Starknet Poseidon hash (Hades permutation over the Stark field), starknet-keccak
+and the Sierra contract class hash built from them, plus the compiled (CASM) class hash that
+declare transactions commit to, with either Poseidon or Blake2s.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+STARK_FIELD_PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
+MASK_250 = 2 ** 250 - 1
+
+# Hades permutation parameters for the Starknet Poseidon instance (width 3, rate 2)
+FULL_ROUNDS = 8
+PARTIAL_ROUNDS = 83
+CONTRACT_CLASS_VERSION_PREFIX = "CONTRACT_CLASS_V"
+COMPILED_CLASS_VERSION = "COMPILED_CLASS_V1"
+# Starknet 0.14.1 moved compiled class hashes from Poseidon to Blake2s
+COMPILED_CLASS_HASH_METHODS = ("poseidon", "blake2s")
+ENTRY_POINT_TYPES = ("EXTERNAL", "L1_HANDLER", "CONSTRUCTOR")
+
+KECCAK_RATE = 136
+KECCAK_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# Rotation offsets indexed by lane x + 5 * y
+KECCAK_ROTATIONS = [
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+]
+MASK_64 = 2 ** 64 - 1
+MASK_32 = 2 ** 32 - 1
+# Blake2s hashes felts below 2^63 as two u32 words and others as eight, marked with bit 255
+BLAKE2S_SMALL_FELT_BOUND = 2 ** 63
+BLAKE2S_BIG_FELT_MARKER = 2 ** 255
+
+
+def _round_constant(index: int) -> int:
+    digest = hashlib.sha256(f"Hades{index}".encode("ascii")).digest()
+    return int.from_bytes(digest, "big") % STARK_FIELD_PRIME
+
+
+def _mds(s0: int, s1: int, s2: int) -> Tuple[int, int, int]:
+    # Multiplication by the MDS matrix [[3, 1, 1], [1, -1, 1], [1, 1, -2]]
+    t = s0 + s1 + s2
+    return t + 2 * s0, t - 2 * s1, t - 3 * s2
+
+
+def _precompute_round_constants() -> Tuple[List[Tuple[int, int, int]], List[int], List[Tuple[int, int, int]]]:
+    """Split the Hades round constants into full-round triples and compressed partial-round scalars.
+
+    A partial round only applies the S-box to the last lane, so the constants added to the other
+    two lanes can be pushed through the linear layer into the next round. Each partial round then
+    adds a single constant, which is where most of the permutation time is spent.
+    """
+    half = FULL_ROUNDS // 2
+    constants = [
+        [_round_constant(3 * round_index + lane) for lane in range(3)]
+        for round_index in range(FULL_ROUNDS + PARTIAL_ROUNDS)
+    ]
+    partial = []
+    for round_index in range(half, half + PARTIAL_ROUNDS):
+        c0, c1, c2 = constants[round_index]
+        partial.append(c2)
+        carried = _mds(c0, c1, 0)
+        constants[round_index + 1] = [
+            (value + carry) % STARK_FIELD_PRIME
+            for value, carry in zip(constants[round_index + 1], carried)
+        ]
+    first = [tuple(round_constants) for round_constants in constants[:half]]
+    last = [tuple(round_constants) for round_constants in constants[half + PARTIAL_ROUNDS:]]
+    return first, partial, last
+
+
+FIRST_FULL_ROUND_CONSTANTS, PARTIAL_ROUND_CONSTANTS, LAST_FULL_ROUND_CONSTANTS = _precompute_round_constants()
+
+
+def hades_permutation(s0: int, s1: int, s2: int) -> Tuple[int, int, int]:
+    """Apply the Hades permutation used by Starknet's Poseidon to a 3-element state."""
+    p = STARK_FIELD_PRIME
+    # Reductions are deferred where the operands stay small: only values that are cubed
+    # and values carried between partial rounds are reduced.
+    for c0, c1, c2 in FIRST_FULL_ROUND_CONSTANTS:
+        s0 += c0
+        s1 += c1
+        s2 += c2
+        s0 = s0 * s0 * s0 % p
+        s1 = s1 * s1 * s1 % p
+        s2 = s2 * s2 * s2 % p
+        t = s0 + s1 + s2
+        s0, s1, s2 = (t + 2 * s0) % p, (t - 2 * s1) % p, t - 3 * s2
+    for c in PARTIAL_ROUND_CONSTANTS:
+        x = s2 + c
+        x = x * x * x % p
+        t = s0 + s1 + x
+        s0, s1, s2 = (t + 2 * s0) % p, (t - 2 * s1) % p, t - 3 * x
+    for c0, c1, c2 in LAST_FULL_ROUND_CONSTANTS:
+        s0 += c0
+        s1 += c1
+        s2 += c2
+        s0 = s0 * s0 * s0 % p
+        s1 = s1 * s1 * s1 % p
+        s2 = s2 * s2 * s2 % p
+        t = s0 + s1 + s2
+        s0, s1, s2 = t + 2 * s0, t - 2 * s1, t - 3 * s2
+    return s0 % p, s1 % p, s2 % p
+
+
+def poseidon_hash_many(values: Iterable[int]) -> int:
+    """Poseidon sponge over `values`, padded with a single 1 and zeros to the rate."""
+    s0 = s1 = s2 = 0
+    pending = None
+    for value in values:
+        if pending is None:
+            pending = value
+        else:
+            s0, s1, s2 = hades_permutation(s0 + pending, s1 + value, s2)
+            pending = None
+    if pending is None:
+        s0, s1, s2 = hades_permutation(s0 + 1, s1, s2)
+    else:
+        s0, s1, s2 = hades_permutation(s0 + pending, s1 + 1, s2)
+    return s0
+
+
+def _keccak_f1600(lanes: List[int]) -> None:
+    for round_constant in KECCAK_ROUND_CONSTANTS:
+        # Theta
+        c = [lanes[x] ^ lanes[x + 5] ^ lanes[x + 10] ^ lanes[x + 15] ^ lanes[x + 20] for x in range(5)]
+        for x in range(5):
+            right = c[(x + 1) % 5]
+            d = c[(x - 1) % 5] ^ (((right << 1) | (right >> 63)) & MASK_64)
+            for y in range(0, 25, 5):
+                lanes[x + y] ^= d
+        # Rho and pi
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                lane = lanes[x + 5 * y]
+                rotation = KECCAK_ROTATIONS[x + 5 * y]
+                if rotation:
+                    lane = ((lane << rotation) | (lane >> (64 - rotation))) & MASK_64
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = lane
+        # Chi
+        for y in range(0, 25, 5):
+            row = b[y:y + 5]
+            for x in range(5):
+                lanes[x + y] = row[x] ^ (~row[(x + 1) % 5] & row[(x + 2) % 5])
+        # Iota
+        lanes[0] ^= round_constant
+
+
+def keccak256(data: bytes) -> bytes:
+    """Original Keccak-256 (as used by Ethereum), not the NIST SHA3-256 variant."""
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % KECCAK_RATE))
+    padded[-1] |= 0x80
+
+    lanes = [0] * 25
+    for offset in range(0, len(padded), KECCAK_RATE):
+        block = padded[offset:offset + KECCAK_RATE]
+        for index in range(KECCAK_RATE // 8):
+            lanes[index] ^= int.from_bytes(block[8 * index:8 * index + 8], "little")
+        _keccak_f1600(lanes)
+    return b"".join(lane.to_bytes(8, "little") for lane in lanes[:4])
+
+
+def starknet_keccak(data: bytes) -> int:
+    """Keccak-256 truncated to 250 bits so it fits in a Stark field element."""
+    return int.from_bytes(keccak256(data), "big") & MASK_250
+
+
+def get_selector_from_name(name: str) -> int:
+    return starknet_keccak(name.encode("ascii"))
+
+
+def encode_short_string(text: str) -> int:
+    encoded = text.encode("ascii")
+    if len(encoded) > 31:
+        raise ValueError(f"short string exceeds 31 characters: {text!r}")
+    return int.from_bytes(encoded, "big")
+
+
+def _parse_felt(value: Any, what: str) -> int:
+    if isinstance(value, str):
+        felt = int(value, 16) if value.startswith("0x") else int(value)
+    elif isinstance(value, int) and not isinstance(value, bool):
+        felt = value
+    else:
+        raise ValueError(f"invalid {what}: {value!r}")
+    if not 0 <= felt < STARK_FIELD_PRIME:
+        raise ValueError(f"{what} is outside the Stark field: {value!r}")
+    return felt
+
+
+def _entry_points_hash(entry_points: Sequence[Any]) -> int:
+    values = []
+    for entry_point in entry_points:
+        if not isinstance(entry_point, dict):
+            raise ValueError("each entry point must be an object")
+        values.append(_parse_felt(entry_point.get("selector"), "entry point selector"))
+        values.append(_parse_felt(entry_point.get("function_idx"), "entry point function index"))
+    return poseidon_hash_many(values)
+
+
+def _abi_hash(abi: Any) -> int:
+    # Scarb stores the ABI as JSON, while the class hash commits to its string form. Like starkli,
+    # serialize it with Python-style separators in the order the entries were written.
+    if not isinstance(abi, str):
+        abi = json.dumps(abi)
+    return starknet_keccak(abi.encode("utf-8"))
+
+
+def compute_sierra_class_hash(contract_class: Dict[str, Any]) -> int:
+    """Compute the class hash of a Sierra contract class as emitted by Scarb."""
+    version = contract_class.get("contract_class_version")
+    if not isinstance(version, str) or not version:
+        raise ValueError("Sierra contract class has no contract_class_version")
+    entry_points = contract_class.get("entry_points_by_type")
+    if not isinstance(entry_points, dict):
+        raise ValueError("Sierra contract class has no entry_points_by_type object")
+    program = contract_class.get("sierra_program")
+    if not isinstance(program, list):
+        raise ValueError("Sierra contract class has no sierra_program list")
+
+    entry_point_hashes = []
+    for entry_point_type in ENTRY_POINT_TYPES:
+        typed_entry_points = entry_points.get(entry_point_type, [])
+        if not isinstance(typed_entry_points, list):
+            raise ValueError(f"{entry_point_type} entry points must be a list")
+        entry_point_hashes.append(_entry_points_hash(typed_entry_points))
+
+    return poseidon_hash_many(
+        [
+            encode_short_string(CONTRACT_CLASS_VERSION_PREFIX + version),
+            *entry_point_hashes,
+            _abi_hash(contract_class.get("abi", [])),
+            poseidon_hash_many(_parse_felt(felt, "Sierra program felt") for felt in program),
+        ]
+    )
+
+
+def compute_sierra_class_hash_file(artifact: Path) -> int:
+    with artifact.open(encoding="utf-8") as artifact_file:
+        contract_class = json.load(artifact_file)
+    if not isinstance(contract_class, dict):
+        raise ValueError(f"Sierra artifact must be an object: {artifact}")
+    return compute_sierra_class_hash(contract_class)
+
+
+def blake2s_hash_many(values: Iterable[int]) -> int:
+    """Blake2s-256 of `values` encoded to u32 words like Cairo's `encode_felt252_to_u32s`."""
+    data = bytearray()
+    for value in values:
+        if value < BLAKE2S_SMALL_FELT_BOUND:
+            words = [value >> 32, value & MASK_32]
+        else:
+            marked = value | BLAKE2S_BIG_FELT_MARKER
+            words = [(marked >> (32 * index)) & MASK_32 for index in range(7, -1, -1)]
+        for word in words:
+            data += word.to_bytes(4, "little")
+    return int.from_bytes(hashlib.blake2s(bytes(data), digest_size=32).digest(), "little") % STARK_FIELD_PRIME
+
+
+def _bytecode_segments_hash(
+    bytecode: Sequence[int], lengths: Any, offset: int, hash_many: Callable[[List[int]], int]
+) -> Tuple[int, int]:
+    """Hash and length of the bytecode segment tree `lengths` starting at `offset`."""
+    if isinstance(lengths, int):
+        return hash_many(list(bytecode[offset : offset + lengths])), lengths
+    if not isinstance(lengths, list):
+        raise ValueError("bytecode_segment_lengths must be a nested list of integers")
+    values: List[int] = []
+    total = 0
+    for item in lengths:
+        item_hash, item_length = _bytecode_segments_hash(bytecode, item, offset + total, hash_many)
+        values.extend([item_length, item_hash])
+        total += item_length
+    return hash_many(values) + 1, total
+
+
+def compute_compiled_class_hash(casm: Dict[str, Any], method: str = "poseidon") -> int:
+    """Compute the compiled class hash of a CASM contract class with `method` ("poseidon" or "blake2s")."""
+    if method not in COMPILED_CLASS_HASH_METHODS:
+        raise ValueError(f"unknown compiled class hash method: {method}")
+    hash_many: Callable[[List[int]], int] = poseidon_hash_many if method == "poseidon" else blake2s_hash_many
+    entry_points = casm.get("entry_points_by_type")
+    if not isinstance(entry_points, dict):
+        raise ValueError("CASM contract class has no entry_points_by_type object")
+    bytecode = casm.get("bytecode")
+    if not isinstance(bytecode, list):
+        raise ValueError("CASM contract class has no bytecode list")
+
+    entry_point_hashes = []
+    for entry_point_type in ENTRY_POINT_TYPES:
+        values = []
+        for entry_point in entry_points.get(entry_point_type, []):
+            builtins = [encode_short_string(builtin) for builtin in entry_point.get("builtins", [])]
+            values.append(_parse_felt(entry_point.get("selector"), "entry point selector"))
+            values.append(_parse_felt(entry_point.get("offset"), "entry point offset"))
+            values.append(hash_many(builtins))
+        entry_point_hashes.append(hash_many(values))
+
+    program = [_parse_felt(felt, "CASM bytecode felt") for felt in bytecode]
+    lengths = casm.get("bytecode_segment_lengths")
+    if lengths is None:
+        bytecode_hash = hash_many(program)
+    else:
+        bytecode_hash, total = _bytecode_segments_hash(program, lengths, 0, hash_many)
+        if total != len(program):
+            raise ValueError(f"bytecode segments cover {total} felts, but the bytecode has {len(program)}")
+
+    return hash_many([encode_short_string(COMPILED_CLASS_VERSION), *entry_point_hashes, bytecode_hash])
@@ -2,16 +2,32 @@
 """Generate preset class-hash constants for the external documentation repository."""
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from artifact_manifest import ArtifactManifest
+from class_hash import STARK_FIELD_PRIME, compute_sierra_class_hash_file
+from profiling import PROFILER, add_profile_argument, enable_profiling, profiled_map
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 TARGET_DIR = REPO_ROOT / "target"
-ARTIFACT_MANIFEST = TARGET_DIR / "release/openzeppelin_presets.starknet_artifacts.json"
+PRESETS_PACKAGE_NAME = "openzeppelin_presets"
+ARTIFACT_MANIFEST = TARGET_DIR / f"release/{PRESETS_PACKAGE_NAME}.starknet_artifacts.json"
+CLASS_HASH_CACHE = TARGET_DIR / "release/.class_hash_cache.json"
+CLASS_HASH_CACHE_VERSION = 2
+# Cache entries are keyed by hashing method too, so `--starkli` never reuses native hashes
+CLASS_HASH_METHODS = ("native", "starkli")
+BUILD_FINGERPRINT = TARGET_DIR / "release/.openzeppelin_presets.fingerprint.json"
+PRESETS_PACKAGE = REPO_ROOT / "packages/presets"
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
 PRESET_ORDER = [
     "AccountUpgradeable",
     "ERC20Upgradeable",
@@ -24,7 +40,8 @@ PRESET_ORDER = [
 ]
 HASH_PATTERN = re.compile(r"^0x[0-9a-fA-F]+$")
 SCARB_VERSION_PATTERN = re.compile(r'^scarb-version\s*=\s*"([^"]+)"\s*$', re.MULTILINE)
-STARK_FIELD_PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
+DEPENDENCIES_SECTION_PATTERN = re.compile(r"^\[dependencies\]\s*$(.*?)(?=^\[|\Z)", re.MULTILINE | re.DOTALL)
+PATH_DEPENDENCY_PATTERN = re.compile(r'\bpath\s*=\s*"([^"]+)"')
 
 
 def parse_args() -> argparse.Namespace:
@@ -36,11 +53,44 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Reuse existing release artifacts instead of building openzeppelin_presets.",
     )
+    parser.add_argument(
+        "--force-build",
+        action="store_true",
+        help="Build openzeppelin_presets even if its sources have not changed since the last build.",
+    )
     parser.add_argument(
         "--scarb-version",
         help="Override the scarb version read from the workspace Scarb.toml.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Maximum number of class hashes computed concurrently (default: {DEFAULT_JOBS}).",
+    )
+    parser.add_argument(
+        "--starkli",
+        action="store_true",
+        help="Compute class hashes with `starkli class-hash` instead of the built-in implementation.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every class hash instead of reusing hashes of unchanged Sierra artifacts.",
+    )
+    parser.add_argument(
+        "--contract",
+        action="append",
+        metavar="NAME",
+        help="Only hash this contract, optionally qualified as package::Name (repeatable). Looked up in the "
+        "artifact manifests of every workspace package; contracts outside openzeppelin_presets must "
+        "already be built.",
+    )
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
 
 
 def read_scarb_version() -> str:
@@ -52,27 +102,119 @@ def read_scarb_version() -> str:
 
 
 def build_presets() -> None:
-    subprocess.run(
-        [
-            "scarb",
-            "--manifest-path",
-            str(REPO_ROOT / "Scarb.toml"),
-            "--target-dir",
-            str(TARGET_DIR),
-            "--release",
-            "build",
-            "-p",
-            "openzeppelin_presets",
-        ],
-        cwd=REPO_ROOT,
-        check=True,
-        stdout=sys.stderr,
-    )
+    with PROFILER.span("scarb build", cat="subprocess"):
+        subprocess.run(
+            [
+                "scarb",
+                "--manifest-path",
+                str(REPO_ROOT / "Scarb.toml"),
+                "--target-dir",
+                str(TARGET_DIR),
+                "--release",
+                "build",
+                "-p",
+                PRESETS_PACKAGE_NAME,
+            ],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=sys.stderr,
+        )
 
 
-def read_artifact_manifest() -> Any:
-    with ARTIFACT_MANIFEST.open(encoding="utf-8") as manifest_file:
-        return json.load(manifest_file)
+def package_dependency_dirs(package: Path) -> List[Path]:
+    """Return `package` and every workspace package it depends on through path dependencies.
+
+    Dev-dependencies are not followed since they do not affect the release build.
+    """
+    packages: List[Path] = []
+    queue = [package.resolve()]
+    while queue:
+        current = queue.pop()
+        if current in packages:
+            continue
+        packages.append(current)
+        manifest = (current / "Scarb.toml").read_text(encoding="utf-8")
+        section = DEPENDENCIES_SECTION_PATTERN.search(manifest)
+        if section is not None:
+            for dependency in PATH_DEPENDENCY_PATTERN.findall(section.group(1)):
+                queue.append((current / dependency).resolve())
+    return sorted(packages)
+
+
+def read_scarb_tool_version() -> str:
+    with PROFILER.span("scarb --version", cat="subprocess"):
+        result = subprocess.run(
+            ["scarb", "--version"],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+    return result.stdout.strip()
+
+
+def compute_build_fingerprint(scarb_tool_version: str) -> str:
+    """Digest of every input to the presets release build.
+
+    Covers the files of the presets package and its workspace dependencies, the workspace
+    Scarb.toml and Scarb.lock, and the installed scarb version.
+    """
+    digest = hashlib.sha256()
+    digest.update(scarb_tool_version.encode("utf-8"))
+    inputs = [REPO_ROOT / "Scarb.toml", REPO_ROOT / "Scarb.lock"]
+    for package in package_dependency_dirs(PRESETS_PACKAGE):
+        for path in sorted(package.rglob("*")):
+            relative = path.relative_to(package)
+            if path.is_file() and not any(part == "target" or part.startswith(".") for part in relative.parts):
+                inputs.append(path)
+
+    for path in inputs:
+        digest.update(b"\0" + str(path.relative_to(REPO_ROOT)).encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def stale_build_reason(fingerprint: str) -> Optional[str]:
+    """Explain why the presets must be rebuilt, or return None if the artifacts are up to date.
+
+    The fingerprint is recorded when a build starts, so release artifacts newer than it come
+    from a build of exactly those inputs, whether this script or `scarb build` ran it.
+    """
+    if not ARTIFACT_MANIFEST.is_file():
+        return "no release artifacts found"
+    try:
+        recorded = json.loads(BUILD_FINGERPRINT.read_text(encoding="utf-8")).get("fingerprint")
+    except (OSError, ValueError, AttributeError):
+        return "no build fingerprint recorded"
+    if recorded != fingerprint:
+        return "sources, manifests or scarb version changed since the last build"
+    if ARTIFACT_MANIFEST.stat().st_mtime_ns <= BUILD_FINGERPRINT.stat().st_mtime_ns:
+        return "release artifacts are older than the recorded fingerprint, so the last build did not finish"
+    return None
+
+
+def ensure_presets_built(force: bool = False) -> None:
+    """Build the presets unless the artifacts are newer than a fingerprint matching their inputs."""
+    scarb_tool_version = read_scarb_tool_version()
+    with PROFILER.span("build fingerprint"):
+        fingerprint = compute_build_fingerprint(scarb_tool_version)
+    reason = "build forced with --force-build" if force else stale_build_reason(fingerprint)
+    if reason is None:
+        print(
+            "Skipping openzeppelin_presets build: inputs unchanged and release artifacts newer than the last fingerprint.",
+            file=sys.stderr,
+        )
+        return
+
+    print(f"Building openzeppelin_presets: {reason}.", file=sys.stderr)
+    # Record the fingerprint before building: a failed build leaves the artifacts older than it.
+    BUILD_FINGERPRINT.parent.mkdir(parents=True, exist_ok=True)
+    BUILD_FINGERPRINT.write_text(json.dumps({"fingerprint": fingerprint}) + "\n", encoding="utf-8")
+    build_presets()
+    # scarb may leave artifacts it did not need to rewrite untouched; they are current all the same
+    recorded_at = BUILD_FINGERPRINT.stat().st_mtime_ns
+    if ARTIFACT_MANIFEST.is_file() and ARTIFACT_MANIFEST.stat().st_mtime_ns <= recorded_at:
+        os.utime(ARTIFACT_MANIFEST, ns=(recorded_at + 1, recorded_at + 1))
 
 
 def normalize_hash(value: Any) -> str:
@@ -87,39 +229,18 @@ def normalize_hash(value: Any) -> str:
     return f"0x{digits.zfill(64)}"
 
 
-def extract_preset_artifacts(payload: Any) -> Dict[str, Path]:
-    if not isinstance(payload, dict):
-        raise ValueError("Scarb artifact manifest must be an object")
-
-    contracts = payload.get("contracts")
-    if not isinstance(contracts, list):
-        raise ValueError("Scarb artifact manifest must contain a contracts list")
-
-    artifacts: Dict[str, Path] = {}
-    for contract in contracts:
-        if not isinstance(contract, dict):
-            raise ValueError("each contract entry must be an object")
-
-        name = contract.get("contract_name")
-        if not isinstance(name, str) or not name:
-            raise ValueError("each contract entry must have a contract_name")
-        if name in artifacts:
-            raise ValueError(f"duplicate preset contract: {name}")
-
-        contract_artifacts = contract.get("artifacts")
-        if not isinstance(contract_artifacts, dict):
-            raise ValueError(f"preset contract has no artifacts object: {name}")
-        sierra_file = contract_artifacts.get("sierra")
-        if not isinstance(sierra_file, str) or not sierra_file:
-            raise ValueError(f"preset contract has no Sierra artifact: {name}")
-
-        artifacts[name] = ARTIFACT_MANIFEST.parent / sierra_file
-
-    if not artifacts:
+def extract_preset_artifacts(manifest: ArtifactManifest) -> Dict[str, Path]:
+    """Sierra artifacts of the presets, checked against the documentation constants by name."""
+    names = [entry.name for entry in manifest.contracts(PRESETS_PACKAGE_NAME)]
+    if not names:
         raise ValueError("Scarb artifact manifest contains no preset contracts")
 
-    missing = [name for name in PRESET_ORDER if name not in artifacts]
-    unexpected = sorted(name for name in artifacts if name not in PRESET_ORDER)
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate preset contract: {', '.join(duplicates)}")
+
+    missing = [name for name in PRESET_ORDER if name not in names]
+    unexpected = sorted(name for name in names if name not in PRESET_ORDER)
     if missing or unexpected:
         differences = []
         if missing:
@@ -129,13 +250,29 @@ def extract_preset_artifacts(payload: Any) -> Dict[str, Path]:
         raise ValueError(
             f"preset artifacts do not match the documentation constants ({'; '.join(differences)})"
         )
+    return {name: manifest.artifact(name, package=PRESETS_PACKAGE_NAME) for name in names}
+
+
+def extract_contract_artifacts(manifest: ArtifactManifest, contracts: List[str]) -> Dict[str, Path]:
+    """Sierra artifacts of `contracts`, looked up by name (or `package::Name`) in any workspace package."""
+    artifacts: Dict[str, Path] = {}
+    for contract in contracts:
+        name = manifest.find(contract).name
+        if name in artifacts:
+            raise ValueError(f"contract {name} requested twice")
+        artifacts[name] = manifest.artifact(contract)
     return artifacts
 
 
-def compute_class_hash(artifact: Path) -> str:
+def compute_class_hash(artifact: Path, use_starkli: bool = False) -> str:
     if not artifact.is_file():
         raise ValueError(f"Sierra artifact not found: {artifact}")
+    if use_starkli:
+        return compute_class_hash_with_starkli(artifact)
+    return normalize_hash(hex(compute_sierra_class_hash_file(artifact)))
+
 
+def compute_class_hash_with_starkli(artifact: Path) -> str:
     result = subprocess.run(
         ["starkli", "class-hash", str(artifact)],
         cwd=REPO_ROOT,
@@ -146,8 +283,93 @@ def compute_class_hash(artifact: Path) -> str:
     return normalize_hash(result.stdout.strip())
 
 
-def compute_preset_hashes(artifacts: Dict[str, Path]) -> Dict[str, str]:
-    return {name: compute_class_hash(artifact) for name, artifact in artifacts.items()}
+def artifact_digest(artifact: Path) -> str:
+    if not artifact.is_file():
+        raise ValueError(f"Sierra artifact not found: {artifact}")
+    digest = hashlib.sha256()
+    with artifact.open("rb") as artifact_file:
+        for chunk in iter(lambda: artifact_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def class_hash_cache_key(digest: str, use_starkli: bool = False) -> str:
+    return f"{CLASS_HASH_METHODS[use_starkli]}:{digest}"
+
+
+def read_class_hash_cache() -> Dict[str, str]:
+    """Return the cached class hashes keyed by method and Sierra artifact digest, dropping invalid entries."""
+    try:
+        with CLASS_HASH_CACHE.open(encoding="utf-8") as cache_file:
+            payload = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != CLASS_HASH_CACHE_VERSION:
+        return {}
+    entries = payload.get("hashes")
+    if not isinstance(entries, dict):
+        return {}
+
+    cache: Dict[str, str] = {}
+    for key, class_hash in entries.items():
+        if not isinstance(key, str) or key.partition(":")[0] not in CLASS_HASH_METHODS:
+            continue
+        try:
+            cache[key] = normalize_hash(class_hash)
+        except ValueError:
+            continue
+    return cache
+
+
+def write_class_hash_cache(cache: Dict[str, str]) -> None:
+    temporary = CLASS_HASH_CACHE.with_name(f"{CLASS_HASH_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        temporary.write_text(
+            json.dumps({"version": CLASS_HASH_CACHE_VERSION, "hashes": cache}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(temporary, CLASS_HASH_CACHE)
+    except OSError:
+        # The cache only saves recomputation; failing to persist it is not fatal.
+        temporary.unlink(missing_ok=True)
+
+
+def compute_preset_hashes(
+    artifacts: Dict[str, Path],
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = True,
+    use_starkli: bool = False,
+) -> Dict[str, str]:
+    """Compute the class hash of every preset, hashing at most `jobs` artifacts at once.
+
+    Hashes are memoized by the digest of the Sierra artifact and the hashing method, so
+    unchanged artifacts are never hashed again by the same method.
+    """
+    with PROFILER.span("class hash cache lookup"):
+        cache = read_class_hash_cache() if use_cache else {}
+        keys = {
+            name: class_hash_cache_key(artifact_digest(artifact), use_starkli) for name, artifact in artifacts.items()
+        }
+        pending = sorted({key for key in keys.values() if key not in cache})
+
+    if pending:
+        sources = {keys[name]: artifact for name, artifact in artifacts.items()}
+        pending_artifacts = [sources[key] for key in pending]
+        names = [artifact.name for artifact in pending_artifacts]
+        with PROFILER.span("compute class hashes", count=len(pending)):
+            if jobs > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+                    computed = list(
+                        profiled_map(executor.map, compute_class_hash, names, pending_artifacts, repeat(use_starkli))
+                    )
+            else:
+                computed = list(profiled_map(map, compute_class_hash, names, pending_artifacts, repeat(use_starkli)))
+        fresh = dict(zip(pending, computed))
+        if use_cache:
+            write_class_hash_cache({**cache, **fresh})
+        cache = {**cache, **fresh}
+
+    return {name: cache[keys[name]] for name in artifacts}
 
 
 def ordered_names(hashes: Dict[str, str]) -> List[str]:
@@ -177,12 +399,21 @@ def format_constants(scarb_version: str, hashes: Dict[str, str]) -> str:
 
 def main() -> int:
     args = parse_args()
+    enable_profiling(args.profile)
     try:
         if not args.no_build:
-            build_presets()
-        artifacts = extract_preset_artifacts(read_artifact_manifest())
+            with PROFILER.span("ensure presets built"):
+                ensure_presets_built(args.force_build)
+        with PROFILER.span("read artifact manifest"):
+            manifest = ArtifactManifest(ARTIFACT_MANIFEST.parent)
+            if args.contract:
+                artifacts = extract_contract_artifacts(manifest, args.contract)
+            else:
+                artifacts = extract_preset_artifacts(manifest)
         scarb_version = args.scarb_version or read_scarb_version()
-        hashes = compute_preset_hashes(artifacts)
+        hashes = compute_preset_hashes(
+            artifacts, args.jobs, use_cache=not args.no_cache, use_starkli=args.starkli
+        )
         print(format_constants(scarb_version, hashes), end="")
     except FileNotFoundError as error:
         print(f"error: required file or command not found: {error.filename}", file=sys.stderr)
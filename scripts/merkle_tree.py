@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""Build Merkle trees and proofs compatible with `openzeppelin_merkle_tree`, without external tools.
+
+Trees follow the StandardMerkleTree layout of @ericnordelo/strk-merkle-tree: leaf hashes are
+sorted, stored at the end of a flat array of 2n - 1 nodes, and every internal node `i` is the
+commutative hash of nodes `2i + 1` and `2i + 2`. Both the Pedersen and the Poseidon hashers
+of `merkle_tree/src/hashes.cairo` are supported.
+
+Leaves are streamed from CSV and hashed in batches. The tree is built level by level into
+a memory-mapped file. That file is also the proof format: a header, then the nodes as 32-byte
+records, then a table mapping each CSV row to its node. Any proof therefore takes
+O(log n) random reads.
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from class_hash import STARK_FIELD_PRIME, poseidon_hash_many
+from profiling import PROFILER, add_profile_argument, enable_profiling
+from stark_curve import compute_hash_on_elements, pedersen_hash
+
+FILE_MAGIC = b"OZMERKLE"
+FILE_VERSION = 1
+# magic, version, hash id, leaf count; padded so that nodes start 32-byte aligned
+HEADER = struct.Struct(">8sBB6xQ8x")
+NODE_SIZE = 32
+ROW_INDEX = struct.Struct(">Q")
+HASH_IDS = {"pedersen": 0, "poseidon": 1}
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+# Nodes hashed per task; levels smaller than this are hashed in the parent process
+BATCH_SIZE = 2048
+# Leaf sort record: the 32-byte leaf hash, then its CSV row
+RECORD_SIZE = NODE_SIZE + ROW_INDEX.size
+# Leading hash bits the sort records are bucketed on before each bucket is sorted
+SORT_PREFIX_BITS = 16
+SORT_PREFIX = struct.Struct(f">H{RECORD_SIZE - 2}x")
+
+# Leaf value types and how many felts each is encoded into, following Cairo's `Hash` impls
+TYPE_BOUNDS = {
+    "felt252": STARK_FIELD_PRIME,
+    "ContractAddress": 2 ** 251,
+    "ClassHash": 2 ** 251,
+    "bool": 2,
+    "u8": 2 ** 8,
+    "u16": 2 ** 16,
+    "u32": 2 ** 32,
+    "u64": 2 ** 64,
+    "u128": 2 ** 128,
+    "u256": 2 ** 256,
+}
+
+
+def pedersen_commutative_hash(a: int, b: int) -> int:
+    """`PedersenCHasher::commutative_hash`: the Pedersen chain of the sorted pair and its length."""
+    low, high = (a, b) if a < b else (b, a)
+    return pedersen_hash(pedersen_hash(pedersen_hash(0, low), high), 2)
+
+
+def poseidon_commutative_hash(a: int, b: int) -> int:
+    """`PoseidonCHasher::commutative_hash`: the Poseidon hash of the sorted pair."""
+    return poseidon_hash_many((a, b) if a < b else (b, a))
+
+
+def pedersen_leaf_hash(values: Sequence[int]) -> int:
+    """Leaf hash of the strk-merkle-tree Pedersen encoding: `pedersen(0, H(values..., len))`."""
+    return pedersen_hash(0, compute_hash_on_elements(values))
+
+
+def poseidon_leaf_hash(values: Sequence[int]) -> int:
+    """Leaf hash of the strk-merkle-tree Poseidon encoding: the values are hashed twice."""
+    return poseidon_hash_many([poseidon_hash_many(values)])
+
+
+COMMUTATIVE_HASHES: Dict[str, Callable[[int, int], int]] = {
+    "pedersen": pedersen_commutative_hash,
+    "poseidon": poseidon_commutative_hash,
+}
+LEAF_HASHES: Dict[str, Callable[[Sequence[int]], int]] = {
+    "pedersen": pedersen_leaf_hash,
+    "poseidon": poseidon_leaf_hash,
+}
+
+
+def format_felt(value: int) -> str:
+    return f"{value:#066x}"
+
+
+def parse_value(text: str, value_type: str) -> List[int]:
+    """Parses a decimal or 0x-prefixed CSV cell into the felts `value_type` serializes to."""
+    text = text.strip()
+    try:
+        value = int(text, 16) if text.lower().startswith("0x") else int(text, 10)
+    except ValueError:
+        raise ValueError(f"invalid {value_type} value: {text!r}") from None
+    if not 0 <= value < TYPE_BOUNDS[value_type]:
+        raise ValueError(f"{value_type} value out of range: {text}")
+    if value_type == "u256":
+        return [value % 2 ** 128, value >> 128]
+    return [value]
+
+
+def encode_row(row: Sequence[str], types: Sequence[str]) -> List[int]:
+    if len(row) != len(types):
+        raise ValueError(f"expected {len(types)} columns, found {len(row)}")
+    values: List[int] = []
+    for cell, value_type in zip(row, types):
+        values.extend(parse_value(cell, value_type))
+    return values
+
+
+def read_csv_rows(path: Path, skip_header: bool) -> Iterator[List[str]]:
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if row and any(cell.strip() for cell in row):
+                yield row
+
+
+def hash_leaf_batch(hash_name: str, types: Sequence[str], first_row: int, rows: Sequence[Sequence[str]]) -> bytes:
+    """Hashes a batch of CSV rows into sort records: the 32-byte leaf hash, then the row index."""
+    leaf_hash = LEAF_HASHES[hash_name]
+    records = bytearray()
+    for offset, row in enumerate(rows):
+        row_index = first_row + offset
+        try:
+            values = encode_row(row, types)
+        except ValueError as e:
+            raise ValueError(f"row {row_index}: {e}") from None
+        records += leaf_hash(values).to_bytes(NODE_SIZE, "big") + ROW_INDEX.pack(row_index)
+    return bytes(records)
+
+
+def hash_node_batch(hash_name: str, children: bytes) -> bytes:
+    """Hashes consecutive pairs of 32-byte child nodes into their parents."""
+    commutative_hash = COMMUTATIVE_HASHES[hash_name]
+    parents = bytearray()
+    for offset in range(0, len(children), 2 * NODE_SIZE):
+        left = int.from_bytes(children[offset:offset + NODE_SIZE], "big")
+        right = int.from_bytes(children[offset + NODE_SIZE:offset + 2 * NODE_SIZE], "big")
+        parents += commutative_hash(left, right).to_bytes(NODE_SIZE, "big")
+    return bytes(parents)
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def windowed_map(map_fn: Callable[..., Iterable[Any]], fn: Callable[..., Any], window: int, *iterables: Iterable[Any]) -> Iterator[Any]:
+    """`map_fn(fn, *iterables)` submitted `window` calls at a time, since executor maps consume
+    their inputs eagerly and would otherwise read the whole input into memory."""
+    for chunk in batched(zip(*iterables), window):
+        yield from map_fn(fn, *zip(*chunk))
+
+
+def hash_leaves(
+    csv_path: Path, hash_name: str, types: Sequence[str], skip_header: bool, map_fn: Callable[..., Iterable[bytes]], window: int
+) -> bytearray:
+    """Leaf sort records, in CSV order, packed into one buffer. Batches are hashed as they are read."""
+    batches = batched(read_csv_rows(csv_path, skip_header), BATCH_SIZE)
+    starts = range(0, sys.maxsize, BATCH_SIZE)
+    records = bytearray()
+    for batch in windowed_map(map_fn, hash_leaf_batch, window, repeat(hash_name), repeat(types), starts, batches):
+        records += batch
+    return records
+
+
+def sort_records(records: bytearray) -> None:
+    """Sorts packed sort records in place, by hash and then by row.
+
+    Records are first moved into buckets of their leading hash bits, swapping them in place
+    (an American flag sort), and each bucket, a tiny fraction of the leaves for uniformly
+    distributed hashes, is then sorted on its own. Only one bucket is ever unpacked.
+    """
+    count = len(records) // RECORD_SIZE
+    shift = SORT_PREFIX_BITS - min(SORT_PREFIX_BITS, count.bit_length())
+    buckets = [0] * (1 << (SORT_PREFIX_BITS - shift))
+    for (prefix,) in SORT_PREFIX.iter_unpack(records):
+        buckets[prefix >> shift] += 1
+    ends = []
+    end = 0
+    for size in buckets:
+        end += size
+        ends.append(end)
+    # Next unsorted slot of each bucket
+    heads = [end - size for end, size in zip(ends, buckets)]
+    for bucket, end in enumerate(ends):
+        while heads[bucket] < end:
+            position = heads[bucket] * RECORD_SIZE
+            target = SORT_PREFIX.unpack_from(records, position)[0] >> shift
+            if target == bucket:
+                heads[bucket] += 1
+                continue
+            other = heads[target] * RECORD_SIZE
+            heads[target] += 1
+            record = records[position:position + RECORD_SIZE]
+            records[position:position + RECORD_SIZE] = records[other:other + RECORD_SIZE]
+            records[other:other + RECORD_SIZE] = record
+    start = 0
+    for end in ends:
+        if end - start > 1:
+            first, last = start * RECORD_SIZE, end * RECORD_SIZE
+            bucket_records = [records[offset:offset + RECORD_SIZE] for offset in range(first, last, RECORD_SIZE)]
+            # Big-endian hashes sort bytewise in numeric order
+            bucket_records.sort()
+            records[first:last] = b"".join(bucket_records)
+        start = end
+
+
+def nodes_offset(index: int) -> int:
+    return HEADER.size + index * NODE_SIZE
+
+
+def build_tree(
+    csv_path: Path,
+    output: Path,
+    hash_name: str,
+    types: Sequence[str],
+    skip_header: bool = False,
+    jobs: int = DEFAULT_JOBS,
+) -> int:
+    """Writes the tree of the CSV leaves to `output` and returns its root.
+
+    Only the sort records of the leaves are held in memory, packed into one buffer of 40
+    bytes per leaf and sorted in place; the nodes are written to and read back from the
+    memory-mapped output one batch at a time.
+    """
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    map_fn = executor.map if executor is not None else map
+    try:
+        with PROFILER.span("hash leaves", hash=hash_name):
+            records = hash_leaves(csv_path, hash_name, types, skip_header, map_fn, 2 * jobs)
+        leaf_count = len(records) // RECORD_SIZE
+        if leaf_count == 0:
+            raise ValueError(f"{csv_path} has no leaves")
+        with PROFILER.span("sort leaves", leaves=leaf_count):
+            sort_records(records)
+
+        node_count = 2 * leaf_count - 1
+        size = nodes_offset(node_count) + leaf_count * ROW_INDEX.size
+        tmp_output = output.with_name(output.name + ".tmp")
+        with open(tmp_output, "w+b") as tree_file:
+            tree_file.truncate(size)
+            with mmap.mmap(tree_file.fileno(), size) as buf:
+                buf[:HEADER.size] = HEADER.pack(FILE_MAGIC, FILE_VERSION, HASH_IDS[hash_name], leaf_count)
+                rows_offset = nodes_offset(node_count)
+                with PROFILER.span("write leaves"):
+                    for position in range(leaf_count):
+                        # The smallest leaf goes last, as in strk-merkle-tree
+                        index = node_count - 1 - position
+                        record = position * RECORD_SIZE
+                        buf[nodes_offset(index):nodes_offset(index + 1)] = records[record:record + NODE_SIZE]
+                        row_index = ROW_INDEX.unpack_from(records, record + NODE_SIZE)[0]
+                        ROW_INDEX.pack_into(buf, rows_offset + row_index * ROW_INDEX.size, index)
+                del records
+                build_internal_nodes(buf, leaf_count, hash_name, map_fn, 2 * jobs)
+                root = int.from_bytes(buf[nodes_offset(0):nodes_offset(1)], "big")
+                buf.flush()
+        os.replace(tmp_output, output)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return root
+
+
+def build_internal_nodes(
+    buf: mmap.mmap, leaf_count: int, hash_name: str, map_fn: Callable[..., Iterable[bytes]], window: int
+) -> None:
+    """Fills the internal nodes 0..n-2 level by level, deepest first; the children of a level are
+    the level below it, so each level's batches are independent and can be hashed in parallel."""
+    last_internal = leaf_count - 2
+    if last_internal < 0:
+        return
+    for depth in range((last_internal + 1).bit_length() - 1, -1, -1):
+        first, last = 2 ** depth - 1, min(2 ** (depth + 1) - 2, last_internal)
+        with PROFILER.span(f"level {depth}", nodes=last - first + 1):
+            starts = range(first, last + 1, BATCH_SIZE)
+            children = (
+                buf[nodes_offset(2 * start + 1):nodes_offset(2 * min(start + BATCH_SIZE - 1, last) + 3)]
+                for start in starts
+            )
+            level_map = map_fn if last - first + 1 > BATCH_SIZE else map
+            for start, parents in zip(starts, windowed_map(level_map, hash_node_batch, window, repeat(hash_name), children)):
+                buf[nodes_offset(start):nodes_offset(start) + len(parents)] = parents
+
+
+class MerkleTreeFile:
+    """Read-only, memory-mapped view of a tree written by `build_tree`."""
+
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a Merkle tree file") from None
+        if len(self._buf) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a Merkle tree file")
+        magic, version, hash_id, self.leaf_count = HEADER.unpack_from(self._buf)
+        hash_names = {value: key for key, value in HASH_IDS.items()}
+        if magic != FILE_MAGIC or version != FILE_VERSION or hash_id not in hash_names:
+            self.close()
+            raise ValueError(f"{path} is not a version {FILE_VERSION} Merkle tree file")
+        self.hash_name = hash_names[hash_id]
+        self.node_count = 2 * self.leaf_count - 1
+        self._rows_offset = nodes_offset(self.node_count)
+
+    def close(self) -> None:
+        if hasattr(self, "_buf"):
+            self._buf.close()
+        self._file.close()
+
+    def __enter__(self) -> "MerkleTreeFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def node(self, index: int) -> int:
+        return int.from_bytes(self._buf[nodes_offset(index):nodes_offset(index + 1)], "big")
+
+    @property
+    def root(self) -> int:
+        return self.node(0)
+
+    def tree_index(self, row: int) -> int:
+        """Node index of the leaf from CSV row `row` (0-based, header excluded)."""
+        if not 0 <= row < self.leaf_count:
+            raise IndexError(f"leaf index {row} out of range (the tree has {self.leaf_count} leaves)")
+        return ROW_INDEX.unpack_from(self._buf, self._rows_offset + row * ROW_INDEX.size)[0]
+
+    def leaf(self, row: int) -> int:
+        return self.node(self.tree_index(row))
+
+    def proof(self, row: int) -> List[int]:
+        """Sibling hashes from the leaf of `row` up to the root, as `verify` expects them."""
+        index = self.tree_index(row)
+        proof = []
+        while index > 0:
+            proof.append(self.node(index + 1 if index % 2 == 1 else index - 1))
+            index = (index - 1) // 2
+        return proof
+
+    def multi_proof(self, rows: Sequence[int]) -> Dict[str, Any]:
+        """Proof of several leaves for `verify_multi_proof`, following strk-merkle-tree's
+        `getMultiProof`: leaves are ordered by descending node index, and are returned with
+        their rows so callers can match them to their values."""
+        indices = sorted((self.tree_index(row) for row in rows), reverse=True)
+        if len(set(indices)) != len(indices):
+            raise ValueError("cannot prove duplicated leaves")
+        rows_by_index = {self.tree_index(row): row for row in rows}
+        queue = list(indices)
+        head = 0
+        proof: List[int] = []
+        proof_flags: List[bool] = []
+        while head < len(queue) and queue[head] > 0:
+            index = queue[head]
+            head += 1
+            sibling = index + 1 if index % 2 == 1 else index - 1
+            if head < len(queue) and queue[head] == sibling:
+                proof_flags.append(True)
+                head += 1
+            else:
+                proof_flags.append(False)
+                proof.append(self.node(sibling))
+            queue.append((index - 1) // 2)
+        if not indices:
+            proof.append(self.root)
+        return {
+            "rows": [rows_by_index[index] for index in indices],
+            "leaves": [self.node(index) for index in indices],
+            "proof": proof,
+            "proof_flags": proof_flags,
+        }
+
+
+def process_proof(hash_name: str, proof: Sequence[int], leaf: int) -> int:
+    """Python version of the Cairo `process_proof`."""
+    commutative_hash = COMMUTATIVE_HASHES[hash_name]
+    computed = leaf
+    for sibling in proof:
+        computed = commutative_hash(computed, sibling)
+    return computed
+
+
+def process_multi_proof(hash_name: str, proof: Sequence[int], proof_flags: Sequence[bool], leaves: Sequence[int]) -> int:
+    """Python version of the Cairo `process_multi_proof`."""
+    commutative_hash = COMMUTATIVE_HASHES[hash_name]
+    if len(leaves) + len(proof) != len(proof_flags) + 1:
+        raise ValueError("MerkleProof: invalid multi proof")
+    hashes: List[int] = []
+    leaf_pos = hash_pos = proof_pos = 0
+    for flag in proof_flags:
+        if leaf_pos < len(leaves):
+            a = leaves[leaf_pos]
+            leaf_pos += 1
+        else:
+            a = hashes[hash_pos]
+            hash_pos += 1
+        if flag:
+            if leaf_pos < len(leaves):
+                b = leaves[leaf_pos]
+                leaf_pos += 1
+            else:
+                b = hashes[hash_pos]
+                hash_pos += 1
+        else:
+            b = proof[proof_pos]
+            proof_pos += 1
+        hashes.append(commutative_hash(a, b))
+    if proof_flags:
+        return hashes[-1]
+    return leaves[0] if leaves else proof[0]
+
+
+def format_proof(tree: MerkleTreeFile, row: int) -> Dict[str, Any]:
+    return {"index": row, "leaf": format_felt(tree.leaf(row)), "proof": [format_felt(node) for node in tree.proof(row)]}
+
+
+def format_multi_proof(multi_proof: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "rows": multi_proof["rows"],
+        "leaves": [format_felt(leaf) for leaf in multi_proof["leaves"]],
+        "proof": [format_felt(node) for node in multi_proof["proof"]],
+        "proof_flags": multi_proof["proof_flags"],
+    }
+
+
+def verify_document(hash_name: str, root: int, document: Dict[str, Any]) -> bool:
+    """Checks a `proof` or `multiproof` JSON document against `root`."""
+    proof = [int(node, 16) for node in document["proof"]]
+    if "proof_flags" in document:
+        leaves = [int(leaf, 16) for leaf in document["leaves"]]
+        return process_multi_proof(hash_name, proof, document["proof_flags"], leaves) == root
+    return process_proof(hash_name, proof, int(document["leaf"], 16)) == root
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build Merkle trees and proofs for openzeppelin_merkle_tree from CSV leaves."
+    )
+    # Accept --profile after the subcommand, next to its other options
+    common = argparse.ArgumentParser(add_help=False)
+    add_profile_argument(common)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", parents=[common], help="Build a tree file from a CSV file with one leaf per row.")
+    build.add_argument("csv", type=Path, help="CSV file; each row holds the values of one leaf.")
+    build.add_argument("-o", "--output", type=Path, required=True, help="Tree file to write.")
+    build.add_argument("--hash", choices=sorted(HASH_IDS), default="poseidon", help="Hash function (default: poseidon).")
+    build.add_argument(
+        "--types",
+        default="felt252",
+        help=(
+            "Comma-separated Cairo types of the CSV columns, one of "
+            f"{', '.join(TYPE_BOUNDS)} (default: felt252 for a single column). "
+            "u256 values are hashed as their low and high halves."
+        ),
+    )
+    build.add_argument("--header", action="store_true", help="Skip the first CSV row.")
+    build.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help=f"Worker processes (default: {DEFAULT_JOBS}).")
+
+    root = commands.add_parser("root", parents=[common], help="Print the root of a tree file.")
+    root.add_argument("tree", type=Path)
+
+    proof = commands.add_parser("proof", parents=[common], help="Print the proof of one leaf as JSON.")
+    proof.add_argument("tree", type=Path)
+    proof.add_argument("index", type=int, help="0-based CSV row of the leaf, header excluded.")
+
+    multi_proof = commands.add_parser("multiproof", parents=[common], help="Print a multiproof of several leaves as JSON.")
+    multi_proof.add_argument("tree", type=Path)
+    multi_proof.add_argument("indices", type=int, nargs="+", help="0-based CSV rows of the leaves.")
+
+    proofs = commands.add_parser("proofs", parents=[common], help="Write the proof of every leaf as JSON lines, in CSV order.")
+    proofs.add_argument("tree", type=Path)
+    proofs.add_argument("-o", "--output", type=Path, help="File to write (default: stdout).")
+
+    verify = commands.add_parser("verify", parents=[common], help="Check a proof or multiproof JSON document against a tree's root.")
+    verify.add_argument("tree", type=Path)
+    verify.add_argument("document", type=Path, help="JSON printed by `proof` or `multiproof` ('-' for stdin).")
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.command == "build":
+        types = [value_type.strip() for value_type in args.types.split(",")]
+        unknown = [value_type for value_type in types if value_type not in TYPE_BOUNDS]
+        if unknown:
+            raise ValueError(f"unknown types: {', '.join(unknown)}")
+        root = build_tree(args.csv, args.output, args.hash, types, args.header, max(1, args.jobs))
+        print(format_felt(root))
+        return 0
+
+    with MerkleTreeFile(args.tree) as tree:
+        if args.command == "root":
+            print(format_felt(tree.root))
+        elif args.command == "proof":
+            print(json.dumps(format_proof(tree, args.index), indent=2))
+        elif args.command == "multiproof":
+            print(json.dumps(format_multi_proof(tree.multi_proof(args.indices)), indent=2))
+        elif args.command == "proofs":
+            with PROFILER.span("write proofs", leaves=tree.leaf_count):
+                out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+                try:
+                    for row in range(tree.leaf_count):
+                        out.write(json.dumps(format_proof(tree, row)) + "\n")
+                finally:
+                    if args.output:
+                        out.close()
+        elif args.command == "verify":
+            if str(args.document) == "-":
+                document = json.load(sys.stdin)
+            else:
+                document = json.loads(args.document.read_text(encoding="utf-8"))
+            if not verify_document(tree.hash_name, tree.root, document):
+                print("invalid proof", file=sys.stderr)
+                return 1
+            print("valid proof")
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    enable_profiling(args.profile)
+    try:
+        return run(args)
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
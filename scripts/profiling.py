@@ -0,0 +1,173 @@
+"""Opt-in wall-time and peak-RSS profiling for the repository scripts.
+
+Spans are recorded as Chrome trace events, so the file written by `--profile` opens in
+chrome://tracing or https://ui.perfetto.dev. When profiling is disabled every helper is a
+no-op, and the scripts run exactly as before.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _now_us() -> int:
+    # Wall-clock microseconds, so spans from worker processes line up with the parent's
+    return time.time_ns() // 1000
+
+
+def peak_rss_kb() -> Dict[str, int]:
+    """Peak resident set size of this process and of its waited-for children, in KiB."""
+    if resource is None:
+        return {}
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    scale = 1024 if sys.platform == "darwin" else 1
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    }
+
+
+def _complete_event(name: str, cat: str, start: int, end: int, args: Dict[str, Any]) -> Dict[str, Any]:
+    event = {
+        "name": name,
+        "cat": cat,
+        "ph": "X",
+        "ts": start,
+        "dur": end - start,
+        "pid": os.getpid(),
+        "tid": threading.get_native_id(),
+    }
+    if args:
+        event["args"] = args
+    return event
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "cat", "args", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = _now_us()
+        self.profiler.add_event(_complete_event(self.name, self.cat, self.start, end, self.args))
+        if self.cat == "stage":
+            self.profiler.add_event(
+                {"name": "peak RSS (KiB)", "ph": "C", "ts": end, "pid": os.getpid(), "args": peak_rss_kb()}
+            )
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Profiler:
+    """Collects trace events in memory; spans are thread-safe."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self.started = 0
+        self._lock = threading.Lock()
+
+    def span(self, name: str, cat: str = "stage", **args: Any):
+        """Time a `with` block. Stages also sample the peak RSS when they end."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, cat, args)
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, path: str) -> None:
+        end = _now_us()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": os.path.basename(sys.argv[0])}},
+            _complete_event("total", "stage", self.started, end, {"argv": sys.argv[1:]}),
+            *self.events,
+        ]
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"command": sys.argv, "peak_rss_kb": peak_rss_kb()},
+        }
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(trace, trace_file)
+        print(f"Profile written to {path} ({len(events)} events)", file=sys.stderr)
+
+
+PROFILER = Profiler()
+
+
+def enable_profiling(path: Optional[str]) -> None:
+    """Start recording if `path` is set; the trace is written when the interpreter exits."""
+    if not path:
+        return
+    PROFILER.enabled = True
+    PROFILER.started = _now_us()
+    atexit.register(PROFILER.write, path)
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE_JSON",
+        help="Record wall time per stage and per file, plus peak RSS, as a Chrome trace JSON file.",
+    )
+
+
+def traced_call(fn: Callable[..., Any], name: str, cat: str, *args: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Call `fn(*args)` and return its result with a trace event. Runs in worker processes too."""
+    start = _now_us()
+    result = fn(*args)
+    return result, _complete_event(name, cat, start, _now_us(), {})
+
+
+def profiled_map(
+    map_fn: Callable[..., Iterable[Any]],
+    fn: Callable[..., Any],
+    names: Iterable[str],
+    *iterables: Iterable[Any],
+    cat: str = "file",
+) -> Iterable[Any]:
+    """`map_fn(fn, *iterables)` (the builtin map or an executor's), with one span per call when profiling.
+
+    Spans are recorded in the process that runs each call and collected here, so the same
+    code path works for serial, thread-pool and process-pool maps.
+    """
+    if not PROFILER.enabled:
+        return map_fn(fn, *iterables)
+    results = []
+    for result, event in map_fn(traced_call, repeat(fn), names, repeat(cat), *iterables):
+        PROFILER.add_event(event)
+        results.append(result)
+    return results
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Generate batches of signed transactions for account validation benchmarks and tests.
+
+Every transaction is an invoke v3 multicall of ERC20 transfers, with its Starknet transaction
+hash signed by the Stark key of `AccountUpgradeable` and/or the secp256k1 key of
+`EthAccountUpgradeable`. The default keys are the `KEY_PAIR()` constants of
+`openzeppelin_testing`. The output is either a Cairo module of `SignedTransactionData`
+fixtures for `openzeppelin_test_common`, or JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from class_hash import STARK_FIELD_PRIME, encode_short_string, get_selector_from_name, hades_permutation, poseidon_hash_many
+from profiling import PROFILER, add_profile_argument, enable_profiling, profiled_map
+from signing import (
+    SECP256K1,
+    STARK_CURVE,
+    get_public_point,
+    get_stark_public_key,
+    secp256k1_sign_batch,
+    secp256k1_verify,
+    stark_sign_batch,
+    stark_verify,
+)
+
+SCHEMES = ("stark", "secp256k1")
+INVOKE_PREFIX = encode_short_string("invoke")
+TRANSACTION_VERSION = 3
+TRANSFER_SELECTOR = get_selector_from_name("transfer")
+# (resource, max amount, max price per unit), hashed as resource << 192 | amount << 128 | price
+RESOURCE_BOUNDS = (
+    ("L1_GAS", 0, 0),
+    ("L2_GAS", 10 ** 8, 10 ** 10),
+    ("L1_DATA", 10 ** 4, 10 ** 9),
+)
+DEFAULT_STARK_KEY = encode_short_string("PRIVATE_KEY")
+DEFAULT_SECP256K1_KEY = (encode_short_string("PRIVATE_HIGH") << 128) + encode_short_string("PRIVATE_LOW")
+DEFAULT_ACCOUNT = encode_short_string("ACCOUNT")
+DEFAULT_TOKEN = encode_short_string("TOKEN")
+DEFAULT_RECIPIENT = encode_short_string("RECIPIENT")
+DEFAULT_CHAIN_ID = "SN_SEPOLIA"
+# Transactions signed per task
+BATCH_SIZE = 256
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+CAIRO_OUTPUT = "cairo"
+JSON_OUTPUT = "json"
+
+
+class BatchConfig(NamedTuple):
+    schemes: Tuple[str, ...]
+    stark_key: int
+    secp256k1_key: int
+    account: int
+    token: int
+    recipient: int
+    calls: int
+    chain_id: int
+    first_nonce: int
+
+
+def parse_int(text: str) -> int:
+    return int(text, 0)
+
+
+def parse_felt_or_short_string(text: str) -> int:
+    """A decimal or 0x-prefixed felt, or a Cairo short string such as SN_MAIN."""
+    try:
+        value = int(text, 0)
+    except ValueError:
+        value = encode_short_string(text)
+    if not 0 <= value < STARK_FIELD_PRIME:
+        raise argparse.ArgumentTypeError(f"{text} is outside the Stark field")
+    return value
+
+
+def resource_bounds_hash(tip: int = 0) -> int:
+    return poseidon_hash_many(
+        [tip]
+        + [(encode_short_string(name) << 192) + (max_amount << 128) + max_price for name, max_amount, max_price in RESOURCE_BOUNDS]
+    )
+
+
+def sponge_absorb(state: Tuple[int, int, int], values: Sequence[int]) -> Tuple[int, int, int]:
+    """Absorbs an even number of `values` into a Poseidon sponge state, like `poseidon_hash_many`."""
+    s0, s1, s2 = state
+    for index in range(0, len(values), 2):
+        s0, s1, s2 = hades_permutation(s0 + values[index], s1 + values[index + 1], s2)
+    return s0, s1, s2
+
+
+def multicall_calldata(config: BatchConfig, nonce: int) -> List[int]:
+    """`__execute__` calldata: `Array<Call>` of ERC20 `transfer(recipient, 1)` calls, one recipient per call."""
+    calldata = [config.calls]
+    for call in range(config.calls):
+        recipient = config.recipient + (nonce - config.first_nonce) * config.calls + call
+        calldata += [config.token, TRANSFER_SELECTOR, 3, recipient, 1, 0]
+    return calldata
+
+
+def invoke_v3_hashes(config: BatchConfig, nonces: Sequence[int]) -> List[int]:
+    """Invoke v3 transaction hashes of the multicalls with `nonces`.
+
+    The hashed fields up to the chain id are the same for every transaction, so the sponge
+    state after absorbing them is computed once per batch.
+    """
+    empty_hash = poseidon_hash_many([])
+    prefix_state = sponge_absorb(
+        (0, 0, 0),
+        [INVOKE_PREFIX, TRANSACTION_VERSION, config.account, resource_bounds_hash(), empty_hash, config.chain_id],
+    )
+    hashes = []
+    for nonce in nonces:
+        calldata_hash = poseidon_hash_many(multicall_calldata(config, nonce))
+        # Nonce and fee data availability modes are both L1 (0)
+        s0, s1, s2 = sponge_absorb(prefix_state, [nonce, 0, empty_hash, calldata_hash])
+        hashes.append(hades_permutation(s0 + 1, s1, s2)[0])
+    return hashes
+
+
+def sign_batch(config: BatchConfig, first: int, count: int) -> List[Dict[str, Any]]:
+    """Builds and signs the transactions with nonces `first .. first + count - 1`."""
+    nonces = list(range(first, first + count))
+    tx_hashes = invoke_v3_hashes(config, nonces)
+    entries: List[Dict[str, Any]] = [{"nonce": nonce, "tx_hash": tx_hash} for nonce, tx_hash in zip(nonces, tx_hashes)]
+    if "stark" in config.schemes:
+        for entry, signature in zip(entries, stark_sign_batch(config.stark_key, tx_hashes)):
+            entry["stark"] = signature
+    if "secp256k1" in config.schemes:
+        for entry, signature in zip(entries, secp256k1_sign_batch(config.secp256k1_key, tx_hashes)):
+            entry["secp256k1"] = signature
+    return entries
+
+
+def generate(config: BatchConfig, count: int, jobs: int) -> List[Dict[str, Any]]:
+    starts = list(range(config.first_nonce, config.first_nonce + count, BATCH_SIZE))
+    sizes = [min(BATCH_SIZE, config.first_nonce + count - start) for start in starts]
+    names = [f"nonces {start}..{start + size - 1}" for start, size in zip(starts, sizes)]
+    with PROFILER.span("sign", transactions=count, schemes=",".join(config.schemes)):
+        if jobs > 1 and len(starts) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                batches = list(profiled_map(executor.map, sign_batch, names, repeat(config), starts, sizes, cat="batch"))
+        else:
+            batches = list(profiled_map(map, sign_batch, names, repeat(config), starts, sizes, cat="batch"))
+    return [entry for batch in batches for entry in batch]
+
+
+def verify_entries(config: BatchConfig, entries: Sequence[Dict[str, Any]]) -> None:
+    """Checks every signature against the public keys, with plain (slow) scalar multiplication."""
+    with PROFILER.span("verify", transactions=len(entries)):
+        stark_point = get_public_point(STARK_CURVE, config.stark_key)
+        secp256k1_point = get_public_point(SECP256K1, config.secp256k1_key)
+        for entry in entries:
+            if "stark" in entry and not stark_verify(entry["tx_hash"], *entry["stark"], stark_point):
+                raise ValueError(f"invalid Stark signature for nonce {entry['nonce']}")
+            if "secp256k1" in entry and not secp256k1_verify(entry["tx_hash"], *entry["secp256k1"], secp256k1_point):
+                raise ValueError(f"invalid secp256k1 signature for nonce {entry['nonce']}")
+
+
+def format_json(config: BatchConfig, entries: Sequence[Dict[str, Any]]) -> str:
+    def hex_all(values: Sequence[int]) -> List[str]:
+        return [hex(value) for value in values]
+
+    keys: Dict[str, Any] = {}
+    if "stark" in config.schemes:
+        keys["stark"] = {"public_key": hex(get_stark_public_key(config.stark_key))}
+    if "secp256k1" in config.schemes:
+        x, y = get_public_point(SECP256K1, config.secp256k1_key)
+        keys["secp256k1"] = {"public_key": {"x": hex(x), "y": hex(y)}}
+    transactions = []
+    for entry in entries:
+        transaction = {
+            "nonce": entry["nonce"],
+            "tx_hash": hex(entry["tx_hash"]),
+            "calldata": hex_all(multicall_calldata(config, entry["nonce"])),
+        }
+        for scheme in SCHEMES:
+            if scheme in entry:
+                r, s = entry[scheme]
+                # Serialized as the accounts read them: felts for Stark, u256 halves for secp256k1
+                transaction[f"{scheme}_signature"] = hex_all([r, s] if scheme == "stark" else [r % 2 ** 128, r >> 128, s % 2 ** 128, s >> 128])
+        transactions.append(transaction)
+    document = {
+        "version": TRANSACTION_VERSION,
+        "account": hex(config.account),
+        "chain_id": hex(config.chain_id),
+        "keys": keys,
+        "transactions": transactions,
+    }
+    return json.dumps(document, indent=2) + "\n"
+
+
+def format_cairo(config: BatchConfig, entries: Sequence[Dict[str, Any]], command: str) -> str:
+    stark = "stark" in config.schemes
+    secp256k1 = "secp256k1" in config.schemes
+    lines = [
+        f"// Generated by `{command}`; do not edit.",
+        f"// Invoke v3 multicalls of {config.calls} ERC20 transfer(s) from {config.account:#x} with nonces",
+        f"// {config.first_nonce}..{config.first_nonce + len(entries) - 1}, on chain id {config.chain_id:#x}.",
+        "",
+    ]
+    imports = []
+    if secp256k1:
+        imports += [
+            "use openzeppelin_account::utils::signature::Secp256Signature;",
+            "use starknet::SyscallResultTrait;",
+            "use starknet::secp256_trait::Secp256Trait;",
+            "use starknet::secp256k1::Secp256k1Point;",
+        ]
+    if stark:
+        imports.append("use crate::account::SignedTransactionData;")
+    if secp256k1:
+        imports.append("use crate::eth_account::SignedTransactionData as EthSignedTransactionData;")
+    lines += imports + ["", f"pub const SIGNED_TX_COUNT: u32 = {len(entries)};"]
+
+    if stark:
+        lines += [
+            f"pub const STARK_PUBLIC_KEY: felt252 = {get_stark_public_key(config.stark_key):#x};",
+            "",
+            "pub fn STARK_SIGNED_TXS() -> Array<SignedTransactionData> {",
+            "    array![",
+        ]
+        for entry in entries:
+            r, s = entry["stark"]
+            lines += [
+                "        SignedTransactionData {",
+                f"            tx_hash: {entry['tx_hash']:#x},",
+                f"            r: {r:#x},",
+                f"            s: {s:#x},",
+                "        },",
+            ]
+        lines += ["    ]", "}"]
+
+    if secp256k1:
+        x, y = get_public_point(SECP256K1, config.secp256k1_key)
+        lines += [
+            "",
+            "pub fn ETH_PUBLIC_KEY() -> Secp256k1Point {",
+            "    Secp256Trait::secp256_ec_new_syscall(",
+            f"        {x:#x},",
+            f"        {y:#x},",
+            "    )",
+            "        .unwrap_syscall()",
+            "        .unwrap()",
+            "}",
+            "",
+            "pub fn ETH_SIGNED_TXS() -> Array<EthSignedTransactionData> {",
+            "    let public_key = ETH_PUBLIC_KEY();",
+            "    array![",
+        ]
+        for entry in entries:
+            r, s = entry["secp256k1"]
+            lines += [
+                "        EthSignedTransactionData {",
+                f"            private_key: {config.secp256k1_key:#x},",
+                "            public_key,",
+                f"            tx_hash: {entry['tx_hash']:#x},",
+                "            signature: Secp256Signature {",
+                f"                r: {r:#x},",
+                f"                s: {s:#x},",
+                "            },",
+                "        },",
+            ]
+        lines += ["    ]", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def command_options(argv: Sequence[str]) -> List[str]:
+    """The options that shape the fixtures, for the header of the generated module."""
+    options: List[str] = []
+    skip_value = False
+    for arg in argv:
+        if skip_value:
+            skip_value = False
+        elif arg in ("-o", "--output", "--profile", "-j", "--jobs"):
+            skip_value = True
+        elif not arg.startswith(("--output=", "--profile=", "--jobs=")) and arg != "--verify":
+            options.append(arg)
+    return options
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate signed invoke transactions for account and EthAccount validation benchmarks."
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Number of transactions (default: 1000).")
+    parser.add_argument(
+        "--scheme",
+        choices=[*SCHEMES, "all"],
+        default="all",
+        help="Sign with the Stark key, the secp256k1 key, or both (default: all).",
+    )
+    parser.add_argument(
+        "--stark-key",
+        type=parse_int,
+        default=DEFAULT_STARK_KEY,
+        help="Stark private key (default: 'PRIVATE_KEY', as in openzeppelin_testing's stark::KEY_PAIR).",
+    )
+    parser.add_argument(
+        "--secp256k1-key",
+        type=parse_int,
+        default=DEFAULT_SECP256K1_KEY,
+        help="secp256k1 private key (default: the u256 of secp256k1::KEY_PAIR in openzeppelin_testing).",
+    )
+    parser.add_argument("--account", type=parse_felt_or_short_string, default=DEFAULT_ACCOUNT, help="Sender account address.")
+    parser.add_argument("--token", type=parse_felt_or_short_string, default=DEFAULT_TOKEN, help="ERC20 contract the calls transfer from.")
+    parser.add_argument(
+        "--recipient",
+        type=parse_felt_or_short_string,
+        default=DEFAULT_RECIPIENT,
+        help="First recipient address; every call transfers to the next one.",
+    )
+    parser.add_argument("--calls", type=int, default=1, help="Transfers per multicall (default: 1).")
+    parser.add_argument("--nonce", type=int, default=0, help="Nonce of the first transaction (default: 0).")
+    parser.add_argument(
+        "--chain-id",
+        type=parse_felt_or_short_string,
+        default=encode_short_string(DEFAULT_CHAIN_ID),
+        help=f"Chain id, as a number or short string (default: {DEFAULT_CHAIN_ID}).",
+    )
+    parser.add_argument("--format", choices=[CAIRO_OUTPUT, JSON_OUTPUT], default=CAIRO_OUTPUT, help="Output format (default: cairo).")
+    parser.add_argument("-o", "--output", type=Path, help="File to write (default: stdout).")
+    parser.add_argument("--verify", action="store_true", help="Verify every signature before writing (slow).")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help=f"Worker processes (default: {DEFAULT_JOBS}).")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.count < 1 or args.calls < 1 or args.nonce < 0:
+        parser.error("--count and --calls must be positive, and --nonce non-negative")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    enable_profiling(args.profile)
+    config = BatchConfig(
+        schemes=SCHEMES if args.scheme == "all" else (args.scheme,),
+        stark_key=args.stark_key,
+        secp256k1_key=args.secp256k1_key,
+        account=args.account,
+        token=args.token,
+        recipient=args.recipient,
+        calls=args.calls,
+        chain_id=args.chain_id,
+        first_nonce=args.nonce,
+    )
+    try:
+        entries = generate(config, args.count, max(1, args.jobs))
+        if args.verify:
+            verify_entries(config, entries)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.format == JSON_OUTPUT:
+        output = format_json(config, entries)
+    else:
+        command = " ".join(["python3 scripts/sign_transactions.py", *command_options(sys.argv[1:])])
+        output = format_cairo(config, entries, command)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    else:
+        sys.stdout.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Deterministic ECDSA signing over the Stark curve and secp256k1, batched for fixture generation.
+
+Nonces follow RFC 6979 with SHA-256, as in starknet-py (Stark curve, without extra entropy)
+and most Ethereum tooling (secp256k1), so the same inputs always give the same signatures.
+Batches amortize the expensive parts: `k * G` uses precomputed generator tables, and the
+field inversions of a whole batch collapse into one each with Montgomery's trick.
+"""
+
+import hashlib
+import hmac
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from stark_curve import (
+    ALPHA,
+    EC_GEN,
+    EC_ORDER,
+    INFINITY,
+    JacobianPoint,
+    Point,
+    STARK_FIELD_PRIME,
+    add_scalar_multiple,
+    ec_add,
+    ec_mul,
+    window_table,
+)
+
+Signature = Tuple[int, int]
+
+# The Stark curve signs and verifies messages, r and w = 1/s below 2^251
+STARK_ECDSA_BITS = 251
+
+
+class Curve(NamedTuple):
+    name: str
+    prime: int
+    alpha: int
+    order: int
+    generator: Point
+
+
+STARK_CURVE = Curve("stark", STARK_FIELD_PRIME, ALPHA, EC_ORDER, EC_GEN)
+SECP256K1 = Curve(
+    "secp256k1",
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    0,
+    0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    (
+        0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+        0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+    ),
+)
+
+_GENERATOR_TABLES: Dict[str, List[List[Optional[Point]]]] = {}
+
+
+def multiply_generator(curve: Curve, scalar: int) -> JacobianPoint:
+    """`scalar * G` in Jacobian coordinates, from generator tables built on first use."""
+    table = _GENERATOR_TABLES.get(curve.name)
+    if table is None:
+        table = window_table(curve.generator, curve.order.bit_length(), curve.prime, curve.alpha)
+        _GENERATOR_TABLES[curve.name] = table
+    return add_scalar_multiple(INFINITY, table, scalar % curve.order, curve.prime, curve.alpha)
+
+
+def batch_inverse(values: Sequence[int], modulus: int) -> List[int]:
+    """Inverses of non-zero `values` modulo `modulus` with a single modular inversion."""
+    prefix = [1] * (len(values) + 1)
+    for index, value in enumerate(values):
+        prefix[index + 1] = prefix[index] * value % modulus
+    inverse = pow(prefix[-1], -1, modulus)
+    inverses = [0] * len(values)
+    for index in range(len(values) - 1, -1, -1):
+        inverses[index] = prefix[index] * inverse % modulus
+        inverse = inverse * values[index] % modulus
+    return inverses
+
+
+def _bits_to_int(data: bytes, bits: int) -> int:
+    value = int.from_bytes(data, "big")
+    excess = 8 * len(data) - bits
+    return value >> excess if excess > 0 else value
+
+
+def generate_k_rfc6979(order: int, private_key: int, message: bytes, extra_entropy: bytes = b"") -> int:
+    """RFC 6979 deterministic nonce with HMAC-SHA-256, matching the `ecdsa` package's `generate_k`."""
+    bits = order.bit_length()
+    size = (bits + 7) // 8
+    message_int = _bits_to_int(message, bits)
+    if message_int >= order:
+        message_int -= order
+    seed = private_key.to_bytes(size, "big") + message_int.to_bytes(size, "big") + extra_entropy
+    v = b"\x01" * 32
+    k = b"\x00" * 32
+    k = hmac.new(k, v + b"\x00" + seed, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b"\x01" + seed, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        candidate = b""
+        while len(candidate) < size:
+            v = hmac.new(k, v, hashlib.sha256).digest()
+            candidate += v
+        nonce = _bits_to_int(candidate, bits)
+        if 1 <= nonce < order:
+            return nonce
+        k = hmac.new(k, v + b"\x00", hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def stark_nonce(msg_hash: int, private_key: int, seed: Optional[int] = None) -> int:
+    """The nonce starknet-py and cairo-lang derive for a Stark curve signature."""
+    # Pad hashes one nibble short of 252 bits, for consistency with elliptic.js
+    if 1 <= msg_hash.bit_length() % 8 <= 4 and msg_hash.bit_length() >= 248:
+        msg_hash *= 16
+    extra_entropy = b"" if seed is None else seed.to_bytes((seed.bit_length() + 7) // 8, "big")
+    message = msg_hash.to_bytes((msg_hash.bit_length() + 7) // 8, "big")
+    return generate_k_rfc6979(EC_ORDER, private_key, message, extra_entropy)
+
+
+def _x_coordinates(curve: Curve, points: Sequence[JacobianPoint]) -> List[int]:
+    p = curve.prime
+    z_inverses = batch_inverse([z for _, _, z in points], p)
+    return [x * z_inv * z_inv % p for (x, _, _), z_inv in zip(points, z_inverses)]
+
+
+def get_public_point(curve: Curve, private_key: int) -> Point:
+    x, y, z = multiply_generator(curve, private_key)
+    p = curve.prime
+    z_inv = pow(z, -1, p)
+    return x * z_inv * z_inv % p, y * z_inv * z_inv * z_inv % p
+
+
+def get_stark_public_key(private_key: int) -> int:
+    """The Stark key of `private_key`: the x coordinate of its public point."""
+    return get_public_point(STARK_CURVE, private_key)[0]
+
+
+def _sign_with_nonces(curve: Curve, private_key: int, msg_hashes: Sequence[int], nonces: Sequence[int]) -> List[Signature]:
+    n = curve.order
+    rs = [x % n for x in _x_coordinates(curve, [multiply_generator(curve, k) for k in nonces])]
+    nonce_inverses = batch_inverse(nonces, n)
+    return [(r, k_inv * (z + r * private_key) % n) for z, r, k_inv in zip(msg_hashes, rs, nonce_inverses)]
+
+
+def _valid_stark_signature(r: int, w: int) -> bool:
+    return 1 <= r < 2 ** STARK_ECDSA_BITS and 1 <= w < 2 ** STARK_ECDSA_BITS
+
+
+def stark_sign_batch(private_key: int, msg_hashes: Sequence[int]) -> List[Signature]:
+    """Stark curve signatures `(r, s)` of `msg_hashes`, as `check_ecdsa_signature` verifies them."""
+    if not 1 <= private_key < EC_ORDER:
+        raise ValueError("Stark private key out of range")
+    for msg_hash in msg_hashes:
+        if not 0 <= msg_hash < 2 ** STARK_ECDSA_BITS:
+            raise ValueError(f"message hash does not fit in {STARK_ECDSA_BITS} bits: {msg_hash:#x}")
+    nonces = [stark_nonce(msg_hash, private_key) for msg_hash in msg_hashes]
+    signatures = _sign_with_nonces(STARK_CURVE, private_key, msg_hashes, nonces)
+    # s is zero only with negligible probability; w = 1/s is checked for that case below
+    ws = batch_inverse([s or 1 for _, s in signatures], EC_ORDER)
+    for index, ((r, s), w) in enumerate(zip(signatures, ws)):
+        # Like cairo-lang, retry the rare out-of-range signatures with the next seed
+        seed = 0
+        while s == 0 or not _valid_stark_signature(r, w):
+            seed += 1
+            nonce = stark_nonce(msg_hashes[index], private_key, seed)
+            r, s = _sign_with_nonces(STARK_CURVE, private_key, [msg_hashes[index]], [nonce])[0]
+            w = pow(s, -1, EC_ORDER) if s else 0
+        signatures[index] = (r, s)
+    return signatures
+
+
+def secp256k1_sign_batch(private_key: int, msg_hashes: Sequence[int]) -> List[Signature]:
+    """secp256k1 signatures `(r, s)` of 256-bit `msg_hashes`, normalized to the lower `s`."""
+    n = SECP256K1.order
+    if not 1 <= private_key < n:
+        raise ValueError("secp256k1 private key out of range")
+    nonces = [generate_k_rfc6979(n, private_key, msg_hash.to_bytes(32, "big")) for msg_hash in msg_hashes]
+    signatures = _sign_with_nonces(SECP256K1, private_key, msg_hashes, nonces)
+    return [(r, n - s if s > n // 2 else s) for r, s in signatures]
+
+
+def _verify(curve: Curve, msg_hash: int, r: int, s: int, public_key: Point) -> bool:
+    n = curve.order
+    if not (1 <= r < n and 1 <= s < n):
+        return False
+    w = pow(s, -1, n)
+    u1 = ec_mul(msg_hash * w % n, curve.generator, curve.prime, curve.alpha)
+    u2 = ec_mul(r * w % n, public_key, curve.prime, curve.alpha)
+    point = ec_add(u1, u2, curve.prime, curve.alpha)
+    return point is not None and point[0] % n == r
+
+
+def stark_verify(msg_hash: int, r: int, s: int, public_point: Point) -> bool:
+    return _verify(STARK_CURVE, msg_hash, r, s, public_point)
+
+
+def secp256k1_verify(msg_hash: int, r: int, s: int, public_key: Point) -> bool:
+    return _verify(SECP256K1, msg_hash, r, s, public_key)
@@ -0,0 +1,203 @@
+"""Native Stark curve arithmetic and the Starknet Pedersen hash, without external tools.
+
+The curve is y^2 = x^3 + ALPHA * x + BETA over the Stark field. Pedersen hashing multiplies
+fixed constant points, so it uses precomputed tables of their multiples (built on first use)
+and Jacobian coordinates, leaving a single field inversion per hash. The point arithmetic
+takes the field prime and curve `alpha` as parameters, so `signing.py` reuses it for secp256k1.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from class_hash import STARK_FIELD_PRIME
+
+Point = Tuple[int, int]
+JacobianPoint = Tuple[int, int, int]
+
+ALPHA = 1
+BETA = 0x6F21413EFBE40DE150E596D72F7A8C5609AD26C15C915C1F4CDFCB99CEE9E89
+EC_ORDER = 0x800000000000010FFFFFFFFFFFFFFFFB781126DCAE7B2321E66A241ADC64D2F
+EC_GEN: Point = (
+    0x1EF15C18599971B7BECED415A40F0C7DEACFD9B0D1819E03D723D8BC943CFCA,
+    0x5668060AA49730B7BE4801DF46EC62DE53ECD11ABE43A32873000C36E8DC1F,
+)
+
+# Pedersen constant points: the shift point, then P1..P4 for the low 248 and high 4 bits of
+# each of the two inputs
+PEDERSEN_SHIFT_POINT: Point = (
+    0x49EE3EBA8C1600700EE1B87EB599F16716B0B1022947733551FDE4050CA6804,
+    0x3CA0CFE4B3BC6DDF346D49D06EA0ED34E621062C0E056C1D0405D266E10268A,
+)
+PEDERSEN_POINTS: Tuple[Point, Point, Point, Point] = (
+    (
+        0x234287DCBAFFE7F969C748655FCA9E58FA8120B6D56EB0C1080D17957EBE47B,
+        0x3B056F100F96FB21E889527D41F4E39940135DD7A6C94CC6ED0268EE89E5615,
+    ),
+    (
+        0x4FA56F376C83DB33F9DAB2656558F3399099EC1DE5E3018B7A6932DBA8AA378,
+        0x3FA0984C931C9E38113E0C0E47E4401562761F92A7A23B45168F4E80FF5B54D,
+    ),
+    (
+        0x4BA4CC166BE8DEC764910F75B45F74B40C690C74709E90F3AA372F0BD2D6997,
+        0x40301CF5C1751F4B971E46C4EDE85FCAC5C59A5CE5AE7C48151F27B24B219C,
+    ),
+    (
+        0x54302DCB0E6CC1C6E44CCA8F61A63BB2CA65048D53FB325D36FF12C49A58202,
+        0x1B77B3E37D13504B348046268D8AE25CE98AD783C25561A879DCC77E99C2426,
+    ),
+)
+LOW_PART_BITS = 248
+LOW_PART_MASK = 2 ** LOW_PART_BITS - 1
+WINDOW_BITS = 8
+WINDOW_MASK = 2 ** WINDOW_BITS - 1
+
+INFINITY: JacobianPoint = (1, 1, 0)
+
+
+def ec_add(p1: Optional[Point], p2: Optional[Point], prime: int = STARK_FIELD_PRIME, alpha: int = ALPHA) -> Optional[Point]:
+    """Affine point addition; None is the point at infinity."""
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    p = prime
+    x1, y1 = p1
+    x2, y2 = p2
+    if x1 == x2:
+        if (y1 + y2) % p == 0:
+            return None
+        slope = (3 * x1 * x1 + alpha) * pow(2 * y1, -1, p) % p
+    else:
+        slope = (y2 - y1) * pow(x2 - x1, -1, p) % p
+    x3 = (slope * slope - x1 - x2) % p
+    return x3, (slope * (x1 - x3) - y1) % p
+
+
+def jacobian_double(point: JacobianPoint, prime: int = STARK_FIELD_PRIME, alpha: int = ALPHA) -> JacobianPoint:
+    p = prime
+    x, y, z = point
+    if z == 0 or y == 0:
+        return INFINITY
+    yy = y * y % p
+    s = 4 * x * yy % p
+    zz = z * z % p
+    m = (3 * x * x + alpha * zz * zz) % p
+    x3 = (m * m - 2 * s) % p
+    return x3, (m * (s - x3) - 8 * yy * yy) % p, 2 * y * z % p
+
+
+def jacobian_add_affine(
+    point: JacobianPoint, other: Point, prime: int = STARK_FIELD_PRIME, alpha: int = ALPHA
+) -> JacobianPoint:
+    """Mixed addition of a Jacobian point and an affine point."""
+    p = prime
+    x1, y1, z1 = point
+    x2, y2 = other
+    if z1 == 0:
+        return x2, y2, 1
+    z1z1 = z1 * z1 % p
+    u2 = x2 * z1z1 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - x1) % p
+    r = (s2 - y1) % p
+    if h == 0:
+        return jacobian_double(point, prime, alpha) if r == 0 else INFINITY
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    return x3, (r * (v - x3) - y1 * hhh) % p, z1 * h % p
+
+
+def to_affine(point: JacobianPoint, prime: int = STARK_FIELD_PRIME) -> Optional[Point]:
+    p = prime
+    x, y, z = point
+    if z == 0:
+        return None
+    z_inv = pow(z, -1, p)
+    z_inv2 = z_inv * z_inv % p
+    return x * z_inv2 % p, y * z_inv2 * z_inv % p
+
+
+def ec_mul(scalar: int, point: Point, prime: int = STARK_FIELD_PRIME, alpha: int = ALPHA) -> Optional[Point]:
+    """Double-and-add scalar multiplication of an affine point."""
+    result = INFINITY
+    for bit in bin(scalar)[2:] if scalar > 0 else "":
+        result = jacobian_double(result, prime, alpha)
+        if bit == "1":
+            result = jacobian_add_affine(result, point, prime, alpha)
+    return to_affine(result, prime)
+
+
+def window_table(
+    base: Point, bits: int, prime: int = STARK_FIELD_PRIME, alpha: int = ALPHA
+) -> List[List[Optional[Point]]]:
+    """Affine multiples `digit * 2^(WINDOW_BITS * window) * base` for every window of a `bits`-bit scalar."""
+    table = []
+    window_base: Optional[Point] = base
+    for _ in range((bits + WINDOW_BITS - 1) // WINDOW_BITS):
+        row: List[Optional[Point]] = [None]
+        for _ in range(WINDOW_MASK):
+            row.append(ec_add(row[-1], window_base, prime, alpha))
+        table.append(row)
+        # The next window's base is 2^WINDOW_BITS times this one's
+        window_base = ec_add(row[-1], window_base, prime, alpha)
+    return table
+
+
+def add_scalar_multiple(
+    acc: JacobianPoint,
+    table: List[List[Optional[Point]]],
+    scalar: int,
+    prime: int = STARK_FIELD_PRIME,
+    alpha: int = ALPHA,
+) -> JacobianPoint:
+    """Adds `scalar * base` to `acc`, using the `window_table` of `base`."""
+    window = 0
+    while scalar:
+        multiple = table[window][scalar & WINDOW_MASK]
+        if multiple is not None:
+            acc = jacobian_add_affine(acc, multiple, prime, alpha)
+        scalar >>= WINDOW_BITS
+        window += 1
+    return acc
+
+
+_PEDERSEN_TABLES: Optional[List[List[List[Optional[Point]]]]] = None
+
+
+def _pedersen_tables() -> List[List[List[Optional[Point]]]]:
+    global _PEDERSEN_TABLES
+    if _PEDERSEN_TABLES is None:
+        low_bits, high_bits = LOW_PART_BITS, 252 - LOW_PART_BITS
+        _PEDERSEN_TABLES = [
+            window_table(point, low_bits if index % 2 == 0 else high_bits)
+            for index, point in enumerate(PEDERSEN_POINTS)
+        ]
+    return _PEDERSEN_TABLES
+
+
+def pedersen_hash(a: int, b: int) -> int:
+    """The Starknet Pedersen hash of two field elements, as computed by `core::pedersen::pedersen`."""
+    tables = _pedersen_tables()
+    acc: JacobianPoint = (PEDERSEN_SHIFT_POINT[0], PEDERSEN_SHIFT_POINT[1], 1)
+    for index, value in enumerate((a, b)):
+        if not 0 <= value < STARK_FIELD_PRIME:
+            raise ValueError(f"Pedersen input is outside the Stark field: {value:#x}")
+        acc = add_scalar_multiple(acc, tables[2 * index], value & LOW_PART_MASK)
+        acc = add_scalar_multiple(acc, tables[2 * index + 1], value >> LOW_PART_BITS)
+    result = to_affine(acc)
+    if result is None:
+        raise ValueError("Pedersen hash reached the point at infinity")
+    return result[0]
+
+
+def compute_hash_on_elements(values: Sequence[int]) -> int:
+    """Pedersen hash chain of `values` followed by their count, like `PedersenTrait::new(0)` updates."""
+    state = 0
+    for value in values:
+        state = pedersen_hash(state, value)
+    return pedersen_hash(state, len(values))
+
+
+def pedersen_hash_pairs(pairs: Iterable[Tuple[int, int]]) -> List[int]:
+    return [pedersen_hash(a, b) for a, b in pairs]
@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# The scripts are run as files rather than installed, so import them the same way
+for path in (SCRIPTS_DIR, os.path.join(SCRIPTS_DIR, "benchmarking")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmarks", action="store_true", help="Also run the wall-clock timing benchmarks.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing comparison, only run with --benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timings depend on the machine's load, so they never decide a default run
+    if config.getoption("--benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark, run with --benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def write_target_dir(target_dir, package="openzeppelin_test_pkg", contracts=None):
+    """
+    Writes a small Scarb target directory: an artifact manifest plus a Sierra and a
+    CASM artifact per contract. `contracts` maps names to bytecode lengths.
+    """
+    contracts = contracts or {"ERC20Mock": 40, "AccountMock": 75, "VestingMock": 3}
+    entries = []
+    for index, (name, felts) in enumerate(sorted(contracts.items())):
+        sierra = f"{package}_{name}.contract_class.json"
+        casm = f"{package}_{name}.compiled_contract_class.json"
+        (target_dir / sierra).write_text(
+            json.dumps({"sierra_program": [hex(felt) for felt in range(felts * 2)], "abi": [], "entry_points_by_type": {}})
+        )
+        (target_dir / casm).write_text(
+            json.dumps({"bytecode": [hex(felt) for felt in range(felts)], "hints": [[0, [{"Code": "] ["}]]]}, indent=index)
+        )
+        entries.append({"package_name": package, "contract_name": name, "artifacts": {"sierra": sierra, "casm": casm}})
+    (target_dir / f"{package}.starknet_artifacts.json").write_text(json.dumps({"version": 1, "contracts": entries}))
+    return target_dir
+
+
+@pytest.fixture
+def target_dir(tmp_path):
+    return write_target_dir(tmp_path)
@@ -0,0 +1,155 @@
+import json
+import os
+
+import pytest
+
+import artifact_manifest
+from artifact_manifest import INDEX_FILENAME, ArtifactManifest
+
+
+def contract(package, name, **extra):
+    return {
+        "id": f"{package}_{name}",
+        "package_name": package,
+        "contract_name": name,
+        "module_path": f"{package}::{name}",
+        "artifacts": {"sierra": f"{package}_{name}.contract_class.json", "casm": f"{package}_{name}.compiled_contract_class.json"},
+        **extra,
+    }
+
+
+def write_manifest(target_dir, package, contracts, indent=None):
+    path = target_dir / f"{package}.starknet_artifacts.json"
+    path.write_text(json.dumps({"version": 1, "contracts": contracts}, indent=indent))
+    return path
+
+
+@pytest.fixture
+def workspace_dir(tmp_path):
+    # Two packages each declaring an `ERC20Mock`, with strings that look like JSON structure
+    write_manifest(tmp_path, "pkg_a", [
+        contract("pkg_a", "ERC20Mock", module_path='pkg_a::{"contracts": [}]'),
+        contract("pkg_a", "AccountMock"),
+    ], indent=2)
+    write_manifest(tmp_path, "pkg_b", [contract("pkg_b", "ERC20Mock"), contract("pkg_b", "VestingMock")])
+    return tmp_path
+
+
+def count_scans(monkeypatch):
+    scanned = []
+    index_manifest = artifact_manifest.index_manifest
+
+    def counting_index_manifest(path):
+        scanned.append(path.name)
+        return index_manifest(path)
+
+    monkeypatch.setattr(artifact_manifest, "index_manifest", counting_index_manifest)
+    return scanned
+
+
+def test_index_is_cached_and_reused(workspace_dir, monkeypatch):
+    scanned = count_scans(monkeypatch)
+    entries = ArtifactManifest(workspace_dir).entries
+    assert sorted(scanned) == ["pkg_a.starknet_artifacts.json", "pkg_b.starknet_artifacts.json"]
+    assert (workspace_dir / INDEX_FILENAME).is_file()
+
+    scanned.clear()
+    assert ArtifactManifest(workspace_dir).entries == entries
+    assert scanned == []
+
+
+@pytest.mark.parametrize("change", ["mtime", "size"])
+def test_changed_manifest_is_rescanned(workspace_dir, monkeypatch, change):
+    ArtifactManifest(workspace_dir).entries
+    scanned = count_scans(monkeypatch)
+    path = workspace_dir / "pkg_b.starknet_artifacts.json"
+    stat = path.stat()
+    if change == "mtime":
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    else:
+        write_manifest(workspace_dir, "pkg_b", [contract("pkg_b", "ERC20Mock"), contract("pkg_b", "VestingMock"), contract("pkg_b", "Extra")])
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    manifest = ArtifactManifest(workspace_dir)
+    names = [entry.qualified_name for entry in manifest.entries]
+    assert scanned == ["pkg_b.starknet_artifacts.json"]
+    assert ("pkg_b::Extra" in names) == (change == "size")
+
+    # The rebuilt index is cached again
+    scanned.clear()
+    ArtifactManifest(workspace_dir).entries
+    assert scanned == []
+
+
+def test_no_cache_rescans_and_leaves_the_index_alone(workspace_dir, monkeypatch):
+    ArtifactManifest(workspace_dir).entries
+    index = (workspace_dir / INDEX_FILENAME).read_bytes()
+    scanned = count_scans(monkeypatch)
+    ArtifactManifest(workspace_dir, use_cache=False).entries
+    assert len(scanned) == 2
+    assert (workspace_dir / INDEX_FILENAME).read_bytes() == index
+
+
+@pytest.mark.parametrize("index", ["not json", '{"version": 0, "manifests": {}}', '{"version": 1, "manifests": {"pkg_a.starknet_artifacts.json": {"contracts": 3}}}'])
+def test_corrupt_or_outdated_index_is_rebuilt(workspace_dir, index):
+    expected = ArtifactManifest(workspace_dir, use_cache=False).entries
+    (workspace_dir / INDEX_FILENAME).write_text(index)
+    assert ArtifactManifest(workspace_dir).entries == expected
+    assert json.loads((workspace_dir / INDEX_FILENAME).read_text())["version"] == artifact_manifest.INDEX_VERSION
+
+
+def test_removed_manifest_drops_its_contracts(workspace_dir):
+    ArtifactManifest(workspace_dir).entries
+    (workspace_dir / "pkg_b.starknet_artifacts.json").unlink()
+    manifest = ArtifactManifest(workspace_dir)
+    assert manifest.packages() == ["pkg_a"]
+    assert manifest.find("ERC20Mock").qualified_name == "pkg_a::ERC20Mock"
+
+
+def test_find_resolves_qualified_names(workspace_dir):
+    manifest = ArtifactManifest(workspace_dir)
+    assert manifest.find("AccountMock").package == "pkg_a"
+    assert manifest.find("pkg_b::ERC20Mock").casm == "pkg_b_ERC20Mock.compiled_contract_class.json"
+    assert manifest.find("ERC20Mock", package="pkg_a").package == "pkg_a"
+    assert manifest.artifact("pkg_b::VestingMock", "casm") == workspace_dir / "pkg_b_VestingMock.compiled_contract_class.json"
+    with pytest.raises(ValueError, match="no contract named VestingMock in package pkg_a"):
+        manifest.find("pkg_a::VestingMock")
+    with pytest.raises(ValueError, match="no contract named Missing in the artifact manifests"):
+        manifest.find("Missing")
+
+
+def test_ambiguous_name_lists_the_qualified_candidates(workspace_dir):
+    manifest = ArtifactManifest(workspace_dir)
+    with pytest.raises(ValueError, match="contract name ERC20Mock is ambiguous, qualify it as one of: pkg_a::ERC20Mock, pkg_b::ERC20Mock"):
+        manifest.find("ERC20Mock")
+    assert manifest.display_name("pkg_a_ERC20Mock.contract_class.json") == "pkg_a::ERC20Mock"
+    assert manifest.display_name("pkg_b_VestingMock.contract_class.json") == "VestingMock"
+    assert manifest.display_name("unknown.contract_class.json") is None
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_entry_reads_only_its_span(workspace_dir, use_cache):
+    ArtifactManifest(workspace_dir).entries
+    manifest = ArtifactManifest(workspace_dir, use_cache=use_cache)
+    for entry in manifest.entries:
+        text = (workspace_dir / entry.manifest).read_bytes()[entry.start:entry.end]
+        assert json.loads(text) == manifest.load_entry(entry)
+    entry = manifest.find("pkg_a::ERC20Mock")
+    assert manifest.load_entry(entry)["module_path"] == 'pkg_a::{"contracts": [}]'
+
+
+def test_load_entry_detects_a_manifest_changed_since_indexing(workspace_dir):
+    manifest = ArtifactManifest(workspace_dir)
+    entry = manifest.find("pkg_a::AccountMock")
+    # Rebuilt with the contracts in another order, so the recorded span is mid-entry
+    write_manifest(workspace_dir, "pkg_a", [contract("pkg_a", "AccountMock"), contract("pkg_a", "ERC20Mock")], indent=2)
+    with pytest.raises(ValueError, match="artifact manifest changed since it was indexed: pkg_a.starknet_artifacts.json"):
+        manifest.load_entry(entry)
+
+
+def test_read_only_target_dir_still_indexes(target_dir, monkeypatch):
+    def failing_replace(*args):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(artifact_manifest.os, "replace", failing_replace)
+    assert [entry.name for entry in ArtifactManifest(target_dir).entries] == ["AccountMock", "ERC20Mock", "VestingMock"]
+    assert not any(name.startswith(INDEX_FILENAME) for name in os.listdir(target_dir))
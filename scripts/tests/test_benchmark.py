@@ -0,0 +1,174 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import benchmark
+from benchmark import BYTECODE_KEY, CACHE_FILENAME, TARGET_DIR, benchmark_contracts, get_bytecode_size
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+BENCHMARK_JSON = os.path.join(REPO_ROOT, "benches", "contract_sizes.json")
+BENCHMARK_SCRIPT = os.path.join(REPO_ROOT, "scripts", "benchmarking", "benchmark.py")
+
+HINTS = [
+    [0, [{"Code": "memory[ap] = segments.add() # ] , [ {"}]],
+    [3, [{"Code": "a \"quoted\" ] string with \\ backslashes \\\" and , commas"}]],
+    [7, [{"Nested": {"bytecode": ["0x1", "0x2"], "text": "[[[,,,]]]"}}]],
+]
+ARTIFACTS = {
+    "empty": {"bytecode": []},
+    "single": {"bytecode": ["0x1"]},
+    "missing": {"hints": HINTS},
+    "strings_before": {
+        "prime": "0x800000000000011000000000000000000000000000000000000000000000001",
+        "compiler_version": "2.11.0 \"bytecode\": [1, 2, 3]",
+        "hints": HINTS,
+        "bytecode": ["0x40780017fff7fff", "0x1", "0x482680017ffd8000", "0x800000000000011000000000000000000000000000000000000000000000000"],
+    },
+    "nested_key_first": {
+        "debug": {"bytecode": ["0x1", "0x2", "0x3", "0x4", "0x5"]},
+        "bytecode": [hex(felt) for felt in range(1000)],
+        "hints": HINTS,
+    },
+    "escaped_key": {"byte\"code": ["0x1", "0x2"], "bytecode": ["0x1", "0x2", "0x3"]},
+}
+FORMATS = {
+    "compact": {"separators": (",", ":")},
+    "indented": {"indent": 2},
+    "sorted": {"indent": 4, "sort_keys": True},
+}
+
+
+def json_load_size(path):
+    with open(path, "r") as f:
+        return len(json.load(f).get(BYTECODE_KEY, []))
+
+
+@pytest.mark.parametrize("format_name", sorted(FORMATS))
+@pytest.mark.parametrize("artifact_name", sorted(ARTIFACTS))
+def test_streaming_count_matches_json_load(tmp_path, artifact_name, format_name):
+    path = tmp_path / f"{artifact_name}.compiled_contract_class.json"
+    path.write_text(json.dumps(ARTIFACTS[artifact_name], **FORMATS[format_name]))
+    assert get_bytecode_size(str(path)) == json_load_size(path)
+
+
+def test_non_array_bytecode_is_an_error(tmp_path):
+    path = tmp_path / "invalid.compiled_contract_class.json"
+    path.write_text(json.dumps({"bytecode": "0x1"}))
+    with pytest.raises(ValueError):
+        get_bytecode_size(str(path))
+
+
+def built_benchmark_artifacts():
+    try:
+        with open(BENCHMARK_JSON, "r") as f:
+            files = sorted(json.load(f).get(BYTECODE_KEY, {}))
+    except (OSError, ValueError):
+        return []
+    target_dir = os.path.join(REPO_ROOT, TARGET_DIR)
+    return [os.path.join(target_dir, file) for file in files if os.path.exists(os.path.join(target_dir, file))]
+
+
+@pytest.mark.skipif(not built_benchmark_artifacts(), reason="no release artifacts listed in benches/contract_sizes.json are built")
+@pytest.mark.parametrize("path", built_benchmark_artifacts(), ids=os.path.basename)
+def test_streaming_count_matches_json_load_on_release_artifacts(path):
+    assert get_bytecode_size(path) == json_load_size(path)
+
+
+def run_benchmark(*args):
+    return subprocess.run([sys.executable, BENCHMARK_SCRIPT, *args], capture_output=True, check=True).stdout
+
+
+@pytest.mark.parametrize("output", [["--json"], []], ids=["json", "text"])
+def test_parallel_output_is_byte_identical_to_serial(target_dir, output):
+    serial = run_benchmark("--dir", str(target_dir), "--no-cache", "--jobs", "1", *output)
+    assert run_benchmark("--dir", str(target_dir), "--no-cache", "--jobs", "4", *output) == serial
+
+
+def test_parallel_results_keep_serial_order(target_dir):
+    serial = benchmark_contracts(str(target_dir))
+    parallel = benchmark_contracts(str(target_dir), jobs=4)
+    assert json.dumps(parallel) == json.dumps(serial)
+
+
+ACCOUNT_CASM = "openzeppelin_test_pkg_AccountMock.compiled_contract_class.json"
+
+
+def cached_run(target_dir):
+    stats = {}
+    results = benchmark_contracts(str(target_dir), use_cache=True, cache_stats=stats)
+    return results, stats
+
+
+def read_cache(target_dir):
+    with open(target_dir / CACHE_FILENAME) as f:
+        return json.load(f)
+
+
+def write_cache(target_dir, cache):
+    with open(target_dir / CACHE_FILENAME, "w") as f:
+        json.dump(cache, f)
+
+
+def test_cache_hit_on_unchanged_mtime_and_size(target_dir, monkeypatch):
+    first, stats = cached_run(target_dir)
+    assert stats == {"hits": 0, "misses": 6}
+    # A hit is trusted without re-reading the artifact: neither measured nor hashed
+    monkeypatch.setattr(benchmark, "measure_artifact", None)
+    monkeypatch.setattr(benchmark, "get_file_digest", None)
+    second, stats = cached_run(target_dir)
+    assert stats == {"hits": 6, "misses": 0}
+    assert second == first
+
+
+def test_cache_hit_on_matching_digest_after_touch(target_dir, monkeypatch):
+    first, _ = cached_run(target_dir)
+    path = target_dir / ACCOUNT_CASM
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 9))
+    monkeypatch.setattr(benchmark, "measure_artifact", None)
+    second, stats = cached_run(target_dir)
+    assert stats == {"hits": 6, "misses": 0}
+    assert second == first
+    # The refreshed mtime is stored, so the next run skips the digest
+    assert read_cache(target_dir)["entries"][ACCOUNT_CASM]["mtime_ns"] == path.stat().st_mtime_ns
+
+
+@pytest.mark.parametrize("same_size", [True, False], ids=["same_size", "resized"])
+def test_cache_miss_after_content_change(target_dir, same_size):
+    cached_run(target_dir)
+    path = target_dir / ACCOUNT_CASM
+    text = path.read_text()
+    if same_size:
+        # Same byte count, so only the digest tells the rebuilt artifact apart
+        path.write_text(text.replace('"0x1"', '"0x9"', 1))
+        felts = 75
+    else:
+        path.write_text(text.replace('"0x1"', '"0x1", "0x1"', 1))
+        felts = 76
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 9))
+    results, stats = cached_run(target_dir)
+    assert stats == {"hits": 5, "misses": 1}
+    assert results[BYTECODE_KEY][ACCOUNT_CASM] == {"felts": felts}
+    assert read_cache(target_dir)["entries"][ACCOUNT_CASM]["size"] == path.stat().st_size
+
+
+def test_no_cache_ignores_and_keeps_the_cache(target_dir):
+    cached_run(target_dir)
+    cache = read_cache(target_dir)
+    cache["entries"][ACCOUNT_CASM]["felts"] = 1
+    write_cache(target_dir, cache)
+    assert cached_run(target_dir)[0][BYTECODE_KEY][ACCOUNT_CASM] == {"felts": 1}
+
+    assert benchmark_contracts(str(target_dir))[BYTECODE_KEY][ACCOUNT_CASM] == {"felts": 75}
+    output = json.loads(run_benchmark("--dir", str(target_dir), "--json", "--no-cache"))
+    assert output[BYTECODE_KEY][ACCOUNT_CASM] == {"felts": 75}
+    assert read_cache(target_dir) == cache
+
+
+def test_no_cache_writes_no_cache_file(target_dir):
+    run_benchmark("--dir", str(target_dir), "--json", "--no-cache")
+    assert not (target_dir / CACHE_FILENAME).exists()
+    run_benchmark("--dir", str(target_dir), "--json")
+    assert len(read_cache(target_dir)["entries"]) == 6
@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmark_diff import (
+    MAX_BYTECODE_SIZE,
+    THRESHOLDS_FILE,
+    evaluate_gate,
+    get_current_benchmark,
+    is_bundled_benchmark,
+    load_thresholds,
+    override_default_pct,
+    resolve_thresholds,
+    run_benchmark_script,
+)
+
+BENCHMARK_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarking", "benchmark.py")
+BENCHMARK_DIFF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarking", "benchmark_diff.py")
+
+THRESHOLDS = {
+    "default": {"felts": {"max_increase_pct": 5}, "bytes": {"max_increase_pct": 5}},
+    "contracts": {
+        "ERC20Mock": {"felts": {"max_increase": 100}},
+        "*Votes*": {"felts": {"max_increase_pct": 1}},
+        "ERC20VotesMock": {"bytes": {"max_increase": 10}},
+    },
+}
+
+
+def sizes(**contracts):
+    """A size report for {name: (felts, bytes)}."""
+    return {
+        "bytecode": {f"pkg_{name}.compiled_contract_class.json": {"felts": felts} for name, (felts, _) in contracts.items()},
+        "contract_class": {f"pkg_{name}.contract_class.json": {"bytes": num_bytes} for name, (_, num_bytes) in contracts.items()},
+    }
+
+
+def test_is_bundled_benchmark(tmp_path):
+    copy = tmp_path / "benchmark.py"
+    shutil.copy(BENCHMARK_SCRIPT, copy)
+    assert is_bundled_benchmark(BENCHMARK_SCRIPT)
+    assert not is_bundled_benchmark(str(copy))
+    assert not is_bundled_benchmark(str(tmp_path / "missing.py"))
+
+
+def test_in_process_benchmark_matches_script_output(target_dir):
+    in_process = get_current_benchmark(BENCHMARK_SCRIPT, str(target_dir), use_cache=False)
+    assert in_process == run_benchmark_script(BENCHMARK_SCRIPT, str(target_dir))
+    assert in_process["bytecode"]["openzeppelin_test_pkg_AccountMock.compiled_contract_class.json"] == {"felts": 75}
+
+
+@pytest.mark.benchmark
+def test_in_process_benchmark_is_faster_than_subprocess(target_dir):
+    # The subprocess pays interpreter startup and imports on every run
+    start = time.perf_counter()
+    get_current_benchmark(BENCHMARK_SCRIPT, str(target_dir), use_cache=False)
+    in_process = time.perf_counter() - start
+    start = time.perf_counter()
+    run_benchmark_script(BENCHMARK_SCRIPT, str(target_dir))
+    subprocess_time = time.perf_counter() - start
+    assert in_process < subprocess_time
+
+
+def test_resolve_thresholds_overrides():
+    casm = "pkg_{}.compiled_contract_class.json"
+    sierra = "pkg_{}.contract_class.json"
+    # An exact rule only overrides the default limits it sets
+    assert resolve_thresholds(THRESHOLDS, casm.format("ERC20Mock"), "felts") == {"max_increase_pct": 5, "max_increase": 100}
+    assert resolve_thresholds(THRESHOLDS, sierra.format("ERC20Mock"), "bytes") == {"max_increase_pct": 5}
+    assert resolve_thresholds(THRESHOLDS, casm.format("ERC721VotesMock"), "felts") == {"max_increase_pct": 1}
+    # An exact name wins over a matching glob
+    assert resolve_thresholds(THRESHOLDS, casm.format("ERC20VotesMock"), "felts") == {"max_increase_pct": 5}
+    assert resolve_thresholds(THRESHOLDS, sierra.format("ERC20VotesMock"), "bytes") == {"max_increase_pct": 5, "max_increase": 10}
+    assert resolve_thresholds(THRESHOLDS, casm.format("AccountMock"), "felts") == {"max_increase_pct": 5}
+    assert resolve_thresholds({}, casm.format("AccountMock"), "felts") == {}
+
+
+def test_gate_passes_within_thresholds():
+    old = sizes(ERC20Mock=(1000, 5000), AccountMock=(2000, 8000))
+    # Both limits apply, and the boundary itself passes
+    new = sizes(ERC20Mock=(1050, 5100), AccountMock=(2100, 7000), VestingMock=(300, 900))
+    verdict = evaluate_gate(old, new, THRESHOLDS)
+    assert verdict == {"passed": True, "checked": 6, "violations": []}
+
+
+def test_gate_fails_over_thresholds():
+    old = sizes(ERC20Mock=(1000, 5000), AccountMock=(2000, 8000), ERC721VotesMock=(1000, 100))
+    new = sizes(ERC20Mock=(1101, 5000), AccountMock=(2101, 8000), ERC721VotesMock=(1011, 100))
+    verdict = evaluate_gate(old, new, THRESHOLDS)
+    assert not verdict["passed"]
+    assert [(v["contract"], v["metric"], v["reasons"]) for v in verdict["violations"]] == [
+        ("AccountMock", "felts", ["+5.05% exceeds +5%"]),
+        ("ERC20Mock", "felts", ["+101 felts exceeds +100", "+10.10% exceeds +5%"]),
+        ("ERC721VotesMock", "felts", ["+1.10% exceeds +1%"]),
+    ]
+    violation = verdict["violations"][1]
+    assert (violation["old"], violation["new"], violation["delta"], violation["delta_pct"]) == (1000, 1101, 101, 10.1)
+    assert violation["thresholds"] == {"max_increase_pct": 5, "max_increase": 100}
+
+
+def test_gate_checks_new_contracts_against_the_hard_limits_only():
+    old = sizes(ERC20Mock=(1000, 5000))
+    new = sizes(ERC20Mock=(1000, 5000), BigMock=(MAX_BYTECODE_SIZE, 5000), SmallMock=(10, 10))
+    verdict = evaluate_gate(old, new, THRESHOLDS)
+    assert [(v["contract"], v["reasons"]) for v in verdict["violations"]] == [
+        ("BigMock", [f"over the {MAX_BYTECODE_SIZE} felts limit"]),
+    ]
+    assert verdict["violations"][0]["delta"] is None
+
+
+def test_max_increase_pct_overrides_defaults_not_contract_rules():
+    old = sizes(ERC20Mock=(1000, 5000), AccountMock=(2000, 8000))
+    new = sizes(ERC20Mock=(1050, 5000), AccountMock=(2040, 8000))
+    thresholds = json.loads(json.dumps(THRESHOLDS))
+    override_default_pct(thresholds, old, new, 1)
+    assert thresholds["default"] == {"felts": {"max_increase_pct": 1}, "bytes": {"max_increase_pct": 1}}
+    verdict = evaluate_gate(old, new, thresholds)
+    assert [(v["contract"], v["reasons"]) for v in verdict["violations"]] == [
+        ("AccountMock", ["+2.00% exceeds +1%"]),
+        ("ERC20Mock", ["+5.00% exceeds +1%"]),
+    ]
+    # A contract rule setting the percentage keeps it
+    thresholds["contracts"]["ERC20Mock"]["felts"]["max_increase_pct"] = 10
+    verdict = evaluate_gate(old, new, thresholds)
+    assert [v["contract"] for v in verdict["violations"]] == ["AccountMock"]
+
+
+def test_committed_thresholds_file():
+    thresholds = load_thresholds(THRESHOLDS_FILE)
+    assert resolve_thresholds(thresholds, "pkg_ERC20Mock.compiled_contract_class.json", "felts") == {"max_increase_pct": 5}
+    assert resolve_thresholds(thresholds, "pkg_ERC20Mock.contract_class.json", "bytes") == {"max_increase_pct": 5}
+
+
+def test_unknown_threshold_is_rejected(tmp_path):
+    path = tmp_path / "thresholds.json"
+    path.write_text(json.dumps({"contracts": {"ERC20Mock": {"felts": {"max_increase_percent": 5}}}}))
+    with pytest.raises(ValueError, match="unknown threshold max_increase_percent for felts"):
+        load_thresholds(path)
+
+
+@pytest.mark.parametrize("extra_args,passed", [([], True), (["--max-increase-pct", "1"], False)])
+def test_gate_verdict_and_exit_status(tmp_path, extra_args, passed):
+    old = sizes(ERC20Mock=(1000, 5000))
+    new = sizes(ERC20Mock=(1040, 5000))
+    (tmp_path / "old.json").write_text(json.dumps(old))
+    (tmp_path / "new.json").write_text(json.dumps(new))
+    proc = subprocess.run(
+        [sys.executable, BENCHMARK_DIFF, str(tmp_path / "old.json"), "--current", str(tmp_path / "new.json"),
+         "--gate", "--thresholds", THRESHOLDS_FILE, "--verdict", "-", *extra_args],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == (0 if passed else 1)
+    assert json.loads(proc.stdout)["passed"] is passed
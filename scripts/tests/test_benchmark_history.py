@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_history import SeriesPoint, append_history, read_contract_series, read_history_records, read_history_snapshot
+
+BENCHMARK_DIFF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarking", "benchmark_diff.py")
+
+
+def sizes(**contracts):
+    """Benchmark results for {stem: (felts, bytes)}, in the format of `benchmark_contracts`."""
+    return {
+        "bytecode": {f"{stem}.compiled_contract_class.json": {"felts": felts} for stem, (felts, _) in sorted(contracts.items())},
+        "contract_class": {f"{stem}.contract_class.json": {"bytes": num_bytes} for stem, (_, num_bytes) in sorted(contracts.items())},
+    }
+
+
+def test_history_round_trip(tmp_path):
+    path = tmp_path / "sizes.history"
+    first = sizes(pkg_ERC20Mock=(40, 1000), pkg_AccountMock=(75, 2000))
+    second = sizes(pkg_ERC20Mock=(42, 1010), pkg_AccountMock=(75, 2000), pkg_VestingMock=(3, 300))
+    assert append_history(path, first, "aaa111", "2.18.0", timestamp=10)
+    assert append_history(path, second, "bbb222", "2.18.0", timestamp=20)
+
+    assert [(r.commit, r.timestamp, r.count) for r in read_history_records(path)] == [("aaa111", 10, 2), ("bbb222", 20, 3)]
+    assert read_history_snapshot(path) == second
+    assert read_history_snapshot(path, "aaa") == first
+    with pytest.raises(ValueError, match="no benchmark recorded for commit ccc"):
+        read_history_snapshot(path, "ccc")
+
+    assert read_contract_series(path, "ERC20Mock") == [
+        SeriesPoint("aaa111", "2.18.0", 10, 40, 1000),
+        SeriesPoint("bbb222", "2.18.0", 20, 42, 1010),
+    ]
+    assert read_contract_series(path, "pkg_VestingMock") == [SeriesPoint("bbb222", "2.18.0", 20, 3, 300)]
+    assert read_contract_series(path, "Missing") == []
+
+
+def test_missing_sizes_are_kept_apart_from_zero(tmp_path):
+    path = tmp_path / "sizes.history"
+    results = sizes(pkg_ERC20Mock=(0, 1000))
+    results["bytecode"]["pkg_AccountMock.compiled_contract_class.json"] = {"felts": 75}
+    append_history(path, results, "aaa111", "2.18.0", timestamp=10)
+    assert read_history_snapshot(path) == {
+        "bytecode": {
+            "pkg_AccountMock.compiled_contract_class.json": {"felts": 75},
+            "pkg_ERC20Mock.compiled_contract_class.json": {"felts": 0},
+        },
+        "contract_class": {"pkg_ERC20Mock.contract_class.json": {"bytes": 1000}},
+    }
+    assert read_contract_series(path, "AccountMock") == [SeriesPoint("aaa111", "2.18.0", 10, 75, None)]
+
+
+def test_skip_unchanged(tmp_path):
+    path = tmp_path / "sizes.history"
+    results = sizes(pkg_ERC20Mock=(40, 1000))
+    assert append_history(path, results, "aaa111", "2.18.0", timestamp=10, skip_unchanged=True)
+    size = path.stat().st_size
+    # Error entries carry no size, so they don't count as a change
+    with_error = sizes(pkg_ERC20Mock=(40, 1000))
+    with_error["bytecode"]["pkg_Broken.compiled_contract_class.json"] = {"error": "invalid JSON"}
+    assert not append_history(path, with_error, "bbb222", "2.18.0", timestamp=20, skip_unchanged=True)
+    assert path.stat().st_size == size
+    assert append_history(path, sizes(pkg_ERC20Mock=(41, 1000)), "ccc333", "2.18.0", timestamp=30, skip_unchanged=True)
+    # Without skip_unchanged every run is recorded
+    assert append_history(path, sizes(pkg_ERC20Mock=(41, 1000)), "ddd444", "2.18.0", timestamp=40)
+    assert [r.commit for r in read_history_records(path)] == ["aaa111", "ccc333", "ddd444"]
+
+
+def test_ambiguous_contract_name(tmp_path):
+    path = tmp_path / "sizes.history"
+    append_history(path, sizes(a_ERC20Mock=(40, 1000), b_ERC20Mock=(41, 1001)), "aaa111", "2.18.0", timestamp=10)
+    with pytest.raises(ValueError, match="ambiguous contract name 'ERC20Mock': a_ERC20Mock, b_ERC20Mock"):
+        read_contract_series(path, "ERC20Mock")
+    assert read_contract_series(path, "b_ERC20Mock")[0].felts == 41
+
+
+@pytest.mark.parametrize("flag", [["--current", "report.json"], ["--breakdown"], ["--sections"], ["--storage"]])
+def test_benchmark_diff_only_records_size_reports(tmp_path, flag):
+    history = tmp_path / "sizes.history"
+    proc = subprocess.run(
+        [sys.executable, BENCHMARK_DIFF, str(tmp_path / "previous.json"), "--history", str(history), *flag],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 2
+    assert f"--history cannot be combined with {flag[0]}" in proc.stderr
+    assert not history.exists()
+
+
+def test_benchmark_diff_records_the_size_benchmark(target_dir, tmp_path):
+    history = tmp_path / "sizes.history"
+    previous = tmp_path / "previous.json"
+    previous.write_text("{}")
+    command = [
+        sys.executable, BENCHMARK_DIFF, str(previous), "--dir", str(target_dir), "--no-cache",
+        "--history", str(history), "--commit", "aaa111", "--scarb-version", "2.18.0",
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+    subprocess.run(command, check=True, capture_output=True)
+    assert [r.commit for r in read_history_records(history)] == ["aaa111"]
+    assert read_history_snapshot(history)["bytecode"]["openzeppelin_test_pkg_AccountMock.compiled_contract_class.json"] == {"felts": 75}
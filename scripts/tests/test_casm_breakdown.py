@@ -0,0 +1,75 @@
+import json
+
+from casm_breakdown import breakdown_contract, read_function_segments
+
+SELECTOR = "0x" + "12" * 31
+
+
+def write_pair(tmp_path, segment_lengths, user_func_names, bytecode_length=None):
+    casm = {
+        "bytecode": ["0x1"] * (sum(segment_lengths) if bytecode_length is None else bytecode_length),
+        "bytecode_segment_lengths": segment_lengths,
+        "entry_points_by_type": {"EXTERNAL": [{"selector": SELECTOR, "offset": segment_lengths[0], "builtins": []}]},
+    }
+    sierra = {
+        "sierra_program_debug_info": {"user_func_names": user_func_names},
+        "entry_points_by_type": {"EXTERNAL": [{"selector": SELECTOR, "function_idx": 0}]},
+    }
+    casm_path = tmp_path / "pkg_Mock.compiled_contract_class.json"
+    sierra_path = tmp_path / "pkg_Mock.contract_class.json"
+    casm_path.write_text(json.dumps(casm))
+    sierra_path.write_text(json.dumps(sierra))
+    return casm, casm_path, sierra_path
+
+
+def test_segments_are_named_in_function_id_order(tmp_path):
+    names = [[1, "pkg::mock::Mock::__wrapper__transfer"], [0, "pkg::mock::Mock::__wrapper__approve"]]
+    casm, casm_path, sierra_path = write_pair(tmp_path, [3, 6], names)
+    warnings = []
+    functions, entry_points = read_function_segments(casm, sierra_path, warnings)
+    assert functions == [
+        ("pkg::mock::Mock::__wrapper__approve", 0, 3),
+        ("pkg::mock::Mock::__wrapper__transfer", 3, 6),
+    ]
+    assert entry_points == {int(SELECTOR, 16): 0}
+    assert warnings == []
+
+    breakdown = breakdown_contract(casm_path, sierra_path)
+    assert breakdown["functions"] == {"pkg::mock::Mock::__wrapper__transfer": 6, "pkg::mock::Mock::__wrapper__approve": 3}
+    assert breakdown["groups"] == {"pkg::mock": 9}
+    # The Sierra entry point wins over the offset, which falls in the second segment
+    assert breakdown["entry_points"][f"EXTERNAL {hex(int(SELECTOR, 16))}"]["function"] == "pkg::mock::Mock::__wrapper__approve"
+    assert "warnings" not in breakdown
+
+
+def test_mismatched_counts_are_not_attributed_by_position(tmp_path):
+    names = [[0, "pkg::mock::Mock::a"], [1, "pkg::mock::Mock::b"], [2, "pkg::mock::Mock::c"]]
+    casm, casm_path, sierra_path = write_pair(tmp_path, [3, 6], names)
+    warnings = []
+    functions, entry_points = read_function_segments(casm, sierra_path, warnings)
+    assert functions == [("function #0", 0, 3), ("function #1", 3, 6)]
+    assert entry_points == {}
+    assert warnings == ["2 bytecode segments but 3 Sierra functions, names not attributed"]
+
+    breakdown = breakdown_contract(casm_path, sierra_path)
+    assert breakdown["warnings"] == warnings
+    # Falls back to the segment containing the entry point's offset
+    assert breakdown["entry_points"][f"EXTERNAL {hex(int(SELECTOR, 16))}"]["function"] == "function #1"
+
+
+def test_function_ids_with_gaps_are_not_attributed(tmp_path):
+    names = [[0, "pkg::mock::Mock::a"], [2, "pkg::mock::Mock::c"]]
+    casm, _, sierra_path = write_pair(tmp_path, [3, 6], names)
+    functions, _ = read_function_segments(casm, sierra_path)
+    assert [name for name, _, _ in functions] == ["function #0", "function #1"]
+
+
+def test_segment_lengths_not_covering_the_bytecode_are_ignored(tmp_path):
+    names = [[0, "pkg::mock::Mock::a"], [1, "pkg::mock::Mock::b"]]
+    casm, casm_path, sierra_path = write_pair(tmp_path, [3, 6], names, bytecode_length=10)
+    warnings = []
+    functions, _ = read_function_segments(casm, sierra_path, warnings)
+    assert functions == []
+    assert warnings[0] == "bytecode segment lengths add up to 9 felts, not 10"
+    breakdown = breakdown_contract(casm_path, sierra_path)
+    assert breakdown["groups"] == {"(unattributed)": 10}
@@ -0,0 +1,148 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import generate_class_hashes
+from artifact_manifest import ArtifactManifest
+from class_hash import compute_compiled_class_hash, compute_sierra_class_hash_file, get_selector_from_name, hades_permutation
+from generate_class_hashes import (
+    ARTIFACT_MANIFEST,
+    PRESET_ORDER,
+    compute_class_hash,
+    compute_preset_hashes,
+    extract_preset_artifacts,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+# A trimmed account contract class, hashed with starknet-py 0.30 (which matches `starkli class-hash`)
+ACCOUNT_CLASS = FIXTURES / "account.contract_class.json"
+ACCOUNT_CLASS_HASH = 0x21F491156A4631221F88CEF3A6F48B9441B500A2EFEE31FBB848A7FE01469B7
+# A trimmed Sierra and CASM class per preset, with the entry points and ABI interfaces the
+# preset declares in packages/presets and placeholder program felts, plus their artifact
+# manifest. The hashes in class_hashes.json were recorded with starknet-py 0.30.
+PRESET_FIXTURES = FIXTURES / "presets"
+PRESET_HASHES = json.loads((PRESET_FIXTURES / "class_hashes.json").read_text())
+
+
+def test_selector():
+    assert get_selector_from_name("transfer") == 0x83AFD3F4CAEDC6EEBF44246FE54E38C95E3179A5EC9EA81740ECA5B482D12E
+
+
+def test_hades_permutation():
+    assert hades_permutation(1, 2, 2) == (
+        0x5D44A3DECB2B2E0CC71071F7B802F45DD792D064F0FC7316C46514F70F9891A,
+        0x7F2F8D1EF958B7831A9E9957C724459781575684490B7AE6EACD3AED1F25CF5,
+        0x68163DD4C74A3FD7CDCA0CDCB80EA7B4A55B3B9F18B0B57698FBD8E5C0623C8,
+    )
+
+
+# A small CASM class with two segments, hashed with starknet-py 0.30 in every segment layout
+SMALL_CASM = {
+    "prime": "0x800000000000011000000000000000000000000000000000000000000000001",
+    "compiler_version": "2.18.0",
+    "bytecode": [
+        "0x480680017fff8000", "0x1234", "0x1104800180018000", "0x800000000000010fffffffffffffffffffffffffffffffffffffffffffffffe",
+        "0x208b7fff7fff7ffe", "0x40780017fff7fff", "0x5", "0x48127ffe7fff8000", "0x208b7fff7fff7ffe", "0x10780017fff7fff",
+    ],
+    "hints": [],
+    "entry_points_by_type": {
+        "EXTERNAL": [
+            {"selector": "0x83afd3f4caedc6eebf44246fe54e38c95e3179a5ec9ea81740eca5b482d12e", "offset": 0, "builtins": ["range_check", "poseidon"]},
+        ],
+        "L1_HANDLER": [],
+        "CONSTRUCTOR": [{"selector": "0x28ffe4ff0f226a9107253e17a904099aa4f63a02a5621de0576e5aa71bc5194", "offset": 5, "builtins": []}],
+    },
+}
+SMALL_CASM_HASHES = [
+    ([5, 5], 0x40F821A169A252AD924D10F53C2B3DB9B92753D197C89EFE8E52CF97ECCDCEC, 0x7567EA7723E59CBDFA0857F0A776022B8B509767A68B5E043D93A71516A7BA3),
+    ([5, [2, [3]]], 0x720B762E609C7DB224C59C83A731CC10E1ADCAE750436CFC231113501125A83, 0x7A7D2AAE30F1AE2B1C9B96EC3AF98D06A9C8A20E61FD96D3F5F988017E62843),
+    (None, 0x5181A9C8556D746427D2072891099A622544ECEE5076030C08549BFC00B6D73, 0x34395143F05BD60AD38E9FA5CA1D724D1A98D7443B2E6615A61E89107538DA7),
+]
+
+
+@pytest.mark.parametrize("lengths,poseidon,blake2s", SMALL_CASM_HASHES)
+def test_compiled_class_hash_vectors(lengths, poseidon, blake2s):
+    casm = dict(SMALL_CASM)
+    if lengths is not None:
+        casm["bytecode_segment_lengths"] = lengths
+    assert compute_compiled_class_hash(casm) == poseidon
+    assert compute_compiled_class_hash(casm, "poseidon") == poseidon
+    assert compute_compiled_class_hash(casm, "blake2s") == blake2s
+
+
+@pytest.mark.parametrize("lengths,message", [
+    ([5, 4], "bytecode segments cover 9 felts, but the bytecode has 10"),
+    ([5, [5, 1]], "bytecode segments cover 11 felts, but the bytecode has 10"),
+    ([5, "5"], "bytecode_segment_lengths must be a nested list of integers"),
+])
+def test_compiled_class_hash_rejects_bad_segments(lengths, message):
+    with pytest.raises(ValueError, match=message):
+        compute_compiled_class_hash({**SMALL_CASM, "bytecode_segment_lengths": lengths})
+
+
+def test_compiled_class_hash_rejects_unknown_methods():
+    with pytest.raises(ValueError, match="unknown compiled class hash method: keccak"):
+        compute_compiled_class_hash(SMALL_CASM, "keccak")
+
+
+def test_recorded_sierra_class_hash():
+    assert compute_sierra_class_hash_file(ACCOUNT_CLASS) == ACCOUNT_CLASS_HASH
+    assert compute_class_hash(ACCOUNT_CLASS) == f"{ACCOUNT_CLASS_HASH:#066x}"
+
+
+def test_preset_fixtures_cover_every_preset():
+    assert list(PRESET_HASHES) == PRESET_ORDER
+
+
+@pytest.mark.parametrize("name", PRESET_ORDER)
+def test_recorded_preset_class_hashes(name):
+    expected = PRESET_HASHES[name]
+    sierra = PRESET_FIXTURES / f"openzeppelin_presets_{name}.contract_class.json"
+    casm = json.loads((PRESET_FIXTURES / f"openzeppelin_presets_{name}.compiled_contract_class.json").read_text())
+    assert compute_class_hash(sierra) == expected["class_hash"]
+    for method, compiled_class_hash in expected["compiled_class_hash"].items():
+        assert compute_compiled_class_hash(casm, method) == int(compiled_class_hash, 16)
+
+
+def test_preset_hashes_from_the_artifact_manifest(tmp_path):
+    # Copied, since reading the manifest writes its index next to it
+    target_dir = shutil.copytree(PRESET_FIXTURES, tmp_path / "release")
+    artifacts = extract_preset_artifacts(ArtifactManifest(target_dir))
+    hashes = compute_preset_hashes(artifacts, jobs=2, use_cache=False)
+    assert hashes == {name: PRESET_HASHES[name]["class_hash"] for name in PRESET_ORDER}
+
+
+def test_starkli_never_reuses_native_cache_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_class_hashes, "CLASS_HASH_CACHE", tmp_path / ".class_hash_cache.json")
+    starkli_calls = []
+
+    def fake_starkli(artifact):
+        starkli_calls.append(artifact)
+        return f"{ACCOUNT_CLASS_HASH:#066x}"
+
+    monkeypatch.setattr(generate_class_hashes, "compute_class_hash_with_starkli", fake_starkli)
+    artifacts = {"Account": ACCOUNT_CLASS}
+
+    native = compute_preset_hashes(artifacts, jobs=1)
+    assert compute_preset_hashes(artifacts, jobs=1, use_starkli=True) == native
+    assert starkli_calls == [ACCOUNT_CLASS]
+    # Once cached, starkli hashes are reused like native ones
+    compute_preset_hashes(artifacts, jobs=1, use_starkli=True)
+    assert starkli_calls == [ACCOUNT_CLASS]
+
+
+def built_preset_artifacts():
+    try:
+        return sorted(ARTIFACT_MANIFEST.parent.glob("openzeppelin_presets_*.contract_class.json"))
+    except OSError:
+        return []
+
+
+@pytest.mark.skipif(shutil.which("starkli") is None, reason="starkli is not installed")
+@pytest.mark.parametrize("artifact", built_preset_artifacts(), ids=lambda artifact: artifact.name)
+def test_native_hash_matches_starkli_on_built_presets(artifact):
+    result = subprocess.run(["starkli", "class-hash", str(artifact)], check=True, stdout=subprocess.PIPE, text=True)
+    assert compute_sierra_class_hash_file(artifact) == int(result.stdout.strip(), 16)
@@ -0,0 +1,149 @@
+import os
+import subprocess
+
+import pytest
+
+import generate_class_hashes
+from generate_class_hashes import ensure_presets_built, stale_build_reason
+
+SCARB_VERSION = "scarb 2.18.0 (c6c4ab9b4 2025-01-01)"
+
+
+def make_older(path, reference, seconds=1):
+    """Dates `path` back before `reference`, independent of the filesystem's clock granularity."""
+    mtime = reference.stat().st_mtime_ns - seconds * 10 ** 9
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A presets package with a path dependency and a dev-dependency, and a fake `scarb build`."""
+    (tmp_path / "Scarb.toml").write_text('[workspace]\nmembers = ["packages/*"]\n')
+    (tmp_path / "Scarb.lock").write_text("version = 1\n")
+    packages = {
+        "presets": '[package]\nname = "openzeppelin_presets"\n\n[dependencies]\nopenzeppelin_token = { path = "../token" }\n\n[dev-dependencies]\nopenzeppelin_testing = { path = "../testing" }\n',
+        "token": '[package]\nname = "openzeppelin_token"\n',
+        "testing": '[package]\nname = "openzeppelin_testing"\n',
+    }
+    for name, manifest in packages.items():
+        (tmp_path / "packages" / name / "src").mkdir(parents=True)
+        (tmp_path / "packages" / name / "Scarb.toml").write_text(manifest)
+        (tmp_path / "packages" / name / "src" / "lib.cairo").write_text(f"// {name}\n")
+    release = tmp_path / "target" / "release"
+    manifest = release / "openzeppelin_presets.starknet_artifacts.json"
+    fingerprint = release / ".openzeppelin_presets.fingerprint.json"
+    monkeypatch.setattr(generate_class_hashes, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(generate_class_hashes, "PRESETS_PACKAGE", tmp_path / "packages" / "presets")
+    monkeypatch.setattr(generate_class_hashes, "ARTIFACT_MANIFEST", manifest)
+    monkeypatch.setattr(generate_class_hashes, "BUILD_FINGERPRINT", fingerprint)
+    monkeypatch.setattr(generate_class_hashes, "read_scarb_tool_version", lambda: SCARB_VERSION)
+
+    builds = []
+
+    def fake_build():
+        builds.append(fingerprint.read_text())
+        manifest.write_text('{"version": 1, "contracts": []}')
+        make_older(fingerprint, manifest)
+
+    monkeypatch.setattr(generate_class_hashes, "build_presets", fake_build)
+    return tmp_path, manifest, fingerprint, builds
+
+
+def current_reason():
+    return stale_build_reason(generate_class_hashes.compute_build_fingerprint(SCARB_VERSION))
+
+
+def test_missing_manifest_builds_and_records_the_fingerprint(workspace, capsys):
+    _, manifest, fingerprint, builds = workspace
+    assert current_reason() == "no release artifacts found"
+    ensure_presets_built()
+    assert len(builds) == 1
+    assert "Building openzeppelin_presets: no release artifacts found." in capsys.readouterr().err
+    assert fingerprint.is_file() and manifest.is_file()
+    assert current_reason() is None
+
+
+def test_matching_fingerprint_skips_the_build(workspace, capsys):
+    _, _, _, builds = workspace
+    ensure_presets_built()
+    capsys.readouterr()
+    ensure_presets_built()
+    assert len(builds) == 1
+    assert "Skipping openzeppelin_presets build" in capsys.readouterr().err
+
+
+def test_external_scarb_build_is_reused(workspace):
+    _, manifest, _, builds = workspace
+    ensure_presets_built()
+    # A plain `scarb build` of the same inputs rewrites the artifacts after the fingerprint
+    manifest.write_text('{"version": 1, "contracts": []}')
+    assert current_reason() is None
+    ensure_presets_built()
+    assert len(builds) == 1
+
+
+@pytest.mark.parametrize(
+    "path", ["packages/presets/src/lib.cairo", "packages/token/src/lib.cairo", "Scarb.toml", "Scarb.lock"]
+)
+def test_input_change_rebuilds(workspace, path):
+    root, _, _, builds = workspace
+    ensure_presets_built()
+    with open(root / path, "a") as f:
+        f.write("// changed\n")
+    assert current_reason() == "sources, manifests or scarb version changed since the last build"
+    ensure_presets_built()
+    assert len(builds) == 2
+    assert builds[0] != builds[1]
+
+
+def test_dev_dependency_change_does_not_rebuild(workspace):
+    root, _, _, _ = workspace
+    ensure_presets_built()
+    (root / "packages" / "testing" / "src" / "lib.cairo").write_text("// changed\n")
+    assert current_reason() is None
+
+
+def test_scarb_version_change_rebuilds(workspace):
+    ensure_presets_built()
+    fingerprint = generate_class_hashes.compute_build_fingerprint("scarb 2.19.0")
+    assert stale_build_reason(fingerprint) == "sources, manifests or scarb version changed since the last build"
+
+
+def test_missing_fingerprint_rebuilds(workspace):
+    _, _, fingerprint, _ = workspace
+    ensure_presets_built()
+    fingerprint.unlink()
+    assert current_reason() == "no build fingerprint recorded"
+
+
+def test_failed_build_is_not_mistaken_for_an_up_to_date_one(workspace, monkeypatch):
+    root, manifest, fingerprint, _ = workspace
+    ensure_presets_built()
+    (root / "packages" / "presets" / "src" / "lib.cairo").write_text("// broken\n")
+
+    def failing_build():
+        raise subprocess.CalledProcessError(1, ["scarb", "build"])
+
+    monkeypatch.setattr(generate_class_hashes, "build_presets", failing_build)
+    with pytest.raises(subprocess.CalledProcessError):
+        ensure_presets_built()
+    assert manifest.stat().st_mtime_ns <= fingerprint.stat().st_mtime_ns
+    assert current_reason() == "release artifacts are older than the recorded fingerprint, so the last build did not finish"
+
+
+def test_build_that_leaves_artifacts_untouched_is_recorded(workspace, monkeypatch):
+    root, _, _, _ = workspace
+    ensure_presets_built()
+    (root / "Scarb.lock").write_text("version = 1\n# unchanged dependencies\n")
+    # scarb found nothing to rewrite
+    monkeypatch.setattr(generate_class_hashes, "build_presets", lambda: None)
+    ensure_presets_built()
+    assert current_reason() is None
+
+
+def test_force_build_always_builds(workspace, capsys):
+    _, _, _, builds = workspace
+    ensure_presets_built()
+    ensure_presets_built(force=True)
+    assert len(builds) == 2
+    assert "Building openzeppelin_presets: build forced with --force-build." in capsys.readouterr().err
@@ -0,0 +1,39 @@
+import ast
+import os
+
+import pytest
+
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+BENCHMARKING_DIR = os.path.join(SCRIPTS_DIR, "benchmarking")
+SHARED_MODULES = {name[:-3] for name in os.listdir(SCRIPTS_DIR) if name.endswith(".py")}
+BENCHMARKING_MODULES = sorted(name for name in os.listdir(BENCHMARKING_DIR) if name.endswith(".py"))
+
+
+def imported_module(node):
+    if isinstance(node, ast.ImportFrom) and node.level == 0:
+        return node.module
+    if isinstance(node, ast.Import):
+        return node.names[0].name
+    return None
+
+
+def appends_to_sys_path(node):
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Call)
+        and ast.unparse(node.value.func) in ("sys.path.append", "sys.path.insert")
+    )
+
+
+@pytest.mark.parametrize("filename", BENCHMARKING_MODULES)
+def test_shared_helpers_are_imported_after_resolving_scripts_dir(filename):
+    # Importing from scripts/ must not depend on another module (e.g. benchmark.py) having
+    # extended sys.path first
+    with open(os.path.join(BENCHMARKING_DIR, filename)) as f:
+        tree = ast.parse(f.read())
+    resolved = False
+    for node in tree.body:
+        resolved = resolved or appends_to_sys_path(node)
+        module = imported_module(node)
+        if module in SHARED_MODULES:
+            assert resolved, f"{filename} imports {module} from scripts/ before adding it to sys.path"
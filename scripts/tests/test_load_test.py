@@ -0,0 +1,128 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import load_test
+from class_hash import encode_short_string
+from load_test import (
+    LOAD_PRESETS,
+    QUERY_VERSION,
+    STRK_TOKEN,
+    TRANSFER_SELECTOR,
+    Account,
+    compiled_class_hash_method,
+    declare_v3_hash,
+    execute_calldata,
+    invoke_v3_hash,
+    load_preset_classes,
+)
+from signing import get_stark_public_key, stark_sign_batch
+
+PRESET_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "presets"
+PRESET_HASHES = json.loads((PRESET_FIXTURES / "class_hashes.json").read_text())
+
+# Transaction hashes and signatures recorded with starknet-py 0.30: compute_invoke_v3_transaction_hash,
+# compute_declare_v3_transaction_hash and message_signature(seed=None), cairo-lang's default nonce
+CHAIN_ID = encode_short_string("SN_SEPOLIA")
+SENDER = 0x064B48806902A367C8598F4F95C305E8C1A1ACBA5F082D294A43793113115691
+PRIVATE_KEY = 0x71D7BB07B9A64F6F78AC4C816AFF4DA9
+PUBLIC_KEY = 0x39D9E6CE352AD4530A0EF5D5A18FD3303C3606A7FA6AC5B620020AD681CC33B
+BOUNDS = {"l1_gas": (0x186A0, 0x5AF3107A4000), "l2_gas": (0x5F5E100, 0x2540BE400), "l1_data_gas": (0x2710, 0x174876E800)}
+TRANSFER = [(STRK_TOKEN, TRANSFER_SELECTOR, [0x123, 10 ** 18, 0])]
+INVOKE_HASH = 0x3ACD878DE6DA86038204BBFB5F6896253C8E648CE672686CDCFD1CD9097E386
+INVOKE_QUERY_HASH = 0x5C719A43ED8834D72BF797A13808EE9E5D7D15BE03E98C5966E05A6695E2342
+INVOKE_SIGNATURE = (
+    0x703B589A68D10BB628AB051E181B4411173EB0D6A9893A4C8E75426A7EE620A,
+    0x25312233BB257B6849A39703418F73A4057102E22048E99EB405509FEBF4E9F,
+)
+DECLARED_CLASS_HASH = 0x21F491156A4631221F88CEF3A6F48B9441B500A2EFEE31FBB848A7FE01469B7
+DECLARE_HASH = 0x2ECB9AF7E90B7BA8D1400F0B3489112587024CA11A7DD6BCF870C0ACD10464F
+DECLARE_SIGNATURE = (
+    0x532B83F788FD580995C0A48A475408F6262CCCFDF7933398D4037B08DEEBCF4,
+    0x17FAA3440CAA71BFBFE80A687F00AAC2FAD69FCB75C74F23678F263F962676B,
+)
+
+
+def test_invoke_v3_hash_vectors():
+    calldata = execute_calldata(TRANSFER)
+    assert calldata == [1, STRK_TOKEN, TRANSFER_SELECTOR, 3, 0x123, 10 ** 18, 0]
+    assert invoke_v3_hash(SENDER, calldata, CHAIN_ID, 7, BOUNDS) == INVOKE_HASH
+    assert invoke_v3_hash(SENDER, calldata, CHAIN_ID, 7, BOUNDS, QUERY_VERSION) == INVOKE_QUERY_HASH
+
+
+def test_declare_v3_hash_vector():
+    assert declare_v3_hash(SENDER, DECLARED_CLASS_HASH, 0x1234, CHAIN_ID, 8, BOUNDS) == DECLARE_HASH
+
+
+def test_signature_vectors():
+    assert get_stark_public_key(PRIVATE_KEY) == PUBLIC_KEY
+    assert stark_sign_batch(PRIVATE_KEY, [INVOKE_HASH, DECLARE_HASH]) == [INVOKE_SIGNATURE, DECLARE_SIGNATURE]
+
+
+def test_signed_rpc_transactions():
+    account = Account(None, CHAIN_ID, SENDER, PRIVATE_KEY, nonce=7)
+    invoke = account.invoke_transaction(TRANSFER, BOUNDS)
+    assert invoke["type"] == "INVOKE"
+    assert invoke["signature"] == [hex(felt) for felt in INVOKE_SIGNATURE]
+    assert invoke["calldata"] == [hex(felt) for felt in execute_calldata(TRANSFER)]
+    assert invoke["resource_bounds"]["l2_gas"] == {"max_amount": "0x5f5e100", "max_price_per_unit": "0x2540be400"}
+    assert (invoke["version"], invoke["nonce"], invoke["sender_address"]) == ("0x3", "0x7", hex(SENDER))
+
+    account.nonce = 8
+    declare = account.declare_transaction({}, DECLARED_CLASS_HASH, 0x1234, BOUNDS)
+    assert declare["type"] == "DECLARE"
+    assert declare["compiled_class_hash"] == "0x1234"
+    assert declare["signature"] == [hex(felt) for felt in DECLARE_SIGNATURE]
+
+
+@pytest.mark.parametrize("version,method", [
+    ("0.13.5", "poseidon"),
+    ("0.14.0", "poseidon"),
+    ("0.14.1", "blake2s"),
+    ("0.14.1.1", "blake2s"),
+    ("0.15.0", "blake2s"),
+    ("", "poseidon"),
+    (None, "poseidon"),
+])
+def test_compiled_class_hash_method(version, method):
+    assert compiled_class_hash_method(version) == method
+
+
+@pytest.fixture
+def preset_dir(tmp_path):
+    shutil.copytree(PRESET_FIXTURES, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+@pytest.mark.parametrize("method", ["poseidon", "blake2s"])
+def test_load_preset_classes(preset_dir, method):
+    classes = load_preset_classes(preset_dir, method)
+    assert list(classes) == LOAD_PRESETS
+    for name, (contract_class, class_hash, compiled_class_hash) in classes.items():
+        expected = PRESET_HASHES[name]
+        assert class_hash == int(expected["class_hash"], 16)
+        assert compiled_class_hash == int(expected["compiled_class_hash"][method], 16)
+        assert isinstance(contract_class["abi"], str)
+        assert "sierra_program_debug_info" not in contract_class
+
+
+def test_missing_casm_is_compiled_from_sierra(preset_dir, monkeypatch):
+    manifest_path = preset_dir / "openzeppelin_presets.starknet_artifacts.json"
+    manifest = json.loads(manifest_path.read_text())
+    for contract in manifest["contracts"]:
+        del contract["artifacts"]["casm"]
+    manifest_path.write_text(json.dumps(manifest))
+    compiled = []
+
+    def fake_universal_sierra_compiler(sierra_path):
+        compiled.append(Path(sierra_path).name)
+        casm_path = PRESET_FIXTURES / Path(sierra_path).name.replace(".contract_class.json", ".compiled_contract_class.json")
+        return json.loads(casm_path.read_text())
+
+    monkeypatch.setattr(load_test, "compile_sierra", fake_universal_sierra_compiler)
+    classes = load_preset_classes(preset_dir, "blake2s")
+    assert compiled == [f"openzeppelin_presets_{name}.contract_class.json" for name in LOAD_PRESETS]
+    for name, (_, _, compiled_class_hash) in classes.items():
+        assert compiled_class_hash == int(PRESET_HASHES[name]["compiled_class_hash"]["blake2s"], 16)
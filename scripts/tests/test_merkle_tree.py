@@ -0,0 +1,103 @@
+import json
+import random
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from merkle_tree import RECORD_SIZE, MerkleTreeFile, build_tree, process_multi_proof, process_proof, sort_records
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MERKLE_TREE_SCRIPT = REPO_ROOT / "scripts" / "merkle_tree.py"
+# The Cairo test whose roots and proofs were generated by merkle_tree.py
+CAIRO_TEST = REPO_ROOT / "packages/merkle_tree/src/tests/merkle_proof/test_with_merkle_tree_script.cairo"
+CAIRO_SOURCE = CAIRO_TEST.read_text()
+FELT_PATTERN = re.compile(r"0x[0-9a-fA-F]+")
+
+
+def cairo_constant(name):
+    match = re.search(rf"\b{name}\b[^=]*=\s*(.*?);", CAIRO_SOURCE, re.S)
+    return match.group(1)
+
+
+def cairo_function_body(name):
+    match = re.search(rf"fn {name}\(\).*?\{{(.*?)\n\}}", CAIRO_SOURCE, re.S)
+    return match.group(1)
+
+
+def cairo_proofs(hash_name):
+    body = cairo_function_body(f"{hash_name.upper()}_PROOFS")
+    return [[int(felt, 16) for felt in FELT_PATTERN.findall(proof)] for proof in body.split(".span(),")[:-1]]
+
+
+def cairo_leaves():
+    body = cairo_function_body("LEAVES")
+    return re.findall(r"address:\s*(0x[0-9a-fA-F]+)\.as_address\(\),\s*amount:\s*(\w+)", body)
+
+
+@pytest.fixture(scope="module")
+def leaves_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("merkle") / "leaves.csv"
+    path.write_text("".join(f"{address},{amount}\n" for address, amount in cairo_leaves()))
+    return path
+
+
+@pytest.mark.parametrize("hash_name", ["pedersen", "poseidon"])
+def test_matches_the_cairo_test_constants(leaves_csv, tmp_path, hash_name):
+    assert len(cairo_leaves()) == 7
+    root = build_tree(leaves_csv, tmp_path / "tree", hash_name, ["ContractAddress", "u128"], jobs=1)
+    assert root == int(cairo_constant(f"{hash_name.upper()}_ROOT"), 16)
+    with MerkleTreeFile(tmp_path / "tree") as tree:
+        assert tree.hash_name == hash_name
+        proofs = [tree.proof(row) for row in range(tree.leaf_count)]
+        assert proofs == cairo_proofs(hash_name)
+        for row, proof in enumerate(proofs):
+            assert process_proof(hash_name, proof, tree.leaf(row)) == root
+
+        multi_proof = tree.multi_proof([0, 4, 6])
+        # The Cairo test proves the leaves in the order the script lists them
+        assert multi_proof["rows"] == [6, 0, 4]
+        assert multi_proof["proof"] == [int(felt, 16) for felt in FELT_PATTERN.findall(cairo_constant(f"{hash_name.upper()}_MULTI_PROOF"))]
+        flags = re.findall(r"true|false", cairo_constant(f"{hash_name.upper()}_MULTI_PROOF_FLAGS"))
+        assert multi_proof["proof_flags"] == [flag == "true" for flag in flags]
+        assert process_multi_proof(hash_name, multi_proof["proof"], multi_proof["proof_flags"], multi_proof["leaves"]) == root
+
+
+def test_cli_round_trip(leaves_csv, tmp_path):
+    tree = tmp_path / "tree"
+
+    def run(*args, **kwargs):
+        return subprocess.run([sys.executable, str(MERKLE_TREE_SCRIPT), *args], capture_output=True, text=True, **kwargs)
+
+    build = run("build", str(leaves_csv), "-o", str(tree), "--hash", "pedersen", "--types", "ContractAddress,u128", "-j", "2")
+    assert build.returncode == 0, build.stderr
+    assert int(build.stdout, 16) == int(cairo_constant("PEDERSEN_ROOT"), 16)
+    proofs = [json.loads(line) for line in run("proofs", str(tree)).stdout.splitlines()]
+    assert [[int(felt, 16) for felt in proof["proof"]] for proof in proofs] == cairo_proofs("pedersen")
+    assert run("verify", str(tree), "-", input=json.dumps(proofs[3])).stdout == "valid proof\n"
+    proofs[3]["leaf"] = proofs[4]["leaf"]
+    assert run("verify", str(tree), "-", input=json.dumps(proofs[3])).returncode == 1
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 7, 1000, 70000])
+def test_sort_records_matches_sorted(count):
+    rng = random.Random(count)
+    records = [rng.randbytes(RECORD_SIZE) for _ in range(count)]
+    # Duplicated leaves only differ by their row
+    records += [record[:-1] + bytes([record[-1] ^ 1]) for record in records[:count // 10]]
+    rng.shuffle(records)
+    packed = bytearray(b"".join(records))
+    sort_records(packed)
+    assert bytes(packed) == b"".join(sorted(records))
+
+
+def test_duplicated_leaves_are_ordered_by_row(tmp_path):
+    csv_path = tmp_path / "leaves.csv"
+    csv_path.write_text("5\n3\n5\n")
+    build_tree(csv_path, tmp_path / "tree", "poseidon", ["felt252"], jobs=1)
+    with MerkleTreeFile(tmp_path / "tree") as tree:
+        assert tree.leaf(0) == tree.leaf(2)
+        assert tree.tree_index(0) > tree.tree_index(2)
+        assert sorted(tree.tree_index(row) for row in range(3)) == [2, 3, 4]
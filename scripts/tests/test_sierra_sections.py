@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from casm_breakdown import list_casm_artifacts
+from sierra_sections import OVERHEAD, SECTIONS_KEY, get_sierra_sections, measure_sections
+
+ABI = [
+    {"type": "impl", "name": "ERC20Impl", "interface_name": "openzeppelin_interfaces::erc20::IERC20"},
+    {"type": "interface", "name": "openzeppelin_interfaces::erc20::IERC20", "items": [
+        {"type": "function", "name": "transfer", "inputs": [], "outputs": [], "state_mutability": "external"},
+    ]},
+    {"type": "impl", "name": "ERC20MetadataImpl", "interface_name": "openzeppelin_interfaces::erc20::IERC20Metadata"},
+    {"type": "interface", "name": "openzeppelin_interfaces::erc20::IERC20Metadata", "items": []},
+    {"type": "event", "name": "openzeppelin_token::erc20::erc20::ERC20Component::Transfer", "kind": "struct", "members": [
+        {"name": "value", "type": "core::integer::u256", "kind": "data"},
+    ]},
+    {"type": "event", "name": "pkg::ERC20Mock::Event", "kind": "enum", "variants": []},
+]
+
+
+def sierra_class(abi=ABI):
+    return {
+        "sierra_program": ["0x1", "0x7", "0x0", "0x2", "0xc", "0x0", "0x5b", "0x5d"],
+        "sierra_program_debug_info": {"type_names": [], "libfunc_names": [], "user_func_names": [[0, "f]{,"]]},
+        "contract_class_version": "0.1.0",
+        "entry_points_by_type": {"EXTERNAL": [], "L1_HANDLER": [], "CONSTRUCTOR": []},
+        "abi": abi,
+    }
+
+
+def entry_bytes(entry, indent, depth=2):
+    """Size of an ABI entry as json.dumps writes it nested `depth` levels deep."""
+    text = json.dumps(entry, indent=indent)
+    if indent is None:
+        return len(text)
+    return len(text.replace("\n", "\n" + " " * indent * depth))
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_sections_add_up_to_the_file_size(tmp_path, indent):
+    path = tmp_path / "pkg_ERC20Mock.contract_class.json"
+    path.write_text(json.dumps(sierra_class(), indent=indent) + "\n")
+    info = get_sierra_sections(path)
+    size = path.stat().st_size
+    assert info["bytes"] == size
+    assert sum(info["sections"].values()) == size
+    assert list(info["sections"])[-1] == OVERHEAD
+    assert set(info["sections"]) == {*sierra_class(), OVERHEAD}
+    separator = ", " if indent is None else ": "
+    assert info["sections"]["contract_class_version"] == len(f'"contract_class_version"{separator}"0.1.0"')
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_abi_entries_are_attributed_per_interface_and_event(tmp_path, indent):
+    path = tmp_path / "pkg_ERC20Mock.contract_class.json"
+    path.write_text(json.dumps(sierra_class(), indent=indent))
+    abi = get_sierra_sections(path)["abi"]
+    assert abi == {
+        "interface openzeppelin_interfaces::erc20::IERC20": entry_bytes(ABI[1], indent),
+        "event openzeppelin_token::erc20::erc20::ERC20Component::Transfer": entry_bytes(ABI[4], indent),
+        "impl": entry_bytes(ABI[0], indent) + entry_bytes(ABI[2], indent),
+        "interface openzeppelin_interfaces::erc20::IERC20Metadata": entry_bytes(ABI[3], indent),
+        "event pkg::ERC20Mock::Event": entry_bytes(ABI[5], indent),
+    }
+    assert sum(abi.values()) < get_sierra_sections(path)["sections"]["abi"]
+
+
+def test_abi_stored_as_a_string_is_one_section(tmp_path):
+    path = tmp_path / "pkg_ERC20Mock.contract_class.json"
+    path.write_text(json.dumps(sierra_class(json.dumps(ABI))))
+    info = get_sierra_sections(path)
+    assert info["abi"] == {}
+    assert info["sections"]["abi"] == len('"abi": ') + len(json.dumps(json.dumps(ABI)))
+
+
+@pytest.mark.parametrize("text", ['{"abi": [}', '{"abi": []} []', ""])
+def test_malformed_contract_class(tmp_path, text):
+    path = tmp_path / "pkg_ERC20Mock.contract_class.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        get_sierra_sections(path)
+
+
+def test_only_artifacts_in_the_manifest_are_measured(target_dir):
+    # A stale artifact left behind by a renamed contract
+    (target_dir / "openzeppelin_test_pkg_OldMock.contract_class.json").write_text("{}")
+    (target_dir / "openzeppelin_test_pkg_OldMock.compiled_contract_class.json").write_text("{}")
+    sections = measure_sections(str(target_dir))[SECTIONS_KEY]
+    assert list(sections) == [
+        "openzeppelin_test_pkg_AccountMock.contract_class.json",
+        "openzeppelin_test_pkg_ERC20Mock.contract_class.json",
+        "openzeppelin_test_pkg_VestingMock.contract_class.json",
+    ]
+    assert [file for file, _, _ in list_casm_artifacts(str(target_dir))] == [
+        "openzeppelin_test_pkg_AccountMock.compiled_contract_class.json",
+        "openzeppelin_test_pkg_ERC20Mock.compiled_contract_class.json",
+        "openzeppelin_test_pkg_VestingMock.compiled_contract_class.json",
+    ]
+
+
+def test_casm_artifacts_are_paired_by_the_manifest(tmp_path):
+    (tmp_path / "casm.json").write_text("{}")
+    (tmp_path / "sierra.json").write_text("{}")
+    manifest = {"version": 1, "contracts": [
+        {"package_name": "pkg", "contract_name": "Mock", "artifacts": {"sierra": "sierra.json", "casm": "casm.json"}},
+    ]}
+    (tmp_path / "pkg.starknet_artifacts.json").write_text(json.dumps(manifest))
+    assert list(list_casm_artifacts(str(tmp_path))) == [("casm.json", str(tmp_path / "casm.json"), str(tmp_path / "sierra.json"))]
+
+
+def test_directory_without_manifest_is_listed(tmp_path):
+    (tmp_path / "pkg_Mock.compiled_contract_class.json").write_text("{}")
+    (tmp_path / "pkg_Mock.contract_class.json").write_text(json.dumps(sierra_class()))
+    assert list(list_casm_artifacts(str(tmp_path))) == [(
+        "pkg_Mock.compiled_contract_class.json",
+        str(tmp_path / "pkg_Mock.compiled_contract_class.json"),
+        str(tmp_path / "pkg_Mock.contract_class.json"),
+    )]
+    assert list(measure_sections(str(tmp_path))[SECTIONS_KEY]) == ["pkg_Mock.contract_class.json"]
@@ -0,0 +1,203 @@
+import json
+
+from class_hash import STARK_FIELD_PRIME, encode_short_string, get_selector_from_name
+from storage_costs import (
+    analyze_contract,
+    decode_function,
+    event_felts_of,
+    event_payloads,
+    reachable_costs,
+    type_size,
+)
+
+# Instruction words as the Cairo compiler emits them
+ASSERT_IMMEDIATE = 0x480680017FFF8000  # [ap + 0] = <immediate>, ap++
+CALL_REL = 0x1104800180018000  # call rel <immediate>
+RET = 0x208B7FFF7FFF7FFE
+NOP = 0x400080007FFE7FFF  # [ap + 0] = [ap + -2], no immediate
+
+
+def syscall(name):
+    return [ASSERT_IMMEDIATE, encode_short_string(name)]
+
+
+def call(pc, target):
+    return [CALL_REL, (target - pc) % STARK_FIELD_PRIME]
+
+
+class Program:
+    """Assembles functions into one bytecode, resolving calls by function name."""
+
+    def __init__(self, functions):
+        self.names = [name for name, _ in functions]
+        self.offsets = {}
+        offset = 0
+        for name, body in functions:
+            self.offsets[name] = offset
+            offset += sum(2 if op[0] != "ret" else 1 for op in body)
+        self.bytecode = []
+        self.lengths = []
+        for name, body in functions:
+            start = len(self.bytecode)
+            for op in body:
+                if op[0] == "syscall":
+                    self.bytecode += syscall(op[1])
+                elif op[0] == "call":
+                    self.bytecode += call(len(self.bytecode), self.offsets[op[1]])
+                elif op[0] == "imm":
+                    self.bytecode += [ASSERT_IMMEDIATE, op[1]]
+                else:
+                    self.bytecode.append(RET)
+            self.lengths.append(len(self.bytecode) - start)
+
+
+def test_decode_counts_syscall_sites_and_relative_calls():
+    bytecode = [NOP, *syscall("StorageRead"), *syscall("StorageWrite"), *call(5, 0), *syscall("StorageRead"), *call(9, 20), RET]
+    syscalls, calls = decode_function([hex(word) for word in bytecode], 0, len(bytecode))
+    assert syscalls == {"storage_reads": 2, "storage_writes": 1, "events": 0}
+    assert calls == [0, 20]
+    # An unrelated immediate is skipped along with its instruction
+    syscalls, calls = decode_function([hex(ASSERT_IMMEDIATE), hex(encode_short_string("GetBlockHash")), hex(RET)], 0, 3)
+    assert syscalls == {"storage_reads": 0, "storage_writes": 0, "events": 0} and calls == []
+    # A syscall immediate that would sit past the function is not read
+    syscalls, _ = decode_function([hex(word) for word in [*syscall("EmitEvent"), *syscall("EmitEvent")]], 0, 3)
+    assert syscalls["events"] == 1
+
+
+def cost(**metrics):
+    return {"storage_reads": 0, "storage_writes": 0, "events": 0, "event_felts": 0, **metrics}
+
+
+def test_reachable_costs_count_every_call_site():
+    functions = {
+        0: {"cost": cost(storage_writes=1), "calls": [10, 10, 20]},
+        10: {"cost": cost(storage_reads=1), "calls": [30]},
+        20: {"cost": cost(events=1, event_felts=3), "calls": [30]},
+        30: {"cost": cost(storage_reads=2), "calls": []},
+    }
+    assert reachable_costs(0, functions) == cost(storage_reads=8, storage_writes=1, events=1, event_felts=3)
+    assert reachable_costs(20, functions) == cost(storage_reads=2, events=1, event_felts=3)
+    # Calls outside every known function add nothing
+    assert reachable_costs(40, functions) == cost()
+
+
+def test_reachable_costs_count_recursion_once():
+    functions = {
+        0: {"cost": cost(storage_reads=1), "calls": [0, 10]},
+        10: {"cost": cost(storage_writes=1), "calls": [0, 10]},
+    }
+    assert reachable_costs(0, functions) == cost(storage_reads=1, storage_writes=1)
+
+
+def test_reachable_costs_are_memoized():
+    # Every level calls the next one twice: 2^80 paths, walked once each
+    depth = 80
+    functions = {level: {"cost": cost(), "calls": [level + 1, level + 1]} for level in range(depth)}
+    functions[depth] = {"cost": cost(storage_reads=1), "calls": []}
+    assert reachable_costs(0, functions)["storage_reads"] == 2 ** depth
+
+
+ABI = [
+    {"type": "interface", "name": "pkg::IToken", "items": [
+        {"type": "function", "name": "transfer", "inputs": [], "outputs": [], "state_mutability": "external"},
+        {"type": "function", "name": "balance_of", "inputs": [], "outputs": [], "state_mutability": "view"},
+    ]},
+    {"type": "constructor", "name": "constructor", "inputs": []},
+    {"type": "struct", "name": "core::integer::u256", "members": [
+        {"name": "low", "type": "core::integer::u128"}, {"name": "high", "type": "core::integer::u128"},
+    ]},
+    {"type": "enum", "name": "pkg::Choice", "variants": [{"name": "A", "type": "()"}, {"name": "B", "type": "core::integer::u256"}]},
+    {"type": "event", "name": "pkg::TokenComponent::Transfer", "kind": "struct", "members": [
+        {"name": "from", "type": "core::starknet::contract_address::ContractAddress", "kind": "key"},
+        {"name": "to", "type": "core::starknet::contract_address::ContractAddress", "kind": "key"},
+        {"name": "value", "type": "core::integer::u256", "kind": "data"},
+    ]},
+    {"type": "event", "name": "pkg::TokenComponent::TransferBatch", "kind": "struct", "members": [
+        {"name": "ids", "type": "core::array::Span::<core::integer::u256>", "kind": "data"},
+        {"name": "values", "type": "(core::integer::u256, pkg::Choice)", "kind": "data"},
+        {"name": "memo", "type": "core::byte_array::ByteArray", "kind": "data"},
+    ]},
+    {"type": "event", "name": "pkg::TokenComponent::Event", "kind": "enum", "variants": [
+        {"name": "Transfer", "type": "pkg::TokenComponent::Transfer", "kind": "nested"},
+        {"name": "TransferBatch", "type": "pkg::TokenComponent::TransferBatch", "kind": "nested"},
+    ]},
+    {"type": "event", "name": "pkg::Token::Event", "kind": "enum", "variants": [
+        {"name": "TokenEvent", "type": "pkg::TokenComponent::Event", "kind": "flat"},
+    ]},
+]
+
+
+def test_event_payloads_follow_the_event_enums():
+    definitions = {entry["name"]: entry for entry in ABI if entry["type"] in ("struct", "enum")}
+    assert type_size("core::integer::u256", definitions) == 2
+    assert type_size("pkg::Choice", definitions) == 3
+    assert type_size("(core::integer::u256, pkg::Choice)", definitions) == 5
+    assert type_size("core::array::Array::<(core::felt252, core::felt252)>", definitions) == 1
+    # The flat root variant adds no key, the component's nested variants add their selector
+    assert event_payloads(ABI) == {"pkg::TokenComponent::Transfer": 5, "pkg::TokenComponent::TransferBatch": 8}
+
+
+def test_event_felts_of_matches_whole_event_names():
+    payloads = {"pkg::TokenComponent::Transfer": 5, "pkg::TokenComponent::TransferBatch": 8}
+    emit = "core::starknet::syscalls::emit_event_syscall"
+    assert event_felts_of("pkg::TokenComponent::emit<pkg::TokenComponent::Transfer>", payloads) == 5
+    assert event_felts_of("pkg::TokenComponent::emit<pkg::TokenComponent::TransferBatch>", payloads) == 8
+    # Unnamed events fall back to the largest one the contract can emit
+    assert event_felts_of(emit, payloads) == 8
+    assert event_felts_of(emit, {}) == 0
+
+
+def write_contract(tmp_path, program, entry_points):
+    casm = {
+        "bytecode": [hex(word) for word in program.bytecode],
+        "bytecode_segment_lengths": program.lengths,
+        "entry_points_by_type": {
+            kind: [{"selector": hex(get_selector_from_name(name)), "offset": program.offsets[function], "builtins": []}
+                   for name, function in points]
+            for kind, points in entry_points.items()
+        },
+    }
+    sierra = {
+        "sierra_program_debug_info": {"user_func_names": [[index, name] for index, name in enumerate(program.names)]},
+        "entry_points_by_type": {},
+        "abi": json.dumps(ABI),
+    }
+    casm_path = tmp_path / "pkg_Token.compiled_contract_class.json"
+    sierra_path = tmp_path / "pkg_Token.contract_class.json"
+    casm_path.write_text(json.dumps(casm))
+    sierra_path.write_text(json.dumps(sierra))
+    return casm_path, sierra_path
+
+
+def test_analyze_contract(tmp_path):
+    program = Program([
+        ("pkg::Token::__wrapper__transfer", [("call", "pkg::TokenComponent::_update"), ("call", "pkg::TokenComponent::_update"), ("ret",)]),
+        ("pkg::Token::__wrapper__balance_of", [("syscall", "StorageRead"), ("ret",)]),
+        ("pkg::Token::__wrapper__constructor", [("syscall", "StorageWrite"), ("call", "pkg::TokenComponent::loop"), ("ret",)]),
+        ("pkg::TokenComponent::_update", [
+            ("syscall", "StorageRead"), ("syscall", "StorageWrite"), ("call", "pkg::TokenComponent::emit<pkg::TokenComponent::Transfer>"), ("ret",),
+        ]),
+        ("pkg::TokenComponent::emit<pkg::TokenComponent::Transfer>", [("syscall", "EmitEvent"), ("ret",)]),
+        ("pkg::TokenComponent::loop", [("syscall", "EmitEvent"), ("imm", 7), ("call", "pkg::TokenComponent::loop"), ("ret",)]),
+    ])
+    casm_path, sierra_path = write_contract(tmp_path, program, {
+        "EXTERNAL": [("transfer", "pkg::Token::__wrapper__transfer"), ("balance_of", "pkg::Token::__wrapper__balance_of")],
+        "CONSTRUCTOR": [("constructor", "pkg::Token::__wrapper__constructor")],
+    })
+    report = analyze_contract(casm_path, sierra_path)
+    assert report["entry_points"] == {
+        "balance_of": {"storage_reads": 1, "storage_writes": 0, "events": 0, "event_felts": 0},
+        "constructor constructor": {"storage_reads": 0, "storage_writes": 1, "events": 1, "event_felts": 8},
+        "transfer": {"storage_reads": 2, "storage_writes": 2, "events": 2, "event_felts": 10},
+    }
+    assert report["events"] == {"pkg::TokenComponent::TransferBatch": 8, "pkg::TokenComponent::Transfer": 5}
+
+
+def test_analyze_contract_without_segments_scans_the_whole_contract(tmp_path):
+    program = Program([("pkg::Token::__wrapper__balance_of", [("syscall", "StorageRead"), ("syscall", "StorageRead"), ("ret",)])])
+    casm_path, sierra_path = write_contract(tmp_path, program, {"EXTERNAL": [("balance_of", "pkg::Token::__wrapper__balance_of")]})
+    casm = json.loads(casm_path.read_text())
+    del casm["bytecode_segment_lengths"]
+    casm_path.write_text(json.dumps(casm))
+    report = analyze_contract(casm_path, sierra_path)
+    assert report["entry_points"]["balance_of"]["storage_reads"] == 2
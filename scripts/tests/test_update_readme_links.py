@@ -0,0 +1,166 @@
+import random
+import re
+import time
+
+import pytest
+
+from update_readme_links import major_of, update_file_contents
+
+# (new version, current version): rules 1 to 4 of `version_segments`, then unparsable versions
+VERSION_PAIRS = [
+    ("3.0.0-alpha.1", "3.0.0-alpha.0"),
+    ("3.0.0", "3.0.0-alpha.3"),
+    ("4.0.0-alpha.0", "3.1.0"),
+    ("4.0.0", "3.1.0"),
+    ("3.2.0", "3.1.0"),
+    ("next", "3.1.0"),
+]
+
+
+def legacy_update_file_contents(text, new_version, current_version):
+    """The regex engine `update_file_contents` replaced, kept as the reference behavior."""
+    cur_has_alpha = "alpha" in current_version.lower()
+    new_has_alpha = "alpha" in new_version.lower()
+    if cur_has_alpha and new_has_alpha:
+        return text
+    if cur_has_alpha:
+        new_major = major_of(new_version)
+        if not new_major:
+            return text
+        return re.sub(r"(\()([^)]*?)/alpha/", r"\1\2/" + f"{new_major}.x" + "/", text)
+    cur_major = major_of(current_version)
+    if not cur_major:
+        return text
+    pattern = r"(\()([^)]*)/" + re.escape(f"{cur_major}.x") + r"/"
+    if new_has_alpha:
+        return re.sub(pattern, r"\1\2/alpha/", text)
+    new_major = major_of(new_version)
+    if not new_major:
+        return text
+    return re.sub(pattern, r"\1\2/" + f"{new_major}.x" + "/", text)
+
+
+def legacy_fixpoint(text, new_version, current_version):
+    """The legacy engine applied until nothing changes, i.e. with every occurrence rewritten."""
+    while True:
+        updated = legacy_update_file_contents(text, new_version, current_version)
+        if updated == text:
+            return text
+        text = updated
+
+
+def synthetic_readme(rng, lines):
+    """
+    Markdown with links, images, bare paths, stray and nested parentheses, including
+    consecutive versioned segments that share a '/'.
+    """
+    segments = ["/3.x/", "/alpha/", "/2.x/", "/3.x", "alpha/", "/3.x/3.x/", "/alpha/alpha/", "/3.x/alpha/"]
+    words = ["docs", "api", "erc20", "See", "the", "guide", "[link]", "![img]", "#anchor", "`code`"]
+    out = []
+    for _ in range(lines):
+        tokens = []
+        for _ in range(rng.randrange(1, 12)):
+            kind = rng.random()
+            if kind < 0.25:
+                tokens.append(f"[{rng.choice(words)}](https://docs.openzeppelin.com/contracts-cairo{rng.choice(segments)}{rng.choice(words)})")
+            elif kind < 0.35:
+                tokens.append(f"({rng.choice(words)}{rng.choice(segments)}{rng.choice(words)}{rng.choice(segments)}{rng.choice(words)})")
+            elif kind < 0.45:
+                tokens.append(rng.choice(["(", ")", "((", "))"]))
+            elif kind < 0.55:
+                tokens.append(f"{rng.choice(segments)}{rng.choice(words)}")
+            else:
+                tokens.append(rng.choice(words))
+        out.append(" ".join(tokens))
+    return "\n".join(out) + "\n"
+
+
+@pytest.mark.parametrize("new_version,current_version", VERSION_PAIRS)
+def test_single_link_per_target_matches_legacy_engine(new_version, current_version):
+    text = (
+        "# Title\n"
+        "See [the docs](https://docs.openzeppelin.com/contracts-cairo/3.x/erc20) for details.\n"
+        "![badge](https://img/alpha/badge.svg) and a bare /3.x/ path outside links.\n"
+        "An (unrelated) aside (with /alpha/inside).\n"
+        "Unclosed (paren /3.x/ here\n"
+    )
+    assert update_file_contents(text, new_version, current_version) == legacy_update_file_contents(text, new_version, current_version)
+
+
+@pytest.mark.parametrize("new_version,current_version", VERSION_PAIRS)
+def test_random_corpus_matches_legacy_engine_at_fixpoint(new_version, current_version):
+    rng = random.Random(f"{new_version}/{current_version}")
+    for _ in range(50):
+        text = synthetic_readme(rng, 20)
+        assert update_file_contents(text, new_version, current_version) == legacy_fixpoint(text, new_version, current_version)
+
+
+def test_several_links_on_one_line_are_all_rewritten():
+    line = "[a](https://d/3.x/a) [b](https://d/3.x/b) ![c](https://d/3.x/c.png)\n"
+    expected = "[a](https://d/4.x/a) [b](https://d/4.x/b) ![c](https://d/4.x/c.png)\n"
+    assert update_file_contents(line, "4.0.0", "3.1.0") == expected
+    assert legacy_update_file_contents(line, "4.0.0", "3.1.0") == expected
+
+
+def test_several_segments_in_one_target_are_all_rewritten():
+    # Deliberate behavior change: the legacy engine rewrote only the last segment (rules 3
+    # and 4) or only the first one (rule 2) of a target
+    line = "[a](https://d/3.x/guide/3.x/erc20)\n"
+    assert update_file_contents(line, "4.0.0", "3.1.0") == "[a](https://d/4.x/guide/4.x/erc20)\n"
+    assert legacy_update_file_contents(line, "4.0.0", "3.1.0") == "[a](https://d/3.x/guide/4.x/erc20)\n"
+
+    line = "[a](https://d/alpha/guide/alpha/erc20)\n"
+    assert update_file_contents(line, "3.0.0", "3.0.0-alpha.3") == "[a](https://d/3.x/guide/3.x/erc20)\n"
+    assert legacy_update_file_contents(line, "3.0.0", "3.0.0-alpha.3") == "[a](https://d/3.x/guide/alpha/erc20)\n"
+
+
+def test_consecutive_segments_sharing_a_slash_are_all_rewritten():
+    # The legacy regex rewrote the last occurrence (rules 3 and 4) or the first one (rule 2)
+    line = "[a](https://d/1.x/1.x/a)\n"
+    assert update_file_contents(line, "2.0.0", "1.2.0") == "[a](https://d/2.x/2.x/a)\n"
+    assert legacy_update_file_contents(line, "2.0.0", "1.2.0") == "[a](https://d/1.x/2.x/a)\n"
+    assert update_file_contents(line, "2.0.0", "1.2.0") == legacy_fixpoint(line, "2.0.0", "1.2.0")
+
+    line = "[a](https://d/alpha/alpha/alpha/a) /alpha/alpha/\n"
+    assert update_file_contents(line, "3.0.0", "3.0.0-alpha.3") == "[a](https://d/3.x/3.x/3.x/a) /alpha/alpha/\n"
+    assert legacy_update_file_contents(line, "3.0.0", "3.0.0-alpha.3") == "[a](https://d/3.x/alpha/alpha/a) /alpha/alpha/\n"
+
+    line = "(/3.x/3.x/)\n"
+    assert update_file_contents(line, "4.0.0-alpha.0", "3.1.0") == "(/alpha/alpha/)\n"
+
+
+def test_unversioned_and_no_op_rules_leave_text_untouched():
+    text = "[a](https://d/3.x/a)\n"
+    assert update_file_contents(text, "3.0.0-alpha.1", "3.0.0-alpha.0") is text
+    assert update_file_contents(text, "next", "3.1.0") is text
+    assert update_file_contents("no links here\n", "4.0.0", "3.1.0") == "no links here\n"
+
+
+def time_engine(engine, texts, new_version, current_version):
+    start = time.perf_counter()
+    for text in texts:
+        engine(text, new_version, current_version)
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+def test_many_open_parentheses_scan_linearly():
+    # The legacy pattern retries `([^)]*)` from every '(', which is quadratic on this line
+    text = "(" * 4000 + "/3.x" + "\n"
+    new_time = min(time_engine(update_file_contents, [text], "4.0.0", "3.1.0") for _ in range(3))
+    legacy_time = min(time_engine(legacy_update_file_contents, [text], "4.0.0", "3.1.0") for _ in range(3))
+    print(f"\n{len(text)} chars of open parentheses: {new_time * 1000:.2f} ms (legacy regex: {legacy_time * 1000:.2f} ms)")
+    assert new_time * 10 < legacy_time
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("new_version,current_version", VERSION_PAIRS[1:5])
+def test_benchmark_synthetic_corpus(new_version, current_version):
+    """Times both engines on a large synthetic README corpus."""
+    rng = random.Random(0)
+    texts = [synthetic_readme(rng, 300) for _ in range(50)]
+    new_time = min(time_engine(update_file_contents, texts, new_version, current_version) for _ in range(5))
+    legacy_time = min(time_engine(legacy_update_file_contents, texts, new_version, current_version) for _ in range(5))
+    size = sum(len(text) for text in texts)
+    print(f"\n{current_version} -> {new_version} on {size} bytes: {new_time * 1000:.1f} ms (legacy regex: {legacy_time * 1000:.1f} ms)")
+    assert new_time < legacy_time
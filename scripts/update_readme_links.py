@@ -1,18 +1,38 @@
 #!/usr/bin/env python3
 import argparse
+import difflib
 import os
 import re
-from typing import Tuple
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from profiling import PROFILER, add_profile_argument, enable_profiling, profiled_map
 
 ROOT_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "packages"))
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
 
-def parse_args() -> Tuple[str, str, str]:
+def parse_args() -> Tuple[str, str, str, bool, int]:
     p = argparse.ArgumentParser(description="Update README.md links for versioning rules.")
     p.add_argument("--new-version", required=True, help="New library version (e.g. 1.2.3 or 2.0.0-alpha.1)")
     p.add_argument("--current-version", required=True, help="Current library version (e.g. 1.2.3 or 2.0.0-alpha.0)")
     p.add_argument("--root", default=ROOT_DIR, help="Root directory (default: ../packages)")
+    p.add_argument("--dry-run", action="store_true", help="Print a unified diff of the changes instead of writing them")
+    p.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"Number of files processed concurrently (default: {DEFAULT_JOBS})")
+    add_profile_argument(p)
     args = p.parse_args()
-    return args.new_version.strip(), args.current_version.strip(), os.path.abspath(args.root)
+    if args.jobs < 1:
+        p.error("--jobs must be at least 1")
+    enable_profiling(args.profile)
+    return (
+        args.new_version.strip(),
+        args.current_version.strip(),
+        os.path.abspath(args.root),
+        args.dry_run,
+        args.jobs,
+    )
 
 def major_of(v: str) -> str:
     # Extract major version number from a semver-like string: e.g.,
@@ -22,64 +42,88 @@ def major_of(v: str) -> str:
     m = re.match(r"^\s*(\d+)(?:\.\d+){0,2}\s*(?:[-+].*)?$", v)
     return m.group(1) if m else ""
 
-def update_file_contents(
-    text: str,
-    new_version: str,
-    current_version: str,
-) -> str:
+def version_segments(new_version: str, current_version: str) -> Optional[Tuple[str, str]]:
     """
-    Apply the three rules:
+    Apply the four rules and return the (old, new) path segment to rewrite, or None:
       1) current contains 'alpha' and new contains 'alpha'  -> do nothing
       2) current contains 'alpha' and new does not          -> replace '/alpha/' with '/<new_major>.x/' (in links)
       3) current does not contain 'alpha' and new contains 'alpha' -> replace '/<current_major>.x/' with '/alpha/' (in links)
       4) current does not contain 'alpha' and new does not contain 'alpha' -> replace '/<current_major>.x/' with '/<new_major>.x/' (in links)
-    Only updates content that appears inside markdown link/image URLs, i.e., inside parentheses (...).
     """
     cur_has_alpha = "alpha" in current_version.lower()
     new_has_alpha = "alpha" in new_version.lower()
 
     if cur_has_alpha and new_has_alpha:
-        return text  # Rule 1: no-op
+        return None  # Rule 1: no-op
 
-    # Helper: replace only when inside (...) to target markdown links/images
-    def replace_inside_parens(pattern: str, repl: str, s: str) -> str:
-        # We match the opening '(' separately to keep it intact, and ensure we only touch content within a single URL segment.
-        return re.sub(pattern, repl, s)
-
-    if cur_has_alpha and not new_has_alpha:
+    if cur_has_alpha:
         # Rule 2: /alpha/  ->  /<new_major>.x/
         new_major = major_of(new_version)
-        if not new_major:
-            # If we can't parse a major, do nothing safely.
-            return text
-        # Replace occurrences of "/alpha/" that appear within parentheses
-        # pattern captures '(' then any non-')' chars (lazy), then '/alpha/'
-        pattern = r"(\()([^)]*?)/alpha/"
-        replacement = r"\1\2/" + f"{new_major}.x" + "/"
-        return replace_inside_parens(pattern, replacement, text)
-
-    if (not cur_has_alpha) and new_has_alpha:
-        # Rule 3: '/<current_major>.x/' -> '/alpha/' (within links)
-        cur_major = major_of(current_version)
-        if not cur_major:
-            return text
-        # Escape the dot in '<major>.x'
-        pattern = r"(\()([^)]*)/" + re.escape(f"{cur_major}.x") + r"/"
-        replacement = r"\1\2/alpha/"
-        return replace_inside_parens(pattern, replacement, text)
-
-    if not cur_has_alpha and not new_has_alpha:
-        # Rule 4: '/<current_major>.x/' -> '/<new_major>.x/' (within links)
-        cur_major = major_of(current_version)
-        new_major = major_of(new_version)
-        if not cur_major or not new_major:
+        # If we can't parse a major, do nothing safely.
+        return ("alpha", f"{new_major}.x") if new_major else None
+
+    cur_major = major_of(current_version)
+    if not cur_major:
+        return None
+    if new_has_alpha:
+        # Rule 3: '/<current_major>.x/' -> '/alpha/'
+        return f"{cur_major}.x", "alpha"
+
+    # Rule 4: '/<current_major>.x/' -> '/<new_major>.x/'
+    new_major = major_of(new_version)
+    return (f"{cur_major}.x", f"{new_major}.x") if new_major else None
+
+@lru_cache(maxsize=None)
+def build_rewriter(new_version: str, current_version: str) -> Optional[Callable[[str], str]]:
+    """
+    Build the rewrite function for a version bump once per run, or None if the rules say
+    nothing changes. A link target is an opening '(' and everything up to the next ')'. Targets
+    are found in a single left-to-right pass, and every versioned segment inside a target is
+    rewritten, not just the first or last one.
+    """
+    segments = version_segments(new_version, current_version)
+    if segments is None:
+        return None
+    old_segment, new_segment = segments
+    old = f"/{old_segment}/"
+
+    def rewrite(text: str) -> str:
+        # Walk the occurrences of the old segment left to right, keeping track of the last '('
+        # and ')' seen so far. An occurrence is inside a link target when the last '(' before it
+        # is not closed yet. Every character is scanned a bounded number of times. Consecutive
+        # segments share a '/', so the next search starts at the closing one: '/1.x/1.x/' holds
+        # two occurrences.
+        pieces = []
+        last_open = last_close = -1
+        scanned = copied = 0
+        index = text.find(old)
+        while index != -1:
+            last_open = max(last_open, text.rfind("(", scanned, index))
+            last_close = max(last_close, text.rfind(")", scanned, index))
+            scanned = index
+            if last_open > last_close:
+                pieces.append(text[copied:index + 1])
+                pieces.append(new_segment)
+                copied = index + 1 + len(old_segment)
+            index = text.find(old, index + len(old) - 1)
+        if not pieces:
             return text
-        pattern = r"(\()([^)]*)/" + re.escape(f"{cur_major}.x") + r"/"
-        replacement = r"\1\2/" + f"{new_major}.x" + "/"
-        return replace_inside_parens(pattern, replacement, text)
+        pieces.append(text[copied:])
+        return "".join(pieces)
 
-    # If neither has alpha, the rules say nothing—leave file unchanged.
-    return text
+    return rewrite
+
+def update_file_contents(
+    text: str,
+    new_version: str,
+    current_version: str,
+) -> str:
+    """
+    Rewrite versioned documentation links according to the rules in `version_segments`.
+    Only updates content that appears inside markdown link/image URLs, i.e., inside parentheses (...).
+    """
+    rewrite = build_rewriter(new_version, current_version)
+    return text if rewrite is None else rewrite(text)
 
 def find_readmes(root: str):
     for dirpath, dirnames, filenames in os.walk(root):
@@ -87,8 +131,56 @@ def find_readmes(root: str):
             if name.lower() == "readme.md":
                 yield os.path.join(dirpath, name)
 
+def write_atomically(path: str, contents: str) -> None:
+    """
+    Write `contents` to a temporary file in the same directory and rename it over `path`,
+    so an interrupted run never leaves a truncated README behind.
+    """
+    mode = os.stat(path).st_mode
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".readme-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def process_readme(path: str, new_version: str, current_version: str, dry_run: bool) -> Tuple[bool, List[str]]:
+    """
+    Rewrite a single README. Returns whether it changed and the lines to report for it,
+    which are printed by the caller so the output of concurrent workers never interleaves.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            original = f.read()
+    except Exception as e:
+        return False, [f"[error] Could not read {path}: {e}\n"]
+
+    updated = update_file_contents(original, new_version, current_version)
+    if updated == original:
+        return False, []
+
+    if dry_run:
+        diff = difflib.unified_diff(
+            original.splitlines(keepends=True),
+            updated.splitlines(keepends=True),
+            fromfile=path,
+            tofile=path,
+        )
+        return True, list(diff)
+
+    try:
+        write_atomically(path, updated)
+    except Exception as e:
+        return False, [f"[error] Could not write {path}: {e}\n"]
+    return True, [f"[updated] {path}\n"]
+
 def main():
-    new_version, current_version, root = parse_args()
+    new_version, current_version, root, dry_run, jobs = parse_args()
 
     if not os.path.isdir(root):
         print(f"[warn] Root directory not found: {root}")
@@ -97,27 +189,25 @@ def main():
     changed_files = 0
     scanned_files = 0
 
-    for path in find_readmes(root):
-        scanned_files += 1
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                original = f.read()
-        except Exception as e:
-            print(f"[error] Could not read {path}: {e}")
-            continue
-
-        updated = update_file_contents(original, new_version, current_version)
-
-        if updated != original:
-            try:
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(updated)
-                changed_files += 1
-                print(f"[updated] {path}")
-            except Exception as e:
-                print(f"[error] Could not write {path}: {e}")
-
-    print(f"\nDone. Scanned: {scanned_files} README.md files. Updated: {changed_files}.")
+    with PROFILER.span("find readmes", root=root):
+        paths = sorted(find_readmes(root))
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor, PROFILER.span("process readmes", count=len(paths)):
+        results = profiled_map(
+            executor.map,
+            lambda path: process_readme(path, new_version, current_version, dry_run),
+            [os.path.relpath(path, root) for path in paths],
+            paths,
+        )
+        # Results are streamed in path order as soon as each one is ready
+        for changed, lines in results:
+            scanned_files += 1
+            changed_files += changed
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+
+    action = "Would update" if dry_run else "Updated"
+    print(f"\nDone. Scanned: {scanned_files} README.md files. {action}: {changed_files}.")
 
 if __name__ == "__main__":
     main()